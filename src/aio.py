@@ -0,0 +1,179 @@
+'''
+
+Async Railroad Module
+
+'''
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncRailroad:
+    ''' Async Railroad Class
+
+    asyncio front-end of a RailroadService for use inside an event loop.
+    Cheap queries are answered inline; every other query runs on a bounded
+    executor so that an expensive query does not stall the event loop.
+
+    Identical queries in flight at the same time share one computation. At
+    most max_pending computations are queued or running at once, and further
+    queries wait for a free slot, so a burst of expensive queries cannot
+    pile up unbounded work. A query that times out or is cancelled stops
+    waiting at once; its computation is cancelled if it has not started yet
+    and no other query is waiting for it.
+
+    Only the read-only queries of QUERIES are answered, and the network
+    should not be changed while queries are running.
+
+    Attributes:
+        railroad: RailroadService answering the queries
+        executor: executor running the queries
+        max_pending: maximum number of computations queued or running at once
+        timeout: default number of seconds a query can take, None for no limit
+    '''
+    QUERIES = ('get_distance', 'get_distances', 'count_trips_by_stops', 'count_trips_by_max_stops',
+               'count_trips_by_max_dist', 'count_routes', 'get_shortest_distance', 'get_shortest_route',
+               'get_k_shortest_routes', 'get_earliest_arrival', 'get_earliest_journey', 'run_batch')
+    INLINE_QUERIES = ('get_distance',)
+
+    def __init__(self, railroad, max_workers=4, max_pending=64, timeout=None, executor=None):
+        ''' Initialize an async railroad
+
+        Args:
+            railroad (RailroadService): railroad network to query
+            max_workers (int): number of worker threads (optional, default=4)
+            max_pending (int): maximum number of computations queued or running
+                at once (optional, default=64)
+            timeout (float): default number of seconds a query can take (optional, default=None)
+            executor (Executor): thread executor to run queries on instead of a
+                pool of max_workers threads (optional, default=None)
+
+        Raises:
+            ValueError if max_pending is not positive
+        '''
+
+        if max_pending <= 0:
+            raise ValueError('max_pending should be positive')
+
+        self.railroad = railroad
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers) if executor is None else executor
+        self._owns_executor = executor is None
+        self._slots = None
+        self._in_flight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        ''' Shuts the executor down, if it was created by this railroad '''
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self):
+        ''' Number of distinct queries in flight '''
+        return len(self._in_flight)
+
+    async def query(self, method, *args, timeout=None):
+        ''' Answers a query of the railroad service
+
+        Args:
+            method (str): name of a RailroadService query method, one of QUERIES,
+                e.g. 'count_trips_by_stops'
+            args: arguments of the query
+            timeout (float): number of seconds the query can take (optional, default=self.timeout)
+
+        Returns:
+            result of the query
+
+        Raises:
+            asyncio.TimeoutError if the query takes longer than timeout
+            ValueError if method is not one of QUERIES
+            ValueError if the query is not valid, see RailroadService
+        '''
+
+        if method not in self.QUERIES:
+            raise ValueError('unsupported query {}'.format(method))
+
+        if method in self.INLINE_QUERIES:
+            return getattr(self.railroad, method)(*args)
+
+        key = (method, tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args))
+        entry = self._in_flight.get(key)
+
+        if entry is None:
+            entry = self._in_flight[key] = [asyncio.ensure_future(self._compute(method, args)), 0]
+            entry[0].add_done_callback(functools.partial(self._done, key, entry))
+
+        entry[1] += 1
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(entry[0]), self.timeout if timeout is None else timeout)
+        finally:
+            entry[1] -= 1
+
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+                self._forget(key, entry)
+
+        # coalesced queries share one result, so every caller gets its own list
+        return list(result) if isinstance(result, list) else result
+
+    async def _compute(self, method, args):
+        ''' Runs a query on the executor once a slot is free '''
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        async with self._slots:
+            # run in a copy of the caller's context, so that profiles cover it
+            call = functools.partial(contextvars.copy_context().run, getattr(self.railroad, method), *args)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    def _done(self, key, entry, task):
+        ''' Forgets a finished computation '''
+
+        self._forget(key, entry)
+
+        if not task.cancelled():
+            # retrieved here so that failures nobody waited for are not logged
+            task.exception()
+
+    def _forget(self, key, entry):
+        ''' Stops sharing a computation with new queries '''
+        if self._in_flight.get(key) is entry:
+            del self._in_flight[key]
+
+    async def get_distance(self, route=[]):
+        ''' See RailroadService.get_distance '''
+        return await self.query('get_distance', route)
+
+    async def count_trips_by_stops(self, src, dest, num_stops=1, timeout=None):
+        ''' See RailroadService.count_trips_by_stops '''
+        return await self.query('count_trips_by_stops', src, dest, num_stops, timeout=timeout)
+
+    async def count_trips_by_max_stops(self, src, dest, max_stops=1, timeout=None):
+        ''' See RailroadService.count_trips_by_max_stops '''
+        return await self.query('count_trips_by_max_stops', src, dest, max_stops, timeout=timeout)
+
+    async def count_trips_by_max_dist(self, src, dest, max_distance=1, timeout=None):
+        ''' See RailroadService.count_trips_by_max_dist '''
+        return await self.query('count_trips_by_max_dist', src, dest, max_distance, timeout=timeout)
+
+    async def get_shortest_distance(self, src, dest, timeout=None):
+        ''' See RailroadService.get_shortest_distance '''
+        return await self.query('get_shortest_distance', src, dest, timeout=timeout)
+
+    async def get_shortest_route(self, src, dest, timeout=None):
+        ''' See RailroadService.get_shortest_route '''
+        return await self.query('get_shortest_route', src, dest, timeout=timeout)
+
+    async def get_k_shortest_routes(self, src, dest, k=5, timeout=None):
+        ''' See RailroadService.get_k_shortest_routes '''
+        return await self.query('get_k_shortest_routes', src, dest, k, timeout=timeout)
@@ -0,0 +1,249 @@
+'''
+
+Benchmark Module
+
+Times the RailroadService queries, indexes and track loading on generated networks.
+
+    python -m src.benchmark --sizes 10 1000 100000 --output results.json
+    python -m src.benchmark --baseline results.json --tolerance 0.25
+
+'''
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+
+from src.generators import NETWORKS
+from src.railroad import RailroadService
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+# query method and a function running it on a random source, destination and route
+QUERIES = {
+    'get_distance': lambda railroad, src, dest, route: railroad.get_distance(route),
+    'count_trips_by_stops': lambda railroad, src, dest, route: railroad.count_trips_by_stops(src, dest, 4),
+    'count_trips_by_max_stops': lambda railroad, src, dest, route: railroad.count_trips_by_max_stops(src, dest, 4),
+    'count_trips_by_max_dist': lambda railroad, src, dest, route: railroad.count_trips_by_max_dist(src, dest, 20),
+    'iter_trips': lambda railroad, src, dest, route: list(railroad.iter_trips(src, dest, max_distance=20, limit=100)),
+    'get_shortest_distance': lambda railroad, src, dest, route: railroad.get_shortest_distance(src, dest),
+    'get_shortest_route': lambda railroad, src, dest, route: railroad.get_shortest_route(src, dest),
+    'get_k_shortest_routes': lambda railroad, src, dest, route: railroad.get_k_shortest_routes(src, dest, 3),
+}
+
+# queries enumerating every simple route, whose cost grows exponentially with
+# the size of the network, only timed on networks of at most MAX_ENUMERATION_SIZE stations
+ENUMERATION_QUERIES = {
+    'count_routes': lambda railroad, src, dest, route: railroad.count_routes(src, dest),
+}
+MAX_ENUMERATION_SIZE = 16
+
+# batch query method and a function running it on all the random sources,
+# destinations and routes at once
+BATCH_QUERIES = {
+    'run_batch': lambda railroad, pairs: railroad.run_batch(_batch(pairs)),
+    'get_distances': lambda railroad, pairs: railroad.get_distances([route for _, _, route in pairs]),
+}
+
+# queries answered from the scheduled departures
+TIMETABLE_QUERIES = {
+    'get_earliest_arrival': lambda railroad, src, dest, route: railroad.get_earliest_arrival(src, dest, 360),
+}
+
+# queries answered with the help of the reachability index
+REACHABILITY_QUERIES = {
+    'reachability_count_trips_by_max_dist': lambda railroad, src, dest, route: railroad.count_trips_by_max_dist(src, dest, 20),
+}
+
+# queries answered from the contraction hierarchy
+HIERARCHY_QUERIES = {
+    'hierarchy_get_shortest_distance': lambda railroad, src, dest, route: railroad.get_shortest_distance(src, dest),
+    'hierarchy_get_shortest_route': lambda railroad, src, dest, route: railroad.get_shortest_route(src, dest),
+}
+
+def run_benchmarks(networks=tuple(NETWORKS), sizes=DEFAULT_SIZES, num_queries=20, seed=0):
+    ''' Times loading and querying generated networks
+
+    Every network is written out in the loader format and loaded through
+    RailroadService.load_tracks, then every query method is run on the same
+    seeded random stations. Shortest path trees are dropped between queries
+    so that every query is timed from scratch. ENUMERATION_QUERIES are only
+    run on networks of at most MAX_ENUMERATION_SIZE stations. BATCH_QUERIES
+    answer all the queries in one call, and get_distances_interned times
+    get_distances on routes interned beforehand. Departures are then
+    scheduled four times a day on every route for TIMETABLE_QUERIES, the
+    reachability index is built for REACHABILITY_QUERIES and the
+    contraction hierarchy for HIERARCHY_QUERIES.
+
+    Args:
+        networks (list): names of NETWORKS to generate (optional, default=all)
+        sizes (list): numbers of stations of the networks (optional)
+        num_queries (int): number of queries of every kind (optional, default=20)
+        seed (int): random seed of the networks and queries (optional, default=0)
+
+    Returns:
+        dict of '{network}-{size}' and dicts of metric names and seconds, where
+        load, build_reachability_index and build_hierarchy are total times
+        and queries are the mean time per query
+    '''
+
+    results = {}
+
+    for network in networks:
+        for size in sizes:
+            tracks = NETWORKS[network](size, seed=seed)
+            source = io.StringIO(''.join('{},{},{}\n'.format(*track) for track in tracks))
+
+            railroad = RailroadService()
+            metrics = results['{}-{}'.format(network, size)] = {'load': railroad.load_tracks(source).seconds}
+
+            if not tracks:
+                continue
+
+            rng = random.Random(seed)
+            stops = sorted(railroad.stops)
+            pairs = []
+
+            for _ in range(num_queries):
+                src, neighbour, _ = tracks[rng.randrange(len(tracks))]
+                dest = rng.choice(stops)
+                route = railroad.graph.get_shortest_path(src, dest) or [src, neighbour]
+                pairs.append((src, dest, route))
+
+            queries = dict(QUERIES, **(ENUMERATION_QUERIES if size <= MAX_ENUMERATION_SIZE else {}))
+
+            for method, query in queries.items():
+                metrics[method] = _time_queries(railroad, query, pairs)
+
+            # built once per network change, not per query
+            routes, offsets = railroad.compact_graph().encode_routes([route for _, _, route in pairs])
+
+            for method, query in BATCH_QUERIES.items():
+                railroad.graph.clear_shortest_path_trees()
+                metrics[method] = _time(query, railroad, pairs) / len(pairs)
+
+            metrics['get_distances_interned'] = _time(railroad.get_distances, routes, offsets) / len(pairs)
+
+            for src in stops:
+                for dest, _ in railroad.graph.adjacent(src):
+                    if dest != src:
+                        for quarter in range(4):
+                            railroad.add_departure(src, dest, quarter*360 + rng.randrange(360))
+
+            # sorts the departures once, not per query
+            railroad.get_earliest_arrival(stops[0], stops[0], 0)
+
+            for method, query in TIMETABLE_QUERIES.items():
+                metrics[method] = _time_queries(railroad, query, pairs)
+
+            metrics['build_reachability_index'] = _time(railroad.build_reachability_index)
+
+            for method, query in REACHABILITY_QUERIES.items():
+                metrics[method] = _time_queries(railroad, query, pairs)
+
+            metrics['build_hierarchy'] = _time(railroad.build_hierarchy)
+
+            for method, query in HIERARCHY_QUERIES.items():
+                metrics[method] = _time_queries(railroad, query, pairs)
+
+    return results
+
+
+def _time(function, *args):
+    ''' Returns the seconds a call of function takes '''
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def _time_queries(railroad, query, pairs):
+    ''' Returns the mean seconds of a query on every pair, each timed from scratch '''
+    elapsed = 0
+
+    for src, dest, route in pairs:
+        railroad.graph.clear_shortest_path_trees()
+        elapsed += _time(query, railroad, src, dest, route)
+
+    return elapsed / len(pairs)
+
+
+def _batch(pairs):
+    ''' Returns one run_batch query per pair, going through every kind of RailroadService.BATCH_QUERIES '''
+    queries = []
+
+    for i, (src, dest, route) in enumerate(pairs):
+        method = RailroadService.BATCH_QUERIES[i % len(RailroadService.BATCH_QUERIES)]
+
+        if method == 'get_distance':
+            queries.append((method, route))
+        elif method == 'get_shortest_distance':
+            queries.append((method, src, dest))
+        else:
+            queries.append((method, src, dest, 20 if method == 'count_trips_by_max_dist' else 4))
+
+    return queries
+
+
+def compare(results, baseline, tolerance=0.25):
+    ''' Compares benchmark results with a baseline
+
+    Args:
+        results (dict): results of run_benchmarks
+        baseline (dict): earlier results of run_benchmarks
+        tolerance (float): allowed relative slowdown (optional, default=0.25)
+
+    Returns:
+        list of (benchmark, metric, baseline seconds, seconds) tuples of the
+        metrics slower than baseline by more than tolerance
+    '''
+
+    regressions = []
+
+    for name, metrics in sorted(results.items()):
+        for metric, seconds in sorted(metrics.items()):
+            expected = baseline.get(name, {}).get(metric)
+
+            if expected is not None and seconds > expected*(1+tolerance):
+                regressions.append((name, metric, expected, seconds))
+
+    return regressions
+
+
+def main(argv=None):
+    ''' Command line entry point, returns 1 if there are regressions '''
+
+    parser = argparse.ArgumentParser(description='Benchmark RailroadService on generated networks')
+    parser.add_argument('--networks', nargs='+', choices=sorted(NETWORKS), default=sorted(NETWORKS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument('--queries', type=int, default=20, help='number of queries of every kind')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write the results to, as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.networks, args.sizes, args.queries, args.seed)
+
+    for name, metrics in results.items():
+        print(name, ' '.join('{}={:.6f}'.format(metric, seconds) for metric, seconds in metrics.items()))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+
+    for name, metric, expected, seconds in regressions:
+        print('REGRESSION {} {}: {:.6f}s -> {:.6f}s'.format(name, metric, expected, seconds))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
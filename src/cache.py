@@ -0,0 +1,102 @@
+'''
+
+Cache Module
+
+'''
+
+import threading
+import time
+from collections import OrderedDict
+
+class QueryCache:
+    ''' Query Cache Class
+
+    Bounded least recently used cache of query results, with optional
+    expiry. Results are tagged with the version of the graph they were
+    computed on, and the whole cache is dropped as soon as it is used with
+    a newer version, so stale results are never returned. It can be shared
+    by threads; queries are computed outside of its lock.
+
+    Attributes:
+        maxsize: maximum number of cached results
+        ttl: number of seconds a result stays valid, None for no expiry
+        version: graph version of the cached results
+        hits: number of lookups answered from the cache
+        misses: number of lookups not answered from the cache
+        evictions: number of results dropped to make room for new ones
+    '''
+
+    def __init__(self, maxsize=1024, ttl=None):
+        ''' Initialize a query cache
+
+        Args:
+            maxsize (int): maximum number of cached results (optional, default=1024)
+            ttl (float): number of seconds a result stays valid (optional, default=None)
+
+        Raises:
+            ValueError if maxsize is not positive
+        '''
+
+        if maxsize <= 0:
+            raise ValueError('maxsize should be positive')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = self.misses = self.evictions = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    def get_or_compute(self, key, version, compute):
+        ''' Returns the cached result of a query, computing it on a miss
+
+        Args:
+            key (tuple): hashable query kind and arguments
+            version (int): current graph version
+            compute (function): computes the result when it is not cached
+
+        Returns:
+            result of the query
+        '''
+
+        with self._lock:
+            if version != self.version:
+                self._results.clear()
+                self.version = version
+
+            entry = self._results.get(key)
+
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._results.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            if version != self.version:
+                return result
+
+            self._results[key] = (result, None if self.ttl is None else time.monotonic()+self.ttl)
+            self._results.move_to_end(key)
+
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+        return result
+
+    def clear(self):
+        ''' Drops all cached results '''
+        with self._lock:
+            self._results.clear()
+
+    @property
+    def stats(self):
+        ''' Cache counters as a dict '''
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._results)}
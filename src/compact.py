@@ -0,0 +1,519 @@
+'''
+
+Compact Graph Module
+
+'''
+
+import itertools
+import math
+from array import array
+from operator import add, mul, sub
+
+from src import instrumentation
+from src.graph import (Graph, ShortestPathTree, astar, bidirectional_dijkstra, count_paths_by_nodes, count_paths_by_weight,
+                       dijkstra, path_counts_by_nodes, path_counts_by_weight, path_limits, walk_paths, walk_simple_paths,
+                       yen_k_shortest_paths)
+from src.instrumentation import counted_adjacent, counted_paths
+
+class CompactGraph:
+    ''' Compact Graph Class
+
+    Frozen, array-backed representation of a Graph in compressed sparse row
+    (CSR) form. Nodes are interned to integer indices and the outgoing edges
+    of node i are targets[offsets[i]:offsets[i+1]] with matching weights,
+    so every edge costs 4 bytes of target and 8 bytes of weight.
+    Traversals run on node indices and only translate names at the boundary.
+
+    Attributes:
+        nodes: list of graph nodes, in index order
+        index: map of nodes and their index
+        offsets: array of len(nodes)+1 offsets into targets and weights
+        targets: array of edge target indices
+        weights: array of edge weights
+        version: number of changes made to the graph, always 0 since it is frozen
+    '''
+    NO_PATH = -1
+    SHORTEST_PATH_METHODS = Graph.SHORTEST_PATH_METHODS
+    version = 0
+
+    def __init__(self, nodes, offsets, targets, weights):
+        ''' Initialize a compact graph
+
+        Args:
+            nodes (list): list of graph nodes
+            offsets (array): array of len(nodes)+1 edge offsets
+            targets (array): array of edge target indices
+            weights (array): array of edge weights
+        '''
+
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._shortest_path_trees = {}
+        self._edge_table = None
+        self._reverse = None
+
+    @classmethod
+    def from_graph(cls, graph, nodes=None):
+        ''' Builds the compact representation of a graph
+
+        Args:
+            graph (Graph): graph to compact
+            nodes (list): graph nodes in index order (optional, default=sorted nodes)
+
+        Returns:
+            CompactGraph of the graph
+        '''
+
+        nodes = sorted(graph.nodes) if nodes is None else list(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        offsets, targets, weights = array('q', [0]), array('i'), array('q')
+
+        for node in nodes:
+            for neighbour, weight in graph.adjacent(node):
+                targets.append(index[neighbour])
+                weights.append(weight)
+
+            offsets.append(len(targets))
+
+        return cls(nodes, offsets, targets, weights)
+
+    def __len__(self):
+        ''' Number of nodes of the graph '''
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        ''' Number of edges of the graph '''
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        ''' Size in bytes of the offsets, targets and weights arrays '''
+        return sum(a.itemsize*len(a) for a in (self.offsets, self.targets, self.weights))
+
+    def adjacent(self, i):
+        ''' Returns (neighbour, weight) index pairs of the outgoing edges of node index i '''
+        start, end = self.offsets[i], self.offsets[i+1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def incoming(self, i):
+        ''' Returns (neighbour, weight) index pairs of the incoming edges of node index i '''
+        offsets, sources, weights = self._get_reverse()
+        start, end = offsets[i], offsets[i+1]
+        return zip(sources[start:end], weights[start:end])
+
+    def _get_reverse(self):
+        ''' Returns offsets, sources and weights arrays of the reversed graph, built once '''
+
+        if self._reverse is None:
+            size = len(self.nodes)
+            offsets = array('q', [0]) * (size+1)
+
+            for target in self.targets:
+                offsets[target+1] += 1
+
+            for i in range(size):
+                offsets[i+1] += offsets[i]
+
+            sources, weights = array('i', [0]) * len(self.targets), array('q', [0]) * len(self.targets)
+            positions = offsets[:-1]
+
+            for i in range(size):
+                for e in range(self.offsets[i], self.offsets[i+1]):
+                    target = self.targets[e]
+                    sources[positions[target]] = i
+                    weights[positions[target]] = self.weights[e]
+                    positions[target] += 1
+
+            self._reverse = offsets, sources, weights
+
+        return self._reverse
+
+    def get_weight(self, path=[]):
+        ''' Returns weight of a path in the graph
+
+        Args:
+            path (list): list of path nodes (optional, default=[])
+
+        Returns:
+            -1 if the path doesn't exist, total weight of the path otherwise
+        '''
+
+        weight = 0
+
+        if instrumentation.active() is not None:
+            instrumentation.count('edges_relaxed', max(len(path)-1, 0))
+
+        try:
+            indices = [self.index[node] for node in path]
+        except KeyError:
+            return -1 if len(path) > 1 else 0
+
+        for i, j in zip(indices, indices[1:]):
+            if i == j:
+                continue
+
+            start, end = self.offsets[i], self.offsets[i+1]
+
+            for k in range(start, end):
+                if self.targets[k] == j:
+                    weight += self.weights[k]
+                    break
+            else:
+                return -1
+
+        return weight
+
+    def encode_routes(self, routes):
+        ''' Interns paths of node names into a ragged array of node indices
+
+        Args:
+            routes (iterable): paths as lists of nodes (required)
+
+        Returns:
+            tuple of an array of the node indices of all paths, one after the
+            other, with len(nodes) for unknown nodes, and an array of the
+            len(routes)+1 offsets of the paths into it
+        '''
+
+        routes = routes if isinstance(routes, (list, tuple)) else list(routes)
+        unknown = itertools.repeat(len(self.nodes))
+
+        flat = array('i', map(self.index.get, itertools.chain.from_iterable(routes), unknown))
+        offsets = array('q', itertools.accumulate(map(len, routes), initial=0))
+
+        return flat, offsets
+
+    def get_weights(self, flat, offsets):
+        ''' Returns the weights of many paths at once
+
+        Paths are given as a ragged array of node indices, see encode_routes.
+        Edges are looked up in a hash table keyed by src*(len(nodes)+1)+dest,
+        one key per consecutive pair of indices, and the weight of a path is
+        the difference of the running totals at its ends. Missing edges weigh
+        more than any path, so a path has a missing edge if its weight is too
+        large. All per edge work runs inside map and accumulate, leaving one
+        Python step per path.
+
+        Args:
+            flat (array): node indices of all paths, one after the other (required)
+            offsets (array): len(paths)+1 offsets of the paths into flat (required)
+
+        Returns:
+            array of path weights, NO_PATH for paths with an unknown node or a
+            missing edge
+        '''
+
+        stride = len(self.nodes)+1
+        table = self._get_edge_table()
+        missing = (max(self.weights, default=0)+1) * len(flat) + 1
+
+        keys = map(add, map(mul, flat, itertools.repeat(stride)), itertools.islice(flat, 1, None))
+        totals = list(itertools.accumulate(map(table.get, keys, itertools.repeat(missing)), initial=0))
+        # empty paths at the end start and end one past the last node
+        totals.append(totals[-1])
+
+        starts = offsets[:-1]
+        ends = map(max, map(sub, itertools.islice(offsets, 1, None), itertools.repeat(1)), starts)
+        weights = map(sub, map(totals.__getitem__, ends), map(totals.__getitem__, starts))
+
+        return array('q', [weight if weight < missing else self.NO_PATH for weight in weights])
+
+    def _get_edge_table(self):
+        ''' Returns the map of src*(len(nodes)+1)+dest keys and edge weights, built once '''
+
+        if self._edge_table is None:
+            stride, table = len(self.nodes)+1, {}
+
+            for i in range(len(self.nodes)):
+                start, end = self.offsets[i], self.offsets[i+1]
+                table.update(zip(map(add, self.targets[start:end], itertools.repeat(i*stride)),
+                                 self.weights[start:end]))
+                # moving from a node to itself is free, as in get_weight
+                table[i*stride+i] = 0
+
+            self._edge_table = table
+
+        return self._edge_table
+
+    def get_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None):
+        ''' Returns all paths between src and dest node
+
+        Same conditions and results as Graph.get_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            num_nodes (int): exact number of nodes each path should have
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): maximum weight each path can have
+
+        Returns:
+            list of paths connecting source and destination nodes satisfying given
+            conditions.
+
+        Raises:
+            ValueError if all of num_nodes, max_nodes and max_weight are None
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        return list(self.iter_paths(src, dest, num_nodes=num_nodes, max_nodes=max_nodes, max_weight=max_weight))
+
+    def iter_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None, limit=None):
+        ''' Yields the paths get_paths would return, one at a time
+
+        Same conditions and results as Graph.iter_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            num_nodes (int): exact number of nodes each path should have
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): maximum weight each path can have
+            limit (int): maximum number of paths to yield (optional, default=None)
+
+        Returns:
+            iterator of paths connecting source and destination nodes satisfying
+            given conditions, in get_paths order.
+
+        Raises:
+            ValueError if all of num_nodes, max_nodes and max_weight are None
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        if src not in self.index or dest not in self.index:
+            raise ValueError('src or dest is not a valid graph node')
+
+        low, high, limit_weight = path_limits(num_nodes, max_nodes, max_weight)
+        adjacent = counted_adjacent(self.adjacent)
+        paths = walk_paths(adjacent, self.index[src], self.index[dest], low, high, limit_weight)
+        paths = counted_paths([self.nodes[i] for i in path] for path in paths)
+
+        return paths if limit is None else itertools.islice(paths, limit)
+
+    def iter_simple_paths(self, src, dest, limit=None):
+        ''' Yields paths between src and dest node which visit each node at most once
+
+        Same results as Graph.iter_simple_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            limit (int): maximum number of paths to yield (optional, default=None)
+
+        Returns:
+            iterator of paths connecting source and destination nodes, shortest first
+        '''
+
+        if src not in self.index or dest not in self.index:
+            return iter([])
+
+        paths = walk_simple_paths(counted_adjacent(self.adjacent), self.index[src], self.index[dest])
+        paths = counted_paths([self.nodes[i] for i in path] for path in paths)
+
+        return paths if limit is None else itertools.islice(paths, limit)
+
+    def count_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None, weight=None, min_nodes=0):
+        ''' Returns the number of paths between src and dest node
+
+        Same conditions and results as Graph.count_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            num_nodes (int): exact number of nodes each path should have
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): each path should weigh less than max_weight
+            weight (int): exact weight each path should have
+            min_nodes (int): minimum number of nodes each path should have (optional, default=0)
+
+        Returns:
+            number of paths connecting source and destination nodes satisfying
+            given conditions.
+
+        Raises:
+            ValueError if all of num_nodes, max_nodes, max_weight and weight are None
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        if src not in self.index or dest not in self.index:
+            raise ValueError('src or dest is not a valid graph node')
+
+        low, high, limit = path_limits(num_nodes, max_nodes, max_weight, weight, min_nodes)
+        src, dest = self.index[src], self.index[dest]
+        adjacent = counted_adjacent(self.adjacent)
+
+        if limit is None:
+            return count_paths_by_nodes(adjacent, src, dest, low, high)
+
+        return count_paths_by_weight(adjacent, src, dest, low, high, limit, weight)
+
+    def count_paths_from(self, src, max_nodes=None, max_weight=None):
+        ''' Returns the number of paths from src to every node, by path length
+
+        Same arguments and results as Graph.count_paths_from.
+
+        Args:
+            src (str): source node (required)
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): each path should weigh less than max_weight
+
+        Returns:
+            dict of path lengths and dicts of nodes and the number of paths
+            from src of that length ending at them
+
+        Raises:
+            ValueError if not exactly one of max_nodes and max_weight is provided
+            ValueError if src is not a valid node in the graph
+        '''
+
+        if src not in self.index:
+            raise ValueError('src is not a valid graph node')
+
+        if (max_nodes is None) == (max_weight is None):
+            raise ValueError('exactly one of max_nodes and max_weight should be provided')
+
+        if max_weight is None:
+            table = path_counts_by_nodes(counted_adjacent(self.adjacent), self.index[src], max_nodes)
+        else:
+            table = path_counts_by_weight(counted_adjacent(self.adjacent), self.index[src], max_weight-1)
+
+        return {length: {self.nodes[i]: count for i, count in counts.items()} for length, counts in table.items()}
+
+    def get_shortest_path(self, src, dest, method='tree', heuristic=None):
+        ''' Returns the shortest path between two nodes
+
+        See find_shortest_path for the available methods.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            method (str): one of SHORTEST_PATH_METHODS (optional, default='tree')
+            heuristic (function): lower bound of the distance of a node to dest, for astar
+
+        Returns:
+            list of nodes representing the shortest path between
+            given nodes. Will return empty list if no such path exists
+        '''
+
+        return self.find_shortest_path(src, dest, method, heuristic)[1]
+
+    def find_shortest_path(self, src, dest, method='tree', heuristic=None):
+        ''' Returns the shortest path between two nodes and its length
+
+        Same methods and results as Graph.find_shortest_path. Searches run
+        on node indices, and the heuristic is called with node names.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            method (str): one of SHORTEST_PATH_METHODS (optional, default='tree')
+            heuristic (function): lower bound of the distance of a node to dest, for astar
+
+        Returns:
+            tuple of the length of the shortest path and the list of its nodes,
+            (math.inf, []) if no such path exists
+
+        Raises:
+            ValueError if method is not one of SHORTEST_PATH_METHODS
+            ValueError if method is astar and heuristic is None
+        '''
+
+        if method not in self.SHORTEST_PATH_METHODS:
+            raise ValueError('method should be one of {}'.format(', '.join(self.SHORTEST_PATH_METHODS)))
+
+        if method == 'astar' and heuristic is None:
+            raise ValueError('astar needs a heuristic')
+
+        if method == 'tree' or src == dest:
+            tree = self.get_shortest_path_tree(src)
+            distance, path = tree.get_distance(dest), tree.get_path(dest)
+        elif src not in self.index or dest not in self.index:
+            return math.inf, []
+        else:
+            nodes, src, dest = self.nodes, self.index[src], self.index[dest]
+
+            if method == 'bidirectional':
+                distance, path = bidirectional_dijkstra(counted_adjacent(self.adjacent),
+                                                        counted_adjacent(self.incoming), src, dest)
+            else:
+                distance, path = astar(counted_adjacent(self.adjacent), src, dest, lambda i: heuristic(nodes[i]))
+
+            path = [nodes[i] for i in path]
+
+        instrumentation.count('paths_produced', bool(path))
+        return distance, path
+
+    def get_k_shortest_paths(self, src, dest, k):
+        ''' Returns the k shortest paths between two nodes which visit each node at most once
+
+        Same results as Graph.get_k_shortest_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            k (int): maximum number of paths to return (required)
+
+        Returns:
+            list of up to k tuples of path length and list of path nodes, in
+            increasing length
+
+        Raises:
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        if src not in self.index or dest not in self.index:
+            raise ValueError('src or dest is not a valid graph node')
+
+        nodes, start = self.nodes, self.index[src]
+
+        if src != dest:
+            paths = yen_k_shortest_paths(counted_adjacent(self.adjacent), start, self.index[dest], k)
+            instrumentation.count('paths_produced', len(paths))
+            return [(distance, [nodes[i] for i in path]) for distance, path in paths]
+
+        # cycles through src are paths to a copy of src that takes its incoming edges
+        end = object()
+
+        def adjacent(i):
+            return [(end if neighbour == start else neighbour, weight) for neighbour, weight in self.adjacent(i)]
+
+        paths = yen_k_shortest_paths(counted_adjacent(adjacent), start, end, k)
+        instrumentation.count('paths_produced', len(paths))
+
+        return [(distance, [nodes[i] for i in path[:-1]] + [src]) for distance, path in paths]
+
+    def get_shortest_path_tree(self, src):
+        ''' Returns the shortest path tree of a source node
+
+        Dijkstra runs on node indices; the resulting tree is keyed by node names
+        and cached per source node.
+
+        Args:
+            src (str): source node (required)
+
+        Returns:
+            ShortestPathTree of src
+        '''
+
+        tree = self._shortest_path_trees.get(src)
+
+        if tree is None:
+            tree = self._shortest_path_trees[src] = ShortestPathTree(src, *self._dijkstra(src))
+
+        return tree
+
+    def _dijkstra(self, src):
+        ''' Returns distances and parent nodes of every node reachable from src '''
+
+        if src not in self.index:
+            return {}, {}
+
+        distances, parent_nodes = dijkstra(counted_adjacent(self.adjacent), self.index[src])
+        nodes = self.nodes
+
+        return ({nodes[i]: distance for i, distance in distances.items()},
+                {nodes[i]: nodes[parent] for i, parent in parent_nodes.items()})
@@ -0,0 +1,262 @@
+'''
+
+Distances Module
+
+'''
+
+import json
+from array import array
+
+class DistanceMatrix:
+    ''' Distance Matrix Class
+
+    All-pairs shortest distances of a graph, stored as dense row-major arrays
+    indexed by node position so that every lookup is O(1).
+    The diagonal holds the length of the shortest cycle through a node, or 0
+    if there is none, matching ShortestPathTree.
+
+    Attributes:
+        nodes: list of graph nodes, in index order
+        index: map of nodes and their index
+        distances: array of shortest distances, NO_PATH if there is no path
+        next_hops: array of indices of the node following src on the shortest
+            path to dest, NO_PATH if there is no path
+    '''
+    NO_PATH = -1
+
+    def __init__(self, nodes, distances, next_hops):
+        ''' Initialize a distance matrix
+
+        Args:
+            nodes (list): list of graph nodes
+            distances (array): row-major array of len(nodes)**2 distances
+            next_hops (array): row-major array of len(nodes)**2 next hop indices
+        '''
+
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.distances = distances
+        self.next_hops = next_hops
+
+    @classmethod
+    def from_graph(cls, graph):
+        ''' Builds the distance matrix of a graph
+
+        Runs one heap-based Dijkstra per node, O(V (V+E) log V) overall.
+
+        Args:
+            graph (Graph or CompactGraph): graph to build the matrix for
+
+        Returns:
+            DistanceMatrix of the graph
+        '''
+
+        nodes = sorted(graph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        size = len(nodes)
+
+        distances = array('q', [cls.NO_PATH]) * (size*size)
+        next_hops = array('q', [cls.NO_PATH]) * (size*size)
+
+        for i, src in enumerate(nodes):
+            row = i*size
+            distances[row+i] = 0
+            node_distances, parent_nodes = graph._dijkstra(src)
+
+            for node, hop in _first_hops(src, parent_nodes, node_distances).items():
+                distances[row+index[node]] = node_distances[node]
+                next_hops[row+index[node]] = index[hop]
+
+        return cls(nodes, distances, next_hops)
+
+    def get_distance(self, src, dest):
+        ''' Returns the shortest distance between two nodes
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            length of the shortest path, 0 if src is dest and there is no
+            cycle through it, even if it is not a node, NO_PATH if no such
+            path exists
+        '''
+
+        try:
+            return self.distances[self.index[src]*len(self.nodes)+self.index[dest]]
+        except KeyError:
+            return 0 if src == dest else self.NO_PATH
+
+    def get_path(self, src, dest):
+        ''' Returns the shortest path between two nodes
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            list of nodes representing the shortest path, [src] if src is
+            dest and there is no cycle through it, even if it is not a node,
+            empty list if no such path exists
+        '''
+
+        if src not in self.index or dest not in self.index:
+            return [src] if src == dest else []
+
+        size, target = len(self.nodes), self.index[dest]
+        thisnode = self.index[src]
+        hop = self.next_hops[thisnode*size+target]
+
+        if hop == self.NO_PATH:
+            return [src] if src == dest else []
+
+        path = [src]
+
+        while True:
+            path.append(self.nodes[hop])
+
+            if hop == target:
+                return path
+
+            hop = self.next_hops[hop*size+target]
+
+    def add_node(self, node):
+        ''' Adds a node without any edges to the matrix
+
+        Args:
+            node (str): node to add (required)
+
+        Returns:
+            None
+        '''
+
+        if node in self.index:
+            return
+
+        size = len(self.nodes)
+        distances = array('q', [self.NO_PATH]) * ((size+1)**2)
+        next_hops = array('q', [self.NO_PATH]) * ((size+1)**2)
+
+        for i in range(size):
+            distances[i*(size+1):i*(size+1)+size] = self.distances[i*size:(i+1)*size]
+            next_hops[i*(size+1):i*(size+1)+size] = self.next_hops[i*size:(i+1)*size]
+
+        distances[-1] = 0
+        self.distances, self.next_hops = distances, next_hops
+        self.index[node] = size
+        self.nodes.append(node)
+
+    def insert_edge(self, src, dest, weight):
+        ''' Updates the matrix for a new edge or an edge whose weight decreased
+
+        Every improved path runs through the new edge, so only sources whose
+        distance to dest improves can have improved paths, and each of those
+        is updated in O(V) from the distances to src and from dest.
+        Unknown nodes are added to the matrix first.
+
+        Args:
+            src (str): start node of the edge (required)
+            dest (str): end node of the edge (required)
+            weight (int): weight of the edge, not larger than its previous weight (required)
+
+        Returns:
+            None
+        '''
+
+        self.add_node(src)
+        self.add_node(dest)
+
+        size = len(self.nodes)
+        u, v = self.index[src], self.index[dest]
+        distances, next_hops = self.distances, self.next_hops
+
+        def distance(x, y):
+            ''' Distance of x to y, 0 from a node to itself, None if there is no path '''
+            if x == y:
+                return 0
+
+            d = distances[x*size+y]
+            return None if d == self.NO_PATH else d
+
+        def current(x, y):
+            ''' Stored shortest distance of x to y, None if there is no path or cycle '''
+            return None if next_hops[x*size+y] == self.NO_PATH else distances[x*size+y]
+
+        from_dest = [(y, distance(v, y)) for y in range(size) if distance(v, y) is not None]
+
+        for x in range(size):
+            to_src = distance(x, u)
+
+            if to_src is None:
+                continue
+
+            to_dest = to_src + weight
+            first_hop = v if x == u else next_hops[x*size+u]
+
+            if x != v and current(x, v) is not None and to_dest >= current(x, v):
+                continue
+
+            for y, rest in from_dest:
+                if x == v and y != v:
+                    continue
+
+                candidate = current(x, y)
+
+                if candidate is None or to_dest + rest < candidate:
+                    distances[x*size+y] = to_dest + rest
+                    next_hops[x*size+y] = first_hop
+
+    def save(self, path):
+        ''' Saves the matrix to a file
+
+        The file holds a JSON header line with the node list followed by
+        the raw distance and next hop arrays.
+
+        Args:
+            path (str): path of the file to write
+        '''
+
+        with open(path, 'wb') as f:
+            f.write(json.dumps({'nodes': self.nodes}).encode('utf-8') + b'\n')
+            f.write(self.distances.tobytes())
+            f.write(self.next_hops.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        ''' Loads a matrix saved with save
+
+        Args:
+            path (str): path of the file to read
+
+        Returns:
+            DistanceMatrix read from the file
+        '''
+
+        with open(path, 'rb') as f:
+            nodes = json.loads(f.readline().decode('utf-8'))['nodes']
+            distances, next_hops = array('q'), array('q')
+            distances.fromfile(f, len(nodes)**2)
+            next_hops.fromfile(f, len(nodes)**2)
+
+        return cls(nodes, distances, next_hops)
+
+
+def _first_hops(src, parent_nodes, distances):
+    ''' Maps every node reachable from src to the first node after src on its shortest path '''
+
+    hops = {}
+
+    for node in distances:
+        chain = []
+
+        while node not in hops and parent_nodes[node] != src:
+            chain.append(node)
+            node = parent_nodes[node]
+
+        hop = hops.get(node, node)
+        hops[node] = hop
+
+        for thisnode in chain:
+            hops[thisnode] = hop
+
+    return hops
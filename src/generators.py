@@ -0,0 +1,105 @@
+'''
+
+Generators Module
+
+'''
+
+import math
+import random
+
+def station(i):
+    ''' Returns the station code of station number i '''
+    return 'S{}'.format(i)
+
+
+def random_network(num_stations, tracks_per_station=3, max_distance=9, seed=0):
+    ''' Generates tracks between uniformly random pairs of stations
+
+    Args:
+        num_stations (int): number of stations (required)
+        tracks_per_station (int): average number of tracks leaving a station (optional, default=3)
+        max_distance (int): maximum distance of a track (optional, default=9)
+        seed (int): random seed (optional, default=0)
+
+    Returns:
+        list of routes of the form (src, dest, distance)
+    '''
+
+    rng = random.Random(seed)
+    tracks = {}
+
+    if num_stations < 2:
+        return []
+
+    for _ in range(num_stations*tracks_per_station):
+        src, dest = rng.randrange(num_stations), rng.randrange(num_stations-1)
+        dest += dest >= src
+        tracks[src, dest] = rng.randint(1, max_distance)
+
+    return [(station(src), station(dest), distance) for (src, dest), distance in tracks.items()]
+
+
+def grid_network(num_stations, max_distance=9, seed=0):
+    ''' Generates a square grid of stations with tracks both ways between neighbours
+
+    Stations fill the grid row by row, so the last row may be partial.
+
+    Args:
+        num_stations (int): number of stations (required)
+        max_distance (int): maximum distance of a track (optional, default=9)
+        seed (int): random seed (optional, default=0)
+
+    Returns:
+        list of routes of the form (src, dest, distance)
+    '''
+
+    rng = random.Random(seed)
+    side = math.isqrt(num_stations)
+    side += side*side < num_stations
+    tracks = []
+
+    for i in range(num_stations):
+        neighbours = [i+side] if i+side < num_stations else []
+
+        if (i+1) % side and i+1 < num_stations:
+            neighbours.append(i+1)
+
+        for j in neighbours:
+            tracks.append((station(i), station(j), rng.randint(1, max_distance)))
+            tracks.append((station(j), station(i), rng.randint(1, max_distance)))
+
+    return tracks
+
+
+def scale_free_network(num_stations, tracks_per_station=2, max_distance=9, seed=0):
+    ''' Generates a scale-free network by preferential attachment
+
+    Every new station is connected to tracks_per_station existing stations
+    picked with probability proportional to their number of tracks, in a
+    random direction, which produces a few large hubs and many small stops.
+
+    Args:
+        num_stations (int): number of stations (required)
+        tracks_per_station (int): number of tracks of every new station (optional, default=2)
+        max_distance (int): maximum distance of a track (optional, default=9)
+        seed (int): random seed (optional, default=0)
+
+    Returns:
+        list of routes of the form (src, dest, distance)
+    '''
+
+    rng = random.Random(seed)
+    tracks, endpoints = {}, []
+
+    for i in range(1, num_stations):
+        targets = {rng.choice(endpoints) if endpoints else 0 for _ in range(tracks_per_station)}
+
+        for j in targets:
+            src, dest = (i, j) if rng.random() < 0.5 else (j, i)
+            tracks[src, dest] = rng.randint(1, max_distance)
+            endpoints += [i, j]
+
+    return [(station(src), station(dest), distance) for (src, dest), distance in tracks.items()]
+
+
+NETWORKS = {'random': random_network, 'grid': grid_network, 'scale_free': scale_free_network}
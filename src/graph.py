@@ -4,8 +4,13 @@ Graph Module
 
 '''
 
+import heapq
+import itertools
 import math
-from collections import defaultdict
+from collections import defaultdict, deque
+
+from src import instrumentation
+from src.instrumentation import counted_adjacent, counted_paths
 
 class Graph:
     ''' Graph Class
@@ -16,7 +21,9 @@ class Graph:
 
     Attributes:
         edges: adjacency map of nodes and weights
+        in_edges: reverse adjacency map, {B: {A: 5}} for the edge A -> B
         nodes: set of graph nodes
+        version: number of changes made to the graph
     '''
 
     def __init__(self, edges=[]):
@@ -27,7 +34,10 @@ class Graph:
         '''
 
         self.edges = defaultdict(dict)
+        self.in_edges = defaultdict(dict)
         self.nodes = set()
+        self.version = 0
+        self._shortest_path_trees = {}
 
         for edge in edges:
             if len(edge) > 2: self.add_edge(edge[0], edge[1], edge[2])
@@ -42,10 +52,109 @@ class Graph:
 
         Returns:
             None
+
+        Raises:
+            ValueError if weight is not positive
         '''
-        self.edges[src][dest] = (weight, color)
+        _check_weight(weight)
+        self.edges[src][dest] = self.in_edges[dest][src] = (weight, color)
         self.nodes.add(src)
         self.nodes.add(dest)
+        self._changed()
+
+    def remove_edge(self, src, dest):
+        ''' Removes an edge from the Graph
+
+        Both of its nodes stay in the graph.
+
+        Args:
+            src (str): start node of the edge (required)
+            dest (str): end node of the edge (required)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if there is no edge from src to dest
+        '''
+        if dest not in self.edges.get(src, {}):
+            raise ValueError('no edge from {} to {}'.format(src, dest))
+
+        del self.edges[src][dest]
+        del self.in_edges[dest][src]
+        self._changed()
+
+    def update_weight(self, src, dest, weight):
+        ''' Changes the weight of an edge
+
+        Args:
+            src (str): start node of the edge (required)
+            dest (str): end node of the edge (required)
+            weight (int): new weight of the edge (required)
+
+        Returns:
+            previous weight of the edge
+
+        Raises:
+            ValueError if there is no edge from src to dest
+            ValueError if weight is not positive
+        '''
+        if dest not in self.edges.get(src, {}):
+            raise ValueError('no edge from {} to {}'.format(src, dest))
+
+        _check_weight(weight)
+        previous, color = self.edges[src][dest]
+        self.edges[src][dest] = self.in_edges[dest][src] = (weight, color)
+        self._changed()
+
+        return previous
+
+    def add_edges(self, edges, color='B'):
+        ''' Adds many edges to the Graph at once
+
+        Faster than calling add_edge for each edge, and reads edges lazily so
+        they can be streamed from a file. Edges with the same weight share
+        one (weight, color) value.
+
+        Args:
+            edges (iterable): edge tuples of the form (src, dest, weight) (required)
+            color (str): color of the edges (optional, default='B')
+
+        Returns:
+            number of edges added
+
+        Raises:
+            ValueError if a weight is not positive
+        '''
+        adjacency, in_adjacency, add_node, values = self.edges, self.in_edges, self.nodes.add, {}
+        count = 0
+
+        try:
+            for src, dest, weight in edges:
+                value = values.get(weight)
+
+                if value is None:
+                    _check_weight(weight)
+                    value = values[weight] = (weight, color)
+
+                adjacency[src][dest] = in_adjacency[dest][src] = value
+                add_node(src)
+                add_node(dest)
+                count += 1
+        finally:
+            # edges added before a failure stay, so results computed without them are dropped
+            self._changed()
+
+        return count
+
+    def clear_shortest_path_trees(self):
+        ''' Drops the cached shortest path trees, e.g. to time queries from scratch '''
+        self._shortest_path_trees.clear()
+
+    def _changed(self):
+        ''' Bumps the graph version and drops results computed on the previous one '''
+        self.version += 1
+        self._shortest_path_trees.clear()
 
     def __str__(self):
         '''String representation of the graph
@@ -73,11 +182,16 @@ class Graph:
 
         weight = 0
 
+        if instrumentation.active() is not None:
+            instrumentation.count('edges_relaxed', max(len(path)-1, 0))
+
         try:
             for i in range(len(path)-1):
-                edges = self.edges[path[i]]
-                neighbour = path[i+1]
-                weight += 0 if path[i] == path[i+1] else edges[neighbour]
+                if path[i] not in self.nodes:
+                    return -1
+
+                if path[i] != path[i+1]:
+                    weight += self.edges[path[i]][path[i+1]][0]
         except KeyError:
             return -1
 
@@ -87,25 +201,76 @@ class Graph:
         pass
 
     def find_paths(self, src, dest):
-        paths = []
-        queue = []
+        ''' Returns all paths between src and dest node which visit each node at most once
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            list of paths connecting source and destination nodes, shortest first
+        '''
+
+        return list(self.iter_simple_paths(src, dest))
+
+    def iter_simple_paths(self, src, dest, limit=None):
+        ''' Yields paths between src and dest node which visit each node at most once
+
+        Queued paths share their prefixes, see walk_simple_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            limit (int): maximum number of paths to yield (optional, default=None)
+
+        Returns:
+            iterator of paths connecting source and destination nodes, shortest first
+        '''
 
-        path = []
-        path.append(src)
-        queue.append(path)
+        paths = counted_paths(walk_simple_paths(counted_adjacent(self.adjacent), src, dest))
+        return paths if limit is None else itertools.islice(paths, limit)
 
-        while queue:
-            path = queue.pop(0)
-            last = path[-1]
+    def iter_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None, limit=None):
+        ''' Yields the paths get_paths would return, one at a time
 
-            if last == dest:
-                paths.append(path)
+        Paths are produced lazily by a depth-first search with an explicit
+        stack that extends and truncates a single path in place, so memory
+        stays proportional to the longest path rather than to the number of
+        paths, and a caller can stop early. With a weight limit alone, the
+        search skips every branch that cannot reach dest within the remaining
+        weight, see walk_paths_within.
 
-            for nb in self.edges[last]:
-                if nb not in path:
-                    queue.append(path + [nb])
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            num_nodes (int): exact number of nodes each path should have
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): maximum weight each path can have
+            limit (int): maximum number of paths to yield (optional, default=None)
 
-        return paths
+        Returns:
+            iterator of paths connecting source and destination nodes satisfying
+            given conditions, in get_paths order.
+
+        Raises:
+            ValueError if all of num_nodes, max_nodes and max_weight are None
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        if src not in self.nodes or dest not in self.nodes:
+            raise ValueError('src or dest is not a valid graph node')
+
+        low, high, limit_weight = path_limits(num_nodes, max_nodes, max_weight)
+
+        if num_nodes is None and max_nodes is None:
+            paths = walk_paths_within(counted_adjacent(self.adjacent), counted_adjacent(self.incoming),
+                                      src, dest, limit_weight)
+        else:
+            paths = walk_paths(counted_adjacent(self.adjacent), src, dest, low, high, limit_weight)
+
+        paths = counted_paths(paths)
+
+        return paths if limit is None else itertools.islice(paths, limit)
 
     def get_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None):
         ''' Returns all paths between src and dest node
@@ -129,90 +294,759 @@ class Graph:
             ValueError if src or dest node is not a valid node in the graph
         '''
 
-        paths = []
+        return list(self.iter_paths(src, dest, num_nodes=num_nodes, max_nodes=max_nodes, max_weight=max_weight))
+
+    def count_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None, weight=None, min_nodes=0):
+        ''' Returns the number of paths between src and dest node
+
+        Counts the same paths get_paths would return without building them.
+        Without a weight condition paths are counted level by level: after k
+        steps, counts[node] holds the number of paths of length k from src
+        ending at node, so the cost is O(nodes + edges) per step.
+        With a weight condition counts are kept per (node, distance travelled)
+        instead, so the cost is bounded by nodes * weight * out-degree.
+
+        One of num_nodes, max_nodes, max_weight and weight should be provided,
+        otherwise will raise a ValueError.
 
-        if src not in self.edges or dest not in self.edges:
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            num_nodes (int): exact number of nodes each path should have
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): each path should weigh less than max_weight
+            weight (int): exact weight each path should have
+            min_nodes (int): minimum number of nodes each path should have (optional, default=0)
+
+        Returns:
+            number of paths connecting source and destination nodes satisfying
+            given conditions.
+
+        Raises:
+            ValueError if all of num_nodes, max_nodes, max_weight and weight are None
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        if src not in self.nodes or dest not in self.nodes:
             raise ValueError('src or dest is not a valid graph node')
 
-        if num_nodes is None and max_nodes is None and max_weight is None:
-            raise ValueError('num_nodes, max_nodes and max_weight cannot be all None')
+        low, high, limit = path_limits(num_nodes, max_nodes, max_weight, weight, min_nodes)
+        adjacent = counted_adjacent(self.adjacent)
+
+        if limit is None:
+            return count_paths_by_nodes(adjacent, src, dest, low, high)
+
+        return count_paths_by_weight(adjacent, src, dest, low, high, limit, weight)
+
+    def count_paths_from(self, src, max_nodes=None, max_weight=None):
+        ''' Returns the number of paths from src to every node, by path length
+
+        A single table answers count_paths for every destination and any
+        smaller limit, so queries sharing a source can share one computation.
+
+        Exactly one of max_nodes and max_weight should be provided, otherwise
+        will raise a ValueError.
+
+        Args:
+            src (str): source node (required)
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): each path should weigh less than max_weight
+
+        Returns:
+            dict of path lengths (number of edges with max_nodes, weight with
+            max_weight) and dicts of nodes and the number of paths from src
+            of that length ending at them
+
+        Raises:
+            ValueError if not exactly one of max_nodes and max_weight is provided
+            ValueError if src is not a valid node in the graph
+        '''
 
-        if (num_nodes is None or num_nodes == 0) and \
-            (max_nodes is None or max_nodes >= 0) and \
-            (max_weight is None or max_weight > 0) and \
-            src == dest:
-            paths.append([src])
+        if src not in self.nodes:
+            raise ValueError('src is not a valid graph node')
 
-        if (num_nodes is None or num_nodes > 0) and \
-            (max_nodes is None or max_nodes >= 0) and \
-            (max_weight is None or max_weight > 0):
+        if (max_nodes is None) == (max_weight is None):
+            raise ValueError('exactly one of max_nodes and max_weight should be provided')
 
-            for neighbour, weight in self.edges[src].items():
-                nb_num_nodes = num_nodes if num_nodes is None else num_nodes-1
-                nb_max_nodes = max_nodes if max_nodes is None else max_nodes-1
-                nb_max_weight = max_weight if max_weight is None else max_weight-weight
+        if max_weight is None:
+            return path_counts_by_nodes(counted_adjacent(self.adjacent), src, max_nodes)
 
-                nb_paths = self.get_paths(neighbour, dest, num_nodes=nb_num_nodes, max_nodes=nb_max_nodes, max_weight=nb_max_weight)
+        return path_counts_by_weight(counted_adjacent(self.adjacent), src, max_weight-1)
 
-                for path in nb_paths:
-                    paths.append([src]+path)
+    def adjacent(self, node):
+        ''' Returns (neighbour, weight) pairs of the outgoing edges of a node '''
+        return [(neighbour, weight) for neighbour, (weight, _) in self.edges.get(node, {}).items()]
 
-        return paths
+    def incoming(self, node):
+        ''' Returns (neighbour, weight) pairs of the incoming edges of a node '''
+        return [(neighbour, weight) for neighbour, (weight, _) in self.in_edges.get(node, {}).items()]
 
-    def get_shortest_path(self, src, dest):
+    SHORTEST_PATH_METHODS = ('tree', 'bidirectional', 'astar')
+
+    def get_shortest_path(self, src, dest, method='tree', heuristic=None):
         ''' Returns the shortest path between two nodes
 
-        Implementation of Dijkstra's algorithm for shortest paths
+        See find_shortest_path for the available methods.
 
         Args:
             src (str): source node (required)
             dest (str): destination node (required)
+            method (str): one of SHORTEST_PATH_METHODS (optional, default='tree')
+            heuristic (function): lower bound of the distance of a node to dest, for astar
 
         Returns:
             list of nodes representing the shortest path between
             given nodes. Will return empty list if no such path exists
         '''
 
-        distances = {node: math.inf for node in self.nodes}
-        parent_nodes = {node: None for node in self.nodes}
+        return self.find_shortest_path(src, dest, method, heuristic)[1]
 
-        distances[src] = 0
-        nodes = list(self.nodes)
+    def find_shortest_path(self, src, dest, method='tree', heuristic=None):
+        ''' Returns the shortest path between two nodes and its length
 
-        while nodes:
-            thisnode = min(nodes, key=lambda node: distances[node])
+        With method tree the path is read off the cached shortest path tree of
+        src, which is best when many destinations are queried from one source.
+        For a single query, bidirectional searches forward from src and
+        backward from dest over the incoming edges and stops once the two
+        searches meet, and astar searches from src towards dest guided by a
+        heuristic, e.g. the straight line distance between station coordinates.
+        The heuristic must never overestimate the distance to dest.
+        A path from a node to itself is always read off its shortest path tree.
 
-            if distances[thisnode] == math.inf:
-                break
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            method (str): one of SHORTEST_PATH_METHODS (optional, default='tree')
+            heuristic (function): lower bound of the distance of a node to dest, for astar
 
-            for neighbour, weight in self.edges[thisnode].items():
-                alt_distance = distances[thisnode] + weight
+        Returns:
+            tuple of the length of the shortest path and the list of its nodes,
+            (math.inf, []) if no such path exists
 
-                if alt_distance < distances[neighbour]:
-                    distances[neighbour] = alt_distance
-                    parent_nodes[neighbour] = thisnode
+        Raises:
+            ValueError if method is not one of SHORTEST_PATH_METHODS
+            ValueError if method is astar and heuristic is None
+        '''
+
+        if method not in self.SHORTEST_PATH_METHODS:
+            raise ValueError('method should be one of {}'.format(', '.join(self.SHORTEST_PATH_METHODS)))
+
+        if method == 'astar' and heuristic is None:
+            raise ValueError('astar needs a heuristic')
+
+        if method == 'tree' or src == dest:
+            tree = self.get_shortest_path_tree(src)
+            distance, path = tree.get_distance(dest), tree.get_path(dest)
+        elif src not in self.nodes or dest not in self.nodes:
+            return math.inf, []
+        elif method == 'bidirectional':
+            distance, path = bidirectional_dijkstra(counted_adjacent(self.adjacent),
+                                                    counted_adjacent(self.incoming), src, dest)
+        else:
+            distance, path = astar(counted_adjacent(self.adjacent), src, dest, heuristic)
 
-            # to handle case where both src and dest is the same
-            if thisnode == src == dest:
-                distances[thisnode] = math.inf
+        instrumentation.count('paths_produced', bool(path))
+        return distance, path
 
-            nodes.remove(thisnode)
+    def get_k_shortest_paths(self, src, dest, k):
+        ''' Returns the k shortest paths between two nodes which visit each node at most once
 
-        path, thisnode = [], dest
+        Implementation of Yen's algorithm: every path after the first is
+        found by a shortest path search from a node of a previous path with
+        the edges used by earlier paths sharing the same prefix blocked, so
+        the cost grows with k rather than with the number of paths.
+        Paths from a node to itself are its cycles.
 
-        while parent_nodes[thisnode] is not None and parent_nodes[thisnode] != dest:
-            path.insert(0, thisnode)
-            thisnode = parent_nodes[thisnode]
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            k (int): maximum number of paths to return (required)
 
-        if path:
-            path.insert(0, thisnode)
+        Returns:
+            list of up to k tuples of path length and list of path nodes, in
+            increasing length
 
-        if src == dest:
-            path.insert(0, src)
+        Raises:
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        if src not in self.nodes or dest not in self.nodes:
+            raise ValueError('src or dest is not a valid graph node')
+
+        if src != dest:
+            paths = yen_k_shortest_paths(counted_adjacent(self.adjacent), src, dest, k)
+            instrumentation.count('paths_produced', len(paths))
+            return paths
+
+        # cycles through src are paths to a copy of src that takes its incoming edges
+        end = object()
+
+        def adjacent(node):
+            return [(end if neighbour == src else neighbour, weight) for neighbour, weight in self.adjacent(node)]
+
+        paths = yen_k_shortest_paths(counted_adjacent(adjacent), src, end, k)
+        instrumentation.count('paths_produced', len(paths))
+
+        return [(distance, path[:-1] + [src]) for distance, path in paths]
+
+    def get_shortest_path_tree(self, src):
+        ''' Returns the shortest path tree of a source node
+
+        Trees are cached per source node until the graph changes, so answering
+        many destinations from the same source costs a single Dijkstra run.
+
+        Args:
+            src (str): source node (required)
+
+        Returns:
+            ShortestPathTree of src
+        '''
+
+        tree = self._shortest_path_trees.get(src)
+
+        if tree is None:
+            tree = self._shortest_path_trees[src] = ShortestPathTree(src, *self._dijkstra(src))
+
+        return tree
+
+    def _dijkstra(self, src):
+        ''' Returns distances and parent nodes of every node reachable from src '''
+        return dijkstra(counted_adjacent(self.adjacent), src)
+
+
+class ShortestPathTree:
+    ''' Shortest Path Tree Class
+
+    Shortest paths from a single source node to every reachable node.
+    The source itself is reached through its shortest cycle, if any.
+
+    Attributes:
+        source: source node of the tree
+        distances: map of reachable nodes and their shortest distance from source
+        parent_nodes: map of reachable nodes and their parent node in the tree
+    '''
+
+    def __init__(self, source, distances, parent_nodes):
+        self.source = source
+        self.distances = distances
+        self.parent_nodes = parent_nodes
+
+    def get_distance(self, dest):
+        ''' Returns the length of the path returned by get_path
+
+        Args:
+            dest (str): destination node (required)
+
+        Returns:
+            length of the shortest path to dest, math.inf if there is no such path
+        '''
+
+        if dest not in self.distances:
+            return 0 if dest == self.source else math.inf
+
+        return self.distances[dest]
+
+    def get_path(self, dest):
+        ''' Returns the shortest path from source to dest
+
+        Args:
+            dest (str): destination node (required)
+
+        Returns:
+            list of nodes representing the shortest path. Will return [source] if
+            dest is source and there is no cycle through it, empty list if no
+            such path exists
+        '''
+
+        if dest not in self.distances:
+            return [dest] if dest == self.source else []
+
+        path, thisnode = [dest], self.parent_nodes[dest]
+
+        while thisnode != self.source:
+            path.append(thisnode)
+            thisnode = self.parent_nodes[thisnode]
+
+        path.append(self.source)
+        path.reverse()
 
         return path
 
 
-edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
-graph = Graph(edges)
-print(graph.find_paths('A', 'D'))
+# Traversals shared by graph representations. Each takes an adjacent(node)
+# function returning (neighbour, weight) pairs, so they run unchanged on
+# node names (Graph) or node indices (CompactGraph).
+
+def _check_weight(weight):
+    ''' Raises ValueError unless weight is positive
+
+    Weight-bounded counts and enumerations rely on every edge moving a
+    path further, and zero weight cycles would make them unbounded.
+    '''
+    if weight <= 0:
+        raise ValueError('edge weights should be positive, not {}'.format(weight))
+
+
+def path_limits(num_nodes=None, max_nodes=None, max_weight=None, weight=None, min_nodes=0):
+    ''' Normalizes path conditions into edge and weight bounds
+
+    Args:
+        num_nodes (int): exact number of nodes each path should have
+        max_nodes (int): maximum number of nodes each path can have
+        max_weight (int): each path should weigh less than max_weight
+        weight (int): exact weight each path should have
+        min_nodes (int): minimum number of nodes each path should have (optional, default=0)
+
+    Returns:
+        tuple (low, high, limit) where paths have between low and high edges
+        and weigh at most limit. high or limit are None when unbounded.
+
+    Raises:
+        ValueError if all of num_nodes, max_nodes, max_weight and weight are None
+    '''
+
+    if num_nodes is None and max_nodes is None and max_weight is None and weight is None:
+        raise ValueError('num_nodes, max_nodes, max_weight and weight cannot be all None')
+
+    low, high = (0, max_nodes) if num_nodes is None else (num_nodes, num_nodes)
+
+    if num_nodes is not None and max_nodes is not None:
+        high = min(high, max_nodes)
+
+    low = max(low, min_nodes)
+
+    # paths weigh strictly less than max_weight, as in get_paths
+    limit = weight if max_weight is None else max_weight-1
+
+    if weight is not None:
+        limit = min(limit, weight)
+
+    return low, high, limit
+
+
+def count_paths_by_nodes(adjacent, src, dest, low, high):
+    ''' Counts paths from src to dest having between low and high edges '''
+
+    total, counts = 0, {src: 1}
+
+    for step in range(high+1):
+        if step >= low:
+            total += counts.get(dest, 0)
+
+        if step == high or not counts:
+            break
+
+        next_counts = defaultdict(int)
+
+        for node, count in counts.items():
+            for neighbour, _ in adjacent(node):
+                next_counts[neighbour] += count
+
+        counts = next_counts
+
+    return total
+
+
+def path_counts_by_nodes(adjacent, src, high):
+    ''' Maps every number of edges up to high to the number of paths from src of that many edges ending at each node '''
+
+    table, counts = {}, {src: 1}
+
+    for step in range(high+1):
+        if not counts:
+            break
+
+        table[step] = counts
+
+        if step == high:
+            break
+
+        next_counts = defaultdict(int)
+
+        for node, count in counts.items():
+            for neighbour, _ in adjacent(node):
+                next_counts[neighbour] += count
+
+        counts = dict(next_counts)
+
+    return table
+
+
+def path_counts_by_weight(adjacent, src, limit):
+    ''' Maps every weight up to limit to the number of paths from src of that weight ending at each node '''
+
+    table = {}
+    buckets = defaultdict(lambda: defaultdict(int))
+    buckets[0][src] = 1
+
+    for distance in range(limit+1):
+        if distance not in buckets:
+            continue
+
+        counts = table[distance] = dict(buckets.pop(distance))
+
+        for node, count in counts.items():
+            for neighbour, edge_weight in adjacent(node):
+                if distance+edge_weight <= limit:
+                    buckets[distance+edge_weight][neighbour] += count
+
+    return table
+
+
+def count_paths_by_weight(adjacent, src, dest, low, high, limit, weight=None):
+    ''' Counts paths from src to dest weighing at most (or exactly) limit
+
+    States are (node, steps) pairs bucketed by the distance travelled so far.
+    Buckets are processed in increasing distance and dropped once expanded,
+    so only the buckets within one edge weight of the current distance are
+    kept in memory. When there is no upper bound on the number of edges,
+    steps are capped at low since longer paths are indistinguishable.
+    '''
+
+    total = 0
+    buckets = defaultdict(lambda: defaultdict(int))
+    buckets[0][(src, 0)] = 1
+
+    for distance in range(limit+1):
+        if distance not in buckets:
+            continue
+
+        states = buckets.pop(distance)
+
+        for (node, steps), count in states.items():
+            if node == dest and steps >= low and (weight is None or distance == weight):
+                total += count
+
+            if high is not None and steps >= high:
+                continue
+
+            next_steps = steps+1 if high is not None else min(steps+1, low)
+
+            for neighbour, edge_weight in adjacent(node):
+                if distance+edge_weight <= limit:
+                    buckets[distance+edge_weight][(neighbour, next_steps)] += count
+
+    return total
+
+
+def walk_paths(adjacent, src, dest, low, high, limit, weight=None):
+    ''' Yields paths from src to dest having between low and high edges weighing at most limit
+
+    Depth-first search with an explicit stack of neighbour iterators, so paths
+    come out in the same order as the recursion in Graph.get_paths. The current
+    path is a single list extended and truncated in place; each yielded path
+    is a copy of it.
+    '''
+
+    path, distances = [src], [0]
+    stack = [iter(adjacent(src))]
+
+    if src == dest and low == 0 and (high is None or high >= 0) and \
+        (weight is None or weight == 0) and (limit is None or limit >= 0):
+        yield list(path)
+
+    while stack:
+        for neighbour, edge_weight in stack[-1]:
+            distance = distances[-1]+edge_weight
+
+            if (high is not None and len(path) > high) or (limit is not None and distance > limit):
+                continue
+
+            path.append(neighbour)
+            distances.append(distance)
+
+            if neighbour == dest and len(path) > low and (weight is None or distance == weight):
+                yield list(path)
+
+            stack.append(iter(adjacent(neighbour)))
+            break
+        else:
+            stack.pop()
+            path.pop()
+            distances.pop()
+
+
+def walk_paths_within(adjacent, incoming, src, dest, limit):
+    ''' Yields paths from src to dest weighing at most limit, in walk_paths order
+
+    The shortest distance to dest of every node within limit of it is
+    computed first by a Dijkstra search from dest over the incoming edges. A step is only taken
+    if dest is still within reach of the remaining weight, so every branch
+    of the search produces at least one path and no dead end is explored.
+    The steps allowed from a node with a given remaining weight are
+    memoized, so the search is a walk over a shared graph of (node,
+    remaining weight) states whose size is bounded by nodes * limit,
+    expanded lazily into paths.
+    '''
+
+    to_dest = dijkstra(incoming, dest, limit)[0]
+    to_dest[dest] = 0
+    steps = {}
+
+    def next_steps(node, budget):
+        key = (node, budget)
+
+        if key not in steps:
+            steps[key] = [(neighbour, budget-weight) for neighbour, weight in adjacent(node)
+                          if to_dest.get(neighbour, math.inf) <= budget-weight]
+
+        return steps[key]
+
+    if src == dest and limit >= 0:
+        yield [src]
+
+    if to_dest.get(src, math.inf) > limit and src != dest:
+        return
+
+    path, stack = [src], [iter(next_steps(src, limit))]
+
+    while stack:
+        for neighbour, budget in stack[-1]:
+            path.append(neighbour)
+
+            if neighbour == dest:
+                yield list(path)
+
+            stack.append(iter(next_steps(neighbour, budget)))
+            break
+        else:
+            stack.pop()
+            path.pop()
+
+
+def walk_simple_paths(adjacent, src, dest):
+    ''' Yields paths from src to dest which visit each node at most once, shortest first
+
+    Breadth-first search over a deque. Queued paths are linked (node, parent)
+    entries, so paths sharing a prefix share its entries instead of copying
+    it; a list is only built for the paths that are yielded.
+    '''
+
+    queue = deque([(src, None)])
+
+    while queue:
+        entry = queue.popleft()
+
+        if entry[0] == dest:
+            yield _unlink(entry)
+
+        visited, link = set(), entry
+
+        while link is not None:
+            visited.add(link[0])
+            link = link[1]
+
+        for neighbour, _ in adjacent(entry[0]):
+            if neighbour not in visited:
+                queue.append((neighbour, entry))
+
+
+def _unlink(entry):
+    ''' Builds the path ending at a linked (node, parent) entry '''
+
+    path = []
+
+    while entry is not None:
+        path.append(entry[0])
+        entry = entry[1]
+
+    path.reverse()
+    return path
+
+
+def bidirectional_dijkstra(adjacent, incoming, src, dest):
+    ''' Bidirectional Dijkstra's algorithm for the shortest path between two distinct nodes
+
+    Alternately settles the closest node of a forward search from src and a
+    backward search from dest over incoming edges. Every relaxed edge that
+    reaches a node labelled by the other search is a candidate path; the
+    search stops as soon as the sum of both frontiers exceeds the best one.
+
+    Returns:
+        tuple of the length of the shortest path and the list of its nodes,
+        (math.inf, []) if no such path exists
+    '''
+
+    distances, parent_nodes = ({src: 0}, {dest: 0}), ({src: None}, {dest: None})
+    settled, heaps = (set(), set()), ([(0, 0, src)], [(0, 0, dest)])
+    neighbours, counter = (adjacent, incoming), itertools.count(1)
+    best, meeting = math.inf, None
+
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        distance, _, thisnode = heapq.heappop(heaps[side])
+
+        if thisnode in settled[side]:
+            continue
+
+        settled[side].add(thisnode)
+        other = distances[1-side]
+
+        for neighbour, weight in neighbours[side](thisnode):
+            alt_distance = distance+weight
+
+            if alt_distance < distances[side].get(neighbour, math.inf):
+                distances[side][neighbour] = alt_distance
+                parent_nodes[side][neighbour] = thisnode
+                heapq.heappush(heaps[side], (alt_distance, next(counter), neighbour))
+
+            if neighbour in other and alt_distance + other[neighbour] < best:
+                best = alt_distance + other[neighbour]
+                meeting = (thisnode, neighbour) if side == 0 else (neighbour, thisnode)
+
+    # both searches start with one push and count from 1
+    instrumentation.count('heap_pushes', next(counter)+1)
+
+    if meeting is None:
+        return math.inf, []
+
+    path, thisnode = [], meeting[0]
+
+    while thisnode is not None:
+        path.append(thisnode)
+        thisnode = parent_nodes[0][thisnode]
+
+    path.reverse()
+    thisnode = meeting[1]
+
+    while thisnode is not None:
+        path.append(thisnode)
+        thisnode = parent_nodes[1][thisnode]
+
+    return best, path
+
+
+def yen_k_shortest_paths(adjacent, src, dest, k):
+    ''' Yen's algorithm for the k shortest paths between two distinct nodes which visit each node at most once
+
+    Returns:
+        list of up to k tuples of path length and list of path nodes, in
+        increasing length
+    '''
+
+    def no_heuristic(node):
+        return 0
+
+    distance, path = astar(adjacent, src, dest, no_heuristic)
+
+    if not path or k <= 0:
+        return []
+
+    paths, candidates, seen = [(distance, path)], [], {tuple(path)}
+    counter = itertools.count()
+
+    while len(paths) < k:
+        path = paths[-1][1]
+        root_distance = 0
+
+        for i, spur in enumerate(path[:-1]):
+            root = path[:i+1]
+            blocked_nodes = set(root[:-1])
+            blocked_edges = {(spur, other[i+1]) for _, other in paths if other[:i+1] == root}
+
+            def spur_adjacent(node):
+                return [(neighbour, weight) for neighbour, weight in adjacent(node)
+                        if neighbour not in blocked_nodes and (node, neighbour) not in blocked_edges]
+
+            spur_distance, spur_path = astar(spur_adjacent, spur, dest, no_heuristic)
+
+            if spur_path and tuple(root[:-1] + spur_path) not in seen:
+                seen.add(tuple(root[:-1] + spur_path))
+                heapq.heappush(candidates, (root_distance+spur_distance, next(counter), root[:-1] + spur_path))
+
+            root_distance += dict(adjacent(spur))[path[i+1]]
+
+        if not candidates:
+            break
+
+        distance, _, path = heapq.heappop(candidates)
+        paths.append((distance, path))
+
+    instrumentation.count('heap_pushes', next(counter))
+    return paths
+
+
+def astar(adjacent, src, dest, heuristic):
+    ''' A* search for the shortest path between two distinct nodes
+
+    Nodes are expanded in order of distance from src plus heuristic(node).
+    Nodes may be expanded again when a shorter path to them is found, so the
+    heuristic only needs to be admissible, not consistent.
+
+    Returns:
+        tuple of the length of the shortest path and the list of its nodes,
+        (math.inf, []) if no such path exists
+    '''
+
+    distances, parent_nodes = {src: 0}, {src: None}
+    heap, counter = [(heuristic(src), 0, 0, src)], itertools.count(1)
+
+    while heap:
+        _, _, distance, thisnode = heapq.heappop(heap)
+
+        if distance > distances[thisnode]:
+            continue
+
+        if thisnode == dest:
+            instrumentation.count('heap_pushes', next(counter))
+            path = []
+
+            while thisnode is not None:
+                path.append(thisnode)
+                thisnode = parent_nodes[thisnode]
+
+            path.reverse()
+            return distance, path
+
+        for neighbour, weight in adjacent(thisnode):
+            alt_distance = distance+weight
+
+            if alt_distance < distances.get(neighbour, math.inf):
+                distances[neighbour] = alt_distance
+                parent_nodes[neighbour] = thisnode
+                heapq.heappush(heap, (alt_distance+heuristic(neighbour), next(counter), alt_distance, neighbour))
+
+    instrumentation.count('heap_pushes', next(counter))
+    return math.inf, []
+
+
+def dijkstra(adjacent, src, limit=None):
+    ''' Implementation of Dijkstra's algorithm for shortest paths with a binary heap
+
+    The search starts from the neighbours of src rather than src itself, so
+    src is settled at the length of its shortest cycle, if there is one.
+    With a limit, the search stops at nodes farther than limit.
+
+    Returns:
+        tuple of distances and parent nodes of every node reachable from src
+    '''
+
+    distances, parent_nodes, tentative = {}, {}, {}
+    heap, counter = [], itertools.count()
+
+    def relax(node, neighbour, distance):
+        if neighbour not in distances and distance < tentative.get(neighbour, math.inf):
+            tentative[neighbour] = distance
+            parent_nodes[neighbour] = node
+            heapq.heappush(heap, (distance, next(counter), neighbour))
+
+    for neighbour, weight in adjacent(src):
+        relax(src, neighbour, weight)
+
+    while heap:
+        distance, _, thisnode = heapq.heappop(heap)
+
+        if limit is not None and distance > limit:
+            break
+
+        if thisnode in distances:
+            continue
+
+        distances[thisnode] = distance
+
+        for neighbour, weight in adjacent(thisnode):
+            relax(thisnode, neighbour, distance+weight)
+
+    instrumentation.count('heap_pushes', next(counter))
+    return distances, parent_nodes
+
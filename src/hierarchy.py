@@ -0,0 +1,415 @@
+'''
+
+Contraction Hierarchy Module
+
+'''
+
+import heapq
+import json
+import math
+from array import array
+
+from src import instrumentation
+from src.graph import Graph
+
+class ContractionHierarchy:
+    ''' Contraction Hierarchy Class
+
+    Shortest paths between distinct nodes of a graph, answered by searching
+    only a small upper part of it. Nodes are contracted one at a time in
+    order of importance: a contracted node is removed, and a shortcut edge
+    replaces every shortest path through it that has no witness path of
+    the same length around it. The rank of a node is its position in the
+    contraction order.
+
+    A shortest path then always climbs to its highest ranked node and
+    descends from it, so a query runs Dijkstra's algorithm forward from
+    the source along edges to higher ranked nodes and backward from the
+    destination along edges from higher ranked nodes, and the two searches
+    meet at the top of the shortest path. Every shortcut remembers the node
+    it bypasses, from which the path is unpacked.
+
+    Contraction stops once the next node has more than CORE_DEGREE
+    neighbours left, as witness searches through such a dense core cost
+    more than they save. The core is left uncontracted: its nodes rank
+    above all others and keep every edge among them both upward and
+    downward, so both searches cross it like the plain graph. Grid
+    networks of 10,000 nodes keep under a tenth of their nodes in the core
+    and scale-free ones a few percent, but random networks, which have no
+    hierarchy to speak of, keep about a third, e.g. 3800 of 10,000.
+
+    Edges are stored as flat arrays, with the edges of node i in
+    positions offsets[i] to offsets[i+1]: upward from the start of every
+    edge to a higher ranked end, and downward at the end of every edge
+    from a higher ranked start.
+
+    Attributes:
+        nodes: list of graph nodes, in index order
+        index: map of nodes and their index
+        rank: array of node ranks
+        upward: tuple of offsets, ends, weights and bypassed nodes arrays of upward edges
+        downward: tuple of offsets, starts, weights and bypassed nodes arrays of downward edges
+    '''
+    NO_PATH = -1
+    WITNESS_LIMIT = 64
+    CORE_DEGREE = 32
+
+    def __init__(self, nodes, rank, upward, downward):
+        ''' Initialize a contraction hierarchy
+
+        Args:
+            nodes (list): list of graph nodes
+            rank (array): rank of every node
+            upward (tuple): offsets, ends, weights and bypassed nodes (NO_PATH
+                for original edges) arrays of upward edges
+            downward (tuple): offsets, starts, weights and bypassed nodes
+                arrays of downward edges
+        '''
+
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.rank = rank
+        self.upward = upward
+        self.downward = downward
+
+    @classmethod
+    def from_graph(cls, graph):
+        ''' Builds the contraction hierarchy of a graph
+
+        Nodes are contracted by lowest edge difference, the number of
+        shortcuts their contraction adds minus the number of edges it
+        removes, plus the number of their neighbours already contracted so
+        that contraction spreads evenly. Priorities are updated lazily.
+        Witness searches give up after WITNESS_LIMIT nodes, which may add
+        unneeded shortcuts but never wrong ones. Nodes with more than
+        CORE_DEGREE neighbours left when they come up are not contracted,
+        which bounds the cost of every witness search; without the core, a
+        random network of 2000 stops took 9 seconds to build, and one of
+        10,000 stops did not finish in 10 minutes.
+
+        Args:
+            graph (Graph or CompactGraph): graph to build the hierarchy for
+
+        Returns:
+            ContractionHierarchy of the graph
+        '''
+
+        if isinstance(graph, Graph):
+            nodes = sorted(graph.nodes)
+            index = {node: i for i, node in enumerate(nodes)}
+            edges = ((index[node], index[neighbour], weight) for node in nodes for neighbour, weight in graph.adjacent(node))
+        else:
+            # compact graphs already number their nodes
+            nodes = list(graph.nodes)
+            edges = ((i, j, weight) for i in range(len(nodes)) for j, weight in graph.adjacent(i))
+
+        size = len(nodes)
+
+        # remaining graph, self loops never lie on a path between distinct nodes
+        out, inn = [{} for _ in range(size)], [{} for _ in range(size)]
+
+        for i, j, weight in edges:
+            if i != j and weight < out[i].get(j, math.inf):
+                out[i][j] = inn[j][i] = weight
+
+        bypassed, contracted_neighbours = {}, [0] * size
+        rank = array('q', [0]) * size
+        up, down = [None] * size, [None] * size
+
+        def priority(v, shortcuts):
+            return len(shortcuts) - len(out[v]) - len(inn[v]) + contracted_neighbours[v]
+
+        def place(v, position):
+            rank[v] = position
+            up[v] = [(x, weight, bypassed.get((v, x), cls.NO_PATH)) for x, weight in out[v].items()]
+            down[v] = [(u, weight, bypassed.get((u, v), cls.NO_PATH)) for u, weight in inn[v].items()]
+
+        heap = [(priority(v, _shortcuts(out, inn, v, cls.WITNESS_LIMIT)), v) for v in range(size)]
+        heapq.heapify(heap)
+        position = 0
+
+        while heap:
+            _, v = heapq.heappop(heap)
+
+            if len(out[v]) + len(inn[v]) > cls.CORE_DEGREE:
+                heapq.heappush(heap, (0, v))
+                break
+
+            shortcuts = _shortcuts(out, inn, v, cls.WITNESS_LIMIT)
+            current = priority(v, shortcuts)
+
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            for u, x, weight in shortcuts:
+                if weight < out[u].get(x, math.inf):
+                    out[u][x] = inn[x][u] = weight
+                    bypassed[u, x] = v
+
+            place(v, position)
+            position += 1
+
+            for x in out[v]:
+                del inn[x][v]
+                contracted_neighbours[x] += 1
+
+            for u in inn[v]:
+                del out[u][v]
+                contracted_neighbours[u] += 1
+
+            out[v], inn[v] = {}, {}
+
+        # the core keeps all of its edges both upward and downward
+        for position, v in enumerate(sorted(v for _, v in heap), position):
+            place(v, position)
+
+        return cls(nodes, rank, _flatten(up), _flatten(down))
+
+    def _search(self, src, dest):
+        ''' Bidirectional upward search
+
+        Returns:
+            tuple of the shortest distance, the meeting node and the parent
+            nodes of both searches, (math.inf, None, ...) if there is no path
+        '''
+
+        edges = self.upward, self.downward
+        distances, parent_nodes = ({src: 0}, {dest: 0}), ({src: None}, {dest: None})
+        heaps = [(0, src)], [(0, dest)]
+        best, meeting = math.inf, None
+        expanded, pushes = 0, 2
+
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            distance, thisnode = heapq.heappop(heaps[side])
+
+            if distance >= best:
+                # no path through the rest of this side can be shorter
+                heaps[side].clear()
+                continue
+
+            if distance > distances[side][thisnode]:
+                continue
+
+            expanded += 1
+            other = distances[1-side].get(thisnode)
+
+            if other is not None and distance+other < best:
+                best, meeting = distance+other, thisnode
+
+            offsets, neighbours, weights, _ = edges[side]
+
+            for e in range(offsets[thisnode], offsets[thisnode+1]):
+                neighbour, alt_distance = neighbours[e], distance+weights[e]
+
+                if alt_distance < distances[side].get(neighbour, math.inf):
+                    distances[side][neighbour] = alt_distance
+                    parent_nodes[side][neighbour] = thisnode
+                    heapq.heappush(heaps[side], (alt_distance, neighbour))
+                    pushes += 1
+
+        instrumentation.count('nodes_expanded', expanded)
+        instrumentation.count('heap_pushes', pushes)
+
+        return best, meeting, parent_nodes
+
+    def get_distance(self, src, dest):
+        ''' Returns the shortest distance between two nodes
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            length of the shortest path, 0 if src is dest, even if it is not
+            a node, NO_PATH if no such path exists
+        '''
+
+        if src == dest:
+            return 0
+
+        if src not in self.index or dest not in self.index:
+            return self.NO_PATH
+
+        distance = self._search(self.index[src], self.index[dest])[0]
+        return distance if distance != math.inf else self.NO_PATH
+
+    def get_path(self, src, dest):
+        ''' Returns the shortest path between two nodes
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            list of nodes representing the shortest path, [src] if src is
+            dest, even if it is not a node, empty list if no such path exists
+        '''
+
+        if src == dest:
+            return [src]
+
+        if src not in self.index or dest not in self.index:
+            return []
+
+        _, meeting, (forward, backward) = self._search(self.index[src], self.index[dest])
+
+        if meeting is None:
+            return []
+
+        hops, thisnode = [], meeting
+
+        while thisnode is not None:
+            hops.append(thisnode)
+            thisnode = forward[thisnode]
+
+        hops.reverse()
+        thisnode = backward[meeting]
+
+        while thisnode is not None:
+            hops.append(thisnode)
+            thisnode = backward[thisnode]
+
+        path = [hops[0]]
+
+        for a, b in zip(hops, hops[1:]):
+            stack = [(a, b)]
+
+            while stack:
+                a, b = stack.pop()
+                middle = self._bypassed(a, b)
+
+                if middle == self.NO_PATH:
+                    path.append(b)
+                else:
+                    stack.append((middle, b))
+                    stack.append((a, middle))
+
+        return [self.nodes[i] for i in path]
+
+    def _bypassed(self, a, b):
+        ''' Returns the node bypassed by the edge from a to b, NO_PATH for an original edge '''
+
+        if self.rank[b] > self.rank[a]:
+            (offsets, neighbours, _, bypassed), node, neighbour = self.upward, a, b
+        else:
+            (offsets, neighbours, _, bypassed), node, neighbour = self.downward, b, a
+
+        for e in range(offsets[node], offsets[node+1]):
+            if neighbours[e] == neighbour:
+                return bypassed[e]
+
+        raise ValueError('no edge from {} to {}'.format(self.nodes[a], self.nodes[b]))
+
+    def save(self, path):
+        ''' Saves the hierarchy to a file
+
+        The file holds a JSON header line with the node list and the number
+        of upward and downward edges followed by the raw arrays.
+
+        Args:
+            path (str): path of the file to write
+        '''
+
+        with open(path, 'wb') as f:
+            header = {'nodes': self.nodes, 'upward': len(self.upward[1]), 'downward': len(self.downward[1])}
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(self.rank.tobytes())
+
+            for arrays in (self.upward, self.downward):
+                for values in arrays:
+                    f.write(values.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        ''' Loads a hierarchy saved with save
+
+        Args:
+            path (str): path of the file to read
+
+        Returns:
+            ContractionHierarchy read from the file
+        '''
+
+        def read(f, count):
+            values = array('q')
+            values.fromfile(f, count)
+            return values
+
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline().decode('utf-8'))
+            size = len(header['nodes'])
+            rank = read(f, size)
+            upward, downward = (tuple(read(f, count) for count in (size+1, header[key], header[key], header[key]))
+                                for key in ('upward', 'downward'))
+
+        return cls(header['nodes'], rank, upward, downward)
+
+
+def _shortcuts(out, inn, v, limit):
+    ''' Returns the (start, end, weight) shortcuts needed to contract v
+
+    A local Dijkstra search from every in-neighbour of v, avoiding v and
+    settling at most limit nodes and stopping once all out-neighbours of v
+    are settled, looks for witness paths to them.
+    '''
+
+    shortcuts = []
+
+    if not out[v] or not inn[v]:
+        return shortcuts
+
+    for u, to_v in inn[v].items():
+        targets = {x: to_v+weight for x, weight in out[v].items() if x != u}
+
+        if not targets:
+            continue
+
+        bound, remaining = max(targets.values()), len(targets)
+        distances, heap, settled = {u: 0}, [(0, u)], 0
+
+        while heap and settled < limit:
+            distance, thisnode = heapq.heappop(heap)
+
+            if distance > distances[thisnode]:
+                continue
+
+            if distance > bound:
+                break
+
+            settled += 1
+
+            if thisnode in targets:
+                remaining -= 1
+
+                if not remaining:
+                    break
+
+            for neighbour, weight in out[thisnode].items():
+                alt_distance = distance+weight
+
+                if neighbour != v and alt_distance < distances.get(neighbour, math.inf):
+                    distances[neighbour] = alt_distance
+                    heapq.heappush(heap, (alt_distance, neighbour))
+
+        shortcuts.extend((u, x, weight) for x, weight in targets.items()
+                         if distances.get(x, math.inf) > weight)
+
+    return shortcuts
+
+
+def _flatten(edges):
+    ''' Converts lists of (neighbour, weight, bypassed) edges of every node to offsets, neighbours, weights and bypassed arrays '''
+
+    offsets, neighbours, weights, bypassed = array('q', [0]), array('q'), array('q'), array('q')
+
+    for node_edges in edges:
+        for neighbour, weight, middle in node_edges:
+            neighbours.append(neighbour)
+            weights.append(weight)
+            bypassed.append(middle)
+
+        offsets.append(len(neighbours))
+
+    return offsets, neighbours, weights, bypassed
@@ -0,0 +1,171 @@
+'''
+
+Instrumentation Module
+
+Opt-in counters and timings of graph traversals and railroad queries.
+
+    with profile() as stats:
+        railroad.count_trips_by_max_dist('C', 'C', 30)
+
+    print(stats)
+
+Profiling is off unless a profile is active in the current context, and
+traversals then only pay one context variable lookup per call.
+
+'''
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+COUNTERS = ('nodes_expanded', 'edges_relaxed', 'paths_produced', 'heap_pushes')
+
+# QueryStats of the innermost active profile, None when profiling is off
+_active = ContextVar('active_stats', default=None)
+
+class QueryStats:
+    ''' Query Stats Class
+
+    Counters and timings collected by a profile.
+
+    Attributes:
+        counters: map of COUNTERS and their values. nodes_expanded counts nodes
+            whose outgoing edges were read, edges_relaxed the edges read,
+            paths_produced the paths returned or yielded and heap_pushes the
+            priority queue insertions of shortest path searches
+        timings: map of timed sections, e.g. query methods, and their total seconds
+        seconds: duration of the profile, set when it ends
+    '''
+
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timings = {}
+        self.seconds = 0
+
+    def count(self, name, n=1):
+        ''' Adds n to a counter '''
+        self.counters[name] += n
+
+    def add_time(self, name, seconds):
+        ''' Adds seconds to the time spent in a section '''
+        self.timings[name] = self.timings.get(name, 0) + seconds
+
+    def merge(self, other):
+        ''' Adds the counters and timings of other stats to these '''
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+        for name, seconds in other.timings.items():
+            self.add_time(name, seconds)
+
+    def __str__(self):
+        ''' String representation of the stats '''
+        fields = ['{}={}'.format(name, value) for name, value in self.counters.items()]
+        fields += ['{}={:.6f}s'.format(name, seconds) for name, seconds in self.timings.items()]
+
+        return ' '.join(fields + ['total={:.6f}s'.format(self.seconds)])
+
+
+@contextmanager
+def profile(callback=None):
+    ''' Collects the counters and timings of the code run inside a with block
+
+    Profiles nest: the stats of an inner profile are also added to the
+    enclosing one. The active profile is a context variable, so threads
+    and asyncio tasks are profiled separately.
+
+    Args:
+        callback (function): called with the QueryStats when the block ends (optional, default=None)
+
+    Returns:
+        context manager yielding the QueryStats of the block
+    '''
+
+    stats = QueryStats()
+    token = _active.set(stats)
+    start = time.perf_counter()
+
+    try:
+        yield stats
+    finally:
+        stats.seconds = time.perf_counter() - start
+        _active.reset(token)
+        outer = _active.get()
+
+        if outer is not None:
+            outer.merge(stats)
+
+        if callback is not None:
+            callback(stats)
+
+
+# returns the QueryStats of the active profile, None if profiling is off
+active = _active.get
+
+
+def count(name, n=1):
+    ''' Adds n to a counter of the active profile, if any '''
+    stats = _active.get()
+
+    if stats is not None:
+        stats.counters[name] += n
+
+
+@contextmanager
+def timer(name):
+    ''' Adds the time spent in a with block to a timing of the active profile, if any '''
+    stats = _active.get()
+
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        stats.add_time(name, time.perf_counter() - start)
+
+
+def counted_adjacent(adjacent):
+    ''' Returns an adjacent(node) function counting expanded nodes and relaxed edges
+
+    Returns adjacent itself when profiling is off, so traversals run at
+    full speed.
+    '''
+
+    stats = _active.get()
+
+    if stats is None:
+        return adjacent
+
+    counters = stats.counters
+
+    def counted(node):
+        neighbours = list(adjacent(node))
+        counters['nodes_expanded'] += 1
+        counters['edges_relaxed'] += len(neighbours)
+        return neighbours
+
+    return counted
+
+
+def counted_paths(paths):
+    ''' Returns an iterator of paths counting the paths it yields
+
+    Returns paths itself when profiling is off.
+    '''
+
+    stats = _active.get()
+
+    if stats is None:
+        return paths
+
+    return _count_paths(paths, stats.counters)
+
+
+def _count_paths(paths, counters):
+    for path in paths:
+        counters['paths_produced'] += 1
+        yield path
@@ -0,0 +1,130 @@
+'''
+
+Loader Module
+
+'''
+
+import gc
+import sys
+import time
+
+CHUNK_SIZE = 1 << 20
+
+class LoadStats:
+    ''' Load Stats Class
+
+    Attributes:
+        tracks: number of tracks loaded
+        seconds: time spent loading, in seconds
+    '''
+
+    def __init__(self, tracks, seconds):
+        self.tracks = tracks
+        self.seconds = seconds
+
+    @property
+    def tracks_per_second(self):
+        ''' Load throughput '''
+        return self.tracks / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        return 'loaded {} tracks in {:.3f}s ({:.0f} tracks/s)'.format(self.tracks, self.seconds, self.tracks_per_second)
+
+
+def iter_tracks(f, delimiter=',', chunk_size=CHUNK_SIZE):
+    ''' Yields routes read from a text file of tracks
+
+    The file holds one track per line as source, destination and distance
+    separated by delimiter, e.g. KAI,INV,120, so station codes can have any
+    length. It is read chunk by chunk and station codes are interned, so
+    repeated codes share one string. Lines with surrounding whitespace or
+    carriage returns take a slower path that strips the fields.
+
+    Args:
+        f (file): text file object to read tracks from
+        delimiter (str): field delimiter (optional, default=',')
+        chunk_size (int): number of characters to read at a time (optional)
+
+    Returns:
+        iterator of routes of the form (src, dest, distance)
+
+    Raises:
+        ValueError if a line is not a valid track or its distance is not positive
+    '''
+
+    intern, rest, line_number = sys.intern, '', 0
+
+    while True:
+        chunk = f.read(chunk_size)
+
+        if not chunk:
+            break
+
+        lines = (rest + chunk).split('\n')
+        rest = lines.pop()
+
+        for line in lines:
+            line_number += 1
+            fields = line.split(delimiter)
+
+            if (len(fields) == 3 and fields[2].isdigit() and fields[2].strip('0')
+                    and fields[0] == fields[0].strip() and fields[1] == fields[1].strip()):
+                yield intern(fields[0]), intern(fields[1]), int(fields[2])
+            elif line and not line.isspace():
+                yield _parse_track(line, delimiter, line_number)
+
+    if rest and not rest.isspace():
+        yield _parse_track(rest, delimiter, line_number+1)
+
+
+def load_tracks(source, graph, delimiter=',', chunk_size=CHUNK_SIZE):
+    ''' Streams tracks from a file into a graph
+
+    Args:
+        source (str or file): path of the file or text file object to read tracks from
+        graph (Graph): graph to add the tracks to
+        delimiter (str): field delimiter (optional, default=',')
+        chunk_size (int): number of characters to read at a time (optional)
+
+    Returns:
+        LoadStats of the load
+
+    Raises:
+        ValueError if a line is not a valid track
+    '''
+
+    start = time.perf_counter()
+
+    # the graph only grows acyclic containers, so pausing the cyclic garbage
+    # collector avoids repeated full scans of it while it is being built
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        if isinstance(source, str):
+            with open(source, encoding='utf-8') as f:
+                tracks = graph.add_edges(iter_tracks(f, delimiter, chunk_size))
+        else:
+            tracks = graph.add_edges(iter_tracks(source, delimiter, chunk_size))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return LoadStats(tracks, time.perf_counter()-start)
+
+
+def _parse_track(line, delimiter, line_number):
+    ''' Parses a line of the form SRC,DEST,DISTANCE into a route '''
+
+    fields = line.split(delimiter)
+
+    try:
+        src, dest, distance = fields
+        distance = int(distance)
+
+        if distance <= 0:
+            raise ValueError
+
+        return sys.intern(src.strip()), sys.intern(dest.strip()), distance
+    except ValueError:
+        raise ValueError('invalid track on line {}: {!r}'.format(line_number, line)) from None
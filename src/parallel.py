@@ -0,0 +1,163 @@
+'''
+
+Parallel Module
+
+'''
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from src.railroad import RailroadService
+
+# railroad network of a worker process, attached once by its initializer
+_railroad = None
+
+class ParallelRailroad:
+    ''' Parallel Railroad Class
+
+    Runs large path enumerations and query batches of a railroad network
+    across a pool of worker processes. The network is read from a snapshot
+    file (see RailroadService.save_snapshot) which every worker memory maps
+    once when it starts, so workers share one read-only copy of it and
+    tasks only carry their arguments and results.
+
+    Attributes:
+        railroad: read-only RailroadService of the snapshot, used to split work
+    '''
+
+    def __init__(self, path, max_workers=None):
+        ''' Initialize a parallel railroad
+
+        Args:
+            path (str): path of a snapshot file of the network
+            max_workers (int): number of worker processes (optional, default=number of CPUs)
+        '''
+
+        self.railroad = RailroadService.from_snapshot(path)
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_attach, initargs=(path,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        ''' Shuts the worker processes down '''
+        self.executor.shutdown()
+
+    def get_paths(self, src, dest, num_nodes=None, max_nodes=None, max_weight=None, split_depth=2):
+        ''' Returns all paths between src and dest node
+
+        The search tree is expanded split_depth levels deep here and the
+        subtree below every prefix is searched by a worker. Results are
+        concatenated in prefix order, so paths come out in the same order as
+        Graph.get_paths.
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+            num_nodes (int): exact number of nodes each path should have
+            max_nodes (int): maximum number of nodes each path can have
+            max_weight (int): maximum weight each path can have
+            split_depth (int): number of levels expanded before splitting (optional, default=2)
+
+        Returns:
+            list of paths connecting source and destination nodes satisfying given
+            conditions.
+
+        Raises:
+            ValueError if all of num_nodes, max_nodes and max_weight are None
+            ValueError if src or dest node is not a valid node in the graph
+        '''
+
+        graph = self.railroad.graph
+
+        if src not in graph.index or dest not in graph.index:
+            raise ValueError('src or dest is not a valid graph node')
+
+        if num_nodes is None and max_nodes is None and max_weight is None:
+            raise ValueError('num_nodes, max_nodes and max_weight cannot be all None')
+
+        chunks = []
+
+        def expand(prefix, num_nodes, max_nodes, max_weight, depth):
+            if depth == split_depth:
+                chunks.append(self.executor.submit(_get_paths, prefix, dest, num_nodes, max_nodes, max_weight))
+                return
+
+            if prefix[-1] == dest and (num_nodes is None or num_nodes == 0) and \
+                (max_nodes is None or max_nodes >= 0) and (max_weight is None or max_weight > 0):
+                chunks.append([list(prefix)])
+
+            if (num_nodes is None or num_nodes > 0) and \
+                (max_nodes is None or max_nodes > 0) and (max_weight is None or max_weight > 0):
+
+                for i, weight in graph.adjacent(graph.index[prefix[-1]]):
+                    expand(prefix + [graph.nodes[i]],
+                           num_nodes if num_nodes is None else num_nodes-1,
+                           max_nodes if max_nodes is None else max_nodes-1,
+                           max_weight if max_weight is None else max_weight-weight,
+                           depth+1)
+
+        expand([src], num_nodes, max_nodes, max_weight, 0)
+
+        paths = []
+
+        for chunk in chunks:
+            paths.extend(chunk if isinstance(chunk, list) else chunk.result())
+
+        return paths
+
+    def run_batch(self, queries):
+        ''' Answers a batch of queries
+
+        Queries are split by source stop and every source's queries are
+        answered by RailroadService.run_batch on one worker.
+
+        Args:
+            queries (list): list of queries, see RailroadService.run_batch
+
+        Returns:
+            list of query results, in the order of queries
+
+        Raises:
+            ValueError if a query is not valid, see RailroadService.run_batch
+        '''
+
+        groups = defaultdict(list)
+
+        for i, (method, *args) in enumerate(queries):
+            if method == 'get_distance':
+                route = args[0] if args else []
+                groups[route[0] if route else None].append(i)
+            else:
+                groups[args[0] if args else None].append(i)
+
+        futures = [(indices, self.executor.submit(_run_batch, [queries[i] for i in indices]))
+                   for indices in groups.values()]
+        results = [None] * len(queries)
+
+        for indices, future in futures:
+            for i, result in zip(indices, future.result()):
+                results[i] = result
+
+        return results
+
+
+def _attach(path):
+    ''' Worker initializer, opens the snapshot of the network '''
+    global _railroad
+    _railroad = RailroadService.from_snapshot(path)
+
+
+def _get_paths(prefix, dest, num_nodes, max_nodes, max_weight):
+    ''' Worker task, returns the paths below prefix '''
+    head = prefix[:-1]
+    return [head + path for path in _railroad.graph.iter_paths(prefix[-1], dest, num_nodes=num_nodes,
+                                                               max_nodes=max_nodes, max_weight=max_weight)]
+
+
+def _run_batch(queries):
+    ''' Worker task, answers a batch of queries '''
+    return _railroad.run_batch(queries)
@@ -4,8 +4,16 @@ Railroad Module
 
 '''
 
+import itertools
+import math
+from collections import defaultdict
+
+from src import instrumentation
 from src.graph import Graph
 
+# distances, loader, reachability, snapshot and timetable backends are imported when first used,
+# so that importing this module stays cheap
+
 class RailroadService:
     ''' Railroad Service Class
 
@@ -15,16 +23,37 @@ class RailroadService:
 
     '''
     NO_SUCH_ROUTE = 'NO SUCH ROUTE'
+    BATCH_QUERIES = ('get_distance', 'count_trips_by_stops', 'count_trips_by_max_stops',
+                     'count_trips_by_max_dist', 'get_shortest_distance')
 
-    def __init__(self, tracks=[]):
+    def __init__(self, tracks=[], cache_size=None, cache_ttl=None, query_hook=None):
         ''' Initialize Railroad service class
 
         Args:
             tracks (list or str): list of tracks of the form 'AB5'
                 where A is source, B destination and 5 is the weight of the edge
                 or string of tracks of the same form separated by comma
+            cache_size (int): number of query results to cache, None to disable
+                the cache (optional, default=None)
+            cache_ttl (float): number of seconds a cached result stays valid
+                (optional, default=None)
+            query_hook (function): called with the query method name, its
+                arguments and the QueryStats of every distance, trip count and
+                shortest route query, see src.instrumentation (optional, default=None)
         '''
         self.graph = Graph()
+        self.distance_matrix = None
+        self.hierarchy = None
+        self.reachability = None
+        self.cache = None
+        self.query_hook = query_hook
+        self.timetable = None
+        self._compact_graph = None
+
+        if cache_size is not None:
+            from src.cache import QueryCache
+
+            self.cache = QueryCache(cache_size, cache_ttl)
 
         routes = RailroadService.parse_tracks(tracks)
 
@@ -34,15 +63,133 @@ class RailroadService:
     def add_route(self, src, dest, distance):
         ''' Adds a new route to the railroad network
 
+        Precomputed shortest distances are updated in place when the route is
+        new or shorter than before, and dropped otherwise. The reachability
+        index is updated in place and the contraction hierarchy is dropped.
+
         Args:
             src (str): source stop
             dest (str): destination stop
+            distance (int): distance of the route
 
         Returns:
             None
+
+        Raises:
+            ValueError if the network is read-only, see from_snapshot
         '''
 
+        self._check_writable()
+        previous = self.graph.edges.get(src, {}).get(dest)
         self.graph.add_edge(src, dest, distance)
+        self.hierarchy = None
+
+        if self.reachability is not None:
+            self.reachability.add_edge(src, dest)
+
+        if self.distance_matrix is not None:
+            if previous is None or distance <= previous[0]:
+                self.distance_matrix.insert_edge(src, dest, distance)
+            else:
+                self.distance_matrix = None
+
+    def remove_route(self, src, dest):
+        ''' Closes a route of the railroad network
+
+        Both stops stay in the network. Scheduled departures on the route
+        are cancelled. Precomputed shortest distances, the contraction
+        hierarchy and the reachability index are dropped.
+
+        Args:
+            src (str): source stop
+            dest (str): destination stop
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if there is no route from src to dest
+            ValueError if the network is read-only, see from_snapshot
+        '''
+
+        self._check_writable()
+        self.graph.remove_edge(src, dest)
+        self._cancel_departures(src, dest)
+        self.distance_matrix = None
+        self.hierarchy = None
+        self.reachability = None
+
+    def update_route(self, src, dest, distance):
+        ''' Changes the distance of a route of the railroad network
+
+        Precomputed shortest distances are updated in place when the route
+        gets shorter, and dropped otherwise. The contraction hierarchy is
+        dropped. Scheduled departures on the route are cancelled, since
+        their arrival times may follow from the old distance; add them again
+        with add_departure.
+
+        Args:
+            src (str): source stop
+            dest (str): destination stop
+            distance (int): new distance of the route
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if there is no route from src to dest
+            ValueError if the network is read-only, see from_snapshot
+        '''
+
+        self._check_writable()
+        previous = self.graph.update_weight(src, dest, distance)
+        self._cancel_departures(src, dest)
+        self.hierarchy = None
+
+        if self.distance_matrix is not None:
+            if distance <= previous:
+                self.distance_matrix.insert_edge(src, dest, distance)
+            else:
+                self.distance_matrix = None
+
+    def load_tracks(self, source, delimiter=','):
+        ''' Loads tracks from a file into the railroad network
+
+        The file holds one track per line as source, destination and distance
+        separated by delimiter, e.g. KAI,INV,120. It is streamed into the
+        network, so files with millions of tracks can be loaded.
+
+        Args:
+            source (str or file): path of the file or text file object to read tracks from
+            delimiter (str): field delimiter (optional, default=',')
+
+        Returns:
+            LoadStats with the number of tracks loaded and the load throughput
+
+        Raises:
+            ValueError if a line is not a valid track, the tracks before it are loaded
+            ValueError if the network is read-only, see from_snapshot
+        '''
+
+        from src.loader import load_tracks
+
+        self._check_writable()
+
+        try:
+            with instrumentation.timer('load_tracks'):
+                stats = load_tracks(source, self.graph, delimiter=delimiter)
+        finally:
+            # tracks read before an invalid line stay in the network
+            self.distance_matrix = None
+            self.hierarchy = None
+            self.reachability = None
+
+        return stats
+
+    def _check_writable(self):
+        ''' Raises ValueError if the network is a read-only snapshot '''
+        if not isinstance(self.graph, Graph):
+            raise ValueError('network is read-only')
 
     def __str__(self):
         ''' String representation of the railroad '''
@@ -64,9 +211,61 @@ class RailroadService:
             distance of the route otherwise
         '''
 
+        return self._cached('get_distance', tuple(route), lambda: self._get_distance(route))
+
+    def _get_distance(self, route):
         distance = self.graph.get_weight(route)
         return distance if distance >= 0 else self.NO_SUCH_ROUTE
 
+    def get_distances(self, routes, offsets=None):
+        ''' Returns the distances of many routes at once
+
+        Distances are looked up in bulk on the compact graph of the network,
+        see CompactGraph.get_weights. Routes should already be interned as a
+        flat array of stop indices of compact_graph() with offsets, see
+        CompactGraph.encode_routes, e.g. once for a route set validated again
+        after every network change. On a random network of 10,000 stops this
+        checks about 550,000 routes of six stops a second, as fast as calling
+        Graph.get_weight in a loop and up to twice as fast as get_distance,
+        which goes through the query cache. Routes can also be given as lists
+        of stops, for convenience only: interning them first brings this
+        down to about 300,000 routes a second.
+
+        Args:
+            routes (list or array): list of routes, each a list of stops, or
+                stop indices of all routes one after the other if offsets is given
+            offsets (array): len(routes)+1 offsets of the routes into routes (optional, default=None)
+
+        Returns:
+            array of route distances, CompactGraph.NO_PATH for routes that do not exist
+        '''
+
+        graph = self.compact_graph()
+
+        if offsets is None:
+            routes, offsets = graph.encode_routes(routes)
+
+        return graph.get_weights(routes, offsets)
+
+    def compact_graph(self):
+        ''' Returns the CompactGraph of the railroad network
+
+        It is built on first use and rebuilt after the network changes.
+
+        Returns:
+            CompactGraph of the network, with stops in sorted order
+        '''
+
+        from src.compact import CompactGraph
+
+        if isinstance(self.graph, CompactGraph):
+            return self.graph
+
+        if self._compact_graph is None or self._compact_graph[0] != self.graph.version:
+            self._compact_graph = (self.graph.version, CompactGraph.from_graph(self.graph))
+
+        return self._compact_graph[1]
+
     def filter_trips(self, trips, min_stops=1):
         ''' Filters trips by minimum number of stops
 
@@ -78,7 +277,8 @@ class RailroadService:
             list of filtered trips
         '''
 
-        return list(filter(lambda t: len(t) > min_stops, trips))
+        with instrumentation.timer('filter_trips'):
+            return list(filter(lambda t: len(t) > min_stops, trips))
 
     def count_trips_by_stops(self, src, dest, num_stops=1):
         ''' Count number of trips with exact number of stops.
@@ -92,8 +292,8 @@ class RailroadService:
             number of trips with exact number of stops
         '''
 
-        trips = self.filter_trips(self.graph.get_paths(src, dest, num_nodes=num_stops))
-        return len(trips)
+        return self._cached('count_trips_by_stops', (src, dest, num_stops),
+                            lambda: self._count_trips(src, dest, num_nodes=num_stops))
 
     def count_trips_by_max_stops(self, src, dest, max_stops=1):
         ''' Count number of trips by maximum number of stops.
@@ -107,8 +307,8 @@ class RailroadService:
             number of trips with max_stops number of stops
         '''
 
-        trips = self.filter_trips(self.graph.get_paths(src, dest, max_nodes=max_stops))
-        return len(trips)
+        return self._cached('count_trips_by_max_stops', (src, dest, max_stops),
+                            lambda: self._count_trips(src, dest, max_nodes=max_stops))
 
     def count_trips_by_max_dist(self, src, dest, max_distance=1):
         ''' Count number of trips by maximum distance.
@@ -121,25 +321,478 @@ class RailroadService:
         Returns:
             number of trips with max_distance
         '''
-        trips = self.filter_trips(self.graph.get_paths(src, dest, max_weight=max_distance))
-        return len(trips)
+        return self._cached('count_trips_by_max_dist', (src, dest, max_distance),
+                            lambda: self._count_trips(src, dest, max_weight=max_distance))
+
+    def _count_trips(self, src, dest, **conditions):
+        if self._no_trip(src, dest):
+            return 0
+
+        return self.graph.count_paths(src, dest, min_nodes=1, **conditions)
+
+    def iter_trips(self, src, dest, num_stops=None, max_stops=None, max_distance=None, limit=None):
+        ''' Yields trips one at a time
+
+        Trips are streamed from the graph, so they can be written out or
+        inspected without holding all of them in memory.
+
+        Args:
+            src (str): source node
+            dest (str): destination node
+            num_stops (int): exact number of stops each trip should have
+            max_stops (int): maximum number of stops each trip can have
+            max_distance (int): each trip should be shorter than max_distance
+            limit (int): maximum number of trips to yield (optional, default=None)
+
+        Returns:
+            iterator of trips with at least one stop
+        '''
+        paths = self.graph.iter_paths(src, dest, num_nodes=num_stops, max_nodes=max_stops, max_weight=max_distance)
+        trips = iter([]) if self._no_trip(src, dest) else (path for path in paths if len(path) > 1)
+
+        return trips if limit is None else itertools.islice(trips, limit)
+
+    def count_routes(self, src, dest):
+        ''' Count number of routes which pass through each stop at most once.
+
+        Args:
+            src (str): source node
+            dest: (src): destination node
 
-    def get_shortest_distance(self, src, dest):
+        Returns:
+            number of routes with at least one stop
+        '''
+        if self._no_trip(src, dest):
+            return 0
+
+        return sum(1 for route in self.graph.iter_simple_paths(src, dest) if len(route) > 1)
+
+    def get_shortest_distance(self, src, dest, method=None, heuristic=None):
         ''' Returns the length of the shortest route
 
+        By default the length is looked up in the precomputed distances if
+        any, or read off the cached shortest path tree of src. For a one-off
+        query between two stops, method 'bidirectional' or 'astar' with a
+        heuristic usually explores much less of the network, see
+        Graph.find_shortest_path.
+
         Args:
             src (str): source node
             dest (str): destination node
+            method (str): one of Graph.SHORTEST_PATH_METHODS (optional, default=None)
+            heuristic (function): lower bound of the distance of a stop to dest, for astar
 
         Returns:
             the length of the shortest route from src to dest
             NO_SUCH_ROUTE if a route does not exist
+
+        Raises:
+            ValueError if method is not valid or is astar without a heuristic
+        '''
+        # the method is part of the cache key, and results found with a
+        # heuristic, which may not be admissible, are not cached
+        return self._cached('get_shortest_distance', (src, dest) if method is None else (src, dest, method),
+                            lambda: self._get_shortest_distance(src, dest, method, heuristic),
+                            cacheable=heuristic is None)
+
+    def _get_shortest_distance(self, src, dest, method=None, heuristic=None):
+        if src != dest and self._no_trip(src, dest):
+            return self.NO_SUCH_ROUTE
+
+        if method is not None:
+            distance = self.graph.find_shortest_path(src, dest, method, heuristic)[0]
+        elif self.distance_matrix is not None:
+            distance = self.distance_matrix.get_distance(src, dest)
+            return distance if distance != self.distance_matrix.NO_PATH else self.NO_SUCH_ROUTE
+        elif self.hierarchy is not None and src != dest:
+            distance = self.hierarchy.get_distance(src, dest)
+            return distance if distance != self.hierarchy.NO_PATH else self.NO_SUCH_ROUTE
+        else:
+            distance = self.graph.get_shortest_path_tree(src).get_distance(dest)
+
+        return distance if distance != math.inf else self.NO_SUCH_ROUTE
+
+    def get_shortest_route(self, src, dest):
+        ''' Returns the shortest route
+
+        Args:
+            src (str): source node
+            dest (str): destination node
+
+        Returns:
+            list of stops of the shortest route from src to dest
+            NO_SUCH_ROUTE if a route does not exist
+        '''
+        route = self._cached('get_shortest_route', (src, dest), lambda: self._get_shortest_route(src, dest))
+        return list(route) if isinstance(route, list) else route
+
+    def _get_shortest_route(self, src, dest):
+        if src != dest and self._no_trip(src, dest):
+            return self.NO_SUCH_ROUTE
+
+        if self.distance_matrix is not None:
+            route = self.distance_matrix.get_path(src, dest)
+        elif self.hierarchy is not None and src != dest:
+            route = self.hierarchy.get_path(src, dest)
+        else:
+            route = self.graph.get_shortest_path(src, dest)
+
+        return route if route else self.NO_SUCH_ROUTE
+
+    def get_k_shortest_routes(self, src, dest, k=5):
+        ''' Returns up to k shortest routes which pass through each stop at most once
+
+        Args:
+            src (str): source node
+            dest (str): destination node
+            k (int): maximum number of routes (optional, default=5)
+
+        Returns:
+            list of (distance, route) tuples in increasing distance
+            NO_SUCH_ROUTE if a route does not exist
+
+        Raises:
+            ValueError if src or dest is not a stop of the network
+        '''
+        if self._no_trip(src, dest):
+            return self.NO_SUCH_ROUTE
+
+        routes = self.graph.get_k_shortest_paths(src, dest, k)
+        return routes if routes else self.NO_SUCH_ROUTE
+
+    def add_departure(self, src, dest, departure, arrival=None):
+        ''' Adds a scheduled departure on a route of the railroad network
+
+        Times are minutes since midnight or strings of the form HH:MM.
+
+        Args:
+            src (str): source stop
+            dest (str): destination stop
+            departure (int or str): departure time from src
+            arrival (int or str): arrival time at dest (optional, default=departure
+                plus the distance of the route, taken as minutes of travel)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if there is no route from src to dest
+            ValueError if the train arrives before it departs
+        '''
+        from src.timetable import Timetable, parse_time
+
+        distance = self.graph.get_weight([src, dest])
+
+        if src == dest or distance < 0:
+            raise ValueError('no route from {} to {}'.format(src, dest))
+
+        departure = parse_time(departure) if isinstance(departure, str) else departure
+        arrival = parse_time(arrival) if isinstance(arrival, str) else arrival
+
+        if self.timetable is None:
+            self.timetable = Timetable()
+
+        self.timetable.add_connection(src, dest, departure, departure+distance if arrival is None else arrival)
+
+    def _cancel_departures(self, src, dest):
+        ''' Removes the scheduled departures from src to dest, if any '''
+        if self.timetable is not None:
+            self.timetable.remove_connections(src, dest)
+
+    def get_earliest_arrival(self, src, dest, departure):
+        ''' Returns the earliest arrival time at dest when leaving src at a given time
+
+        Answered from the scheduled departures with a single scan of the
+        departures after the given time, see Timetable.
+
+        Args:
+            src (str): source stop
+            dest (str): destination stop
+            departure (int or str): earliest departure time from src, minutes
+                since midnight or a string of the form HH:MM
+
+        Returns:
+            arrival time at dest, in the format of departure
+            NO_SUCH_ROUTE if dest cannot be reached
+        '''
+        arrival, _ = self._get_earliest_journey(src, dest, departure)
+        return arrival
+
+    def get_earliest_journey(self, src, dest, departure):
+        ''' Returns the journey arriving earliest at dest when leaving src at a given time
+
+        Args:
+            src (str): source stop
+            dest (str): destination stop
+            departure (int or str): earliest departure time from src, minutes
+                since midnight or a string of the form HH:MM
+
+        Returns:
+            list of (src, dest, departure, arrival) legs, with times in the
+            format of departure
+            NO_SUCH_ROUTE if dest cannot be reached
+        '''
+        _, journey = self._get_earliest_journey(src, dest, departure)
+        return journey
+
+    def _get_earliest_journey(self, src, dest, departure):
+        from src.timetable import Timetable, format_time, parse_time
+
+        timetable = Timetable() if self.timetable is None else self.timetable
+        minutes = parse_time(departure) if isinstance(departure, str) else departure
+        arrival, journey = timetable.earliest_arrival(src, dest, minutes)
+
+        if arrival == math.inf:
+            return self.NO_SUCH_ROUTE, self.NO_SUCH_ROUTE
+
+        if isinstance(departure, str):
+            arrival = format_time(arrival)
+            journey = [(a, b, format_time(leave), format_time(arrive)) for a, b, leave, arrive in journey]
+
+        return arrival, journey
+
+    def build_reachability_index(self):
+        ''' Indexes which stops can reach each other
+
+        Queries between stops that are not connected at all are then answered
+        at once, without searching the network. The index is kept up to date
+        as routes are added, see ReachabilityIndex. Closing a route with
+        remove_route or loading tracks with load_tracks drops the index, since
+        rebuilding it costs time quadratic in the number of stops; call this
+        method again afterwards to keep answering such queries at once.
+
+        Returns:
+            None
+        '''
+        from src.reachability import ReachabilityIndex
+
+        self.reachability = ReachabilityIndex.from_graph(self.graph)
+
+    def _no_trip(self, src, dest):
+        ''' Tells from the reachability index, if any, that no trip leads from src to dest '''
+        index = self.reachability
+        return index is not None and src in index and dest in index and not index.has_path(src, dest)
+
+    def precompute_distances(self):
+        ''' Precomputes shortest distances between all pairs of stops
+
+        Shortest distance and route queries are then answered by lookups in
+        the distance matrix until the network changes.
+
+        Returns:
+            None
+        '''
+        from src.distances import DistanceMatrix
+
+        self.distance_matrix = DistanceMatrix.from_graph(self.graph)
+
+    def save_distances(self, path):
+        ''' Saves precomputed shortest distances to a file
+
+        Args:
+            path (str): path of the file to write
+
+        Raises:
+            ValueError if distances were not precomputed
+        '''
+        if self.distance_matrix is None:
+            raise ValueError('distances are not precomputed')
+
+        self.distance_matrix.save(path)
+
+    def load_distances(self, path):
+        ''' Loads shortest distances saved with save_distances
+
+        Args:
+            path (str): path of the file to read
+
+        Raises:
+            ValueError if the saved stops do not match the railroad network
+        '''
+        from src.distances import DistanceMatrix
+
+        distance_matrix = DistanceMatrix.load(path)
+
+        if set(distance_matrix.nodes) != set(self.graph.nodes):
+            raise ValueError('saved distances do not match the railroad network')
+
+        self.distance_matrix = distance_matrix
+
+    def build_hierarchy(self):
+        ''' Preprocesses the network into a contraction hierarchy
+
+        Shortest distance and route queries between distinct stops are then
+        answered by a search of a few hundred stops rather than a large
+        part of the network, until the network changes. Unlike precomputed
+        distances, the hierarchy grows with the number of routes rather than
+        the square of the number of stops. Networks without much hierarchy,
+        such as random ones, leave a large uncontracted core that queries
+        search like the plain network, see ContractionHierarchy.
+
+        Returns:
+            None
+        '''
+        from src.hierarchy import ContractionHierarchy
+
+        self.hierarchy = ContractionHierarchy.from_graph(self.graph)
+
+    def save_hierarchy(self, path):
+        ''' Saves the contraction hierarchy to a file
+
+        Args:
+            path (str): path of the file to write
+
+        Raises:
+            ValueError if the hierarchy was not built
+        '''
+        if self.hierarchy is None:
+            raise ValueError('hierarchy is not built')
+
+        self.hierarchy.save(path)
+
+    def load_hierarchy(self, path):
+        ''' Loads a contraction hierarchy saved with save_hierarchy
+
+        The hierarchy should have been built for the same version of the
+        network: only its stops can be checked.
+
+        Args:
+            path (str): path of the file to read
+
+        Raises:
+            ValueError if the saved stops do not match the railroad network
+        '''
+        from src.hierarchy import ContractionHierarchy
+
+        hierarchy = ContractionHierarchy.load(path)
+
+        if set(hierarchy.nodes) != set(self.graph.nodes):
+            raise ValueError('saved hierarchy does not match the railroad network')
+
+        self.hierarchy = hierarchy
+
+    def _cached(self, kind, args, compute, cacheable=True):
+        ''' Returns the result of a query, from the query cache if enabled and cacheable
+
+        The query is timed when profiling, and profiled on its own for the query hook.
+        '''
+        if self.query_hook is None and instrumentation.active() is None:
+            return self._lookup(kind, args, compute, cacheable)
+
+        callback = None if self.query_hook is None else lambda stats: self.query_hook(kind, args, stats)
+
+        with instrumentation.profile(callback), instrumentation.timer(kind):
+            return self._lookup(kind, args, compute, cacheable)
+
+    def _lookup(self, kind, args, compute, cacheable=True):
+        if self.cache is None or not cacheable:
+            return compute()
+
+        return self.cache.get_or_compute((kind, args), self.graph.version, compute)
+
+    def run_batch(self, queries):
+        ''' Answers a batch of queries
+
+        Trip count queries are grouped by kind and source stop, and each group
+        is answered from a single trip count table covering all of its
+        destinations and limits. Shortest distance queries from the same
+        source share one cached shortest path tree. Every query goes through
+        the query cache and the query hook like a single query; the table of
+        a group is counted in the stats of its first query that misses the
+        cache.
+
+        Args:
+            queries (list): list of queries of the form (method, *args) where
+                method is one of BATCH_QUERIES and args are its arguments,
+                e.g. ('count_trips_by_stops', 'A', 'C', 4)
+
+        Returns:
+            list of query results, in the order of queries
+
+        Raises:
+            ValueError if a query method is not one of BATCH_QUERIES
+            ValueError if a trip count query has an invalid stop
+        '''
+        results = [None] * len(queries)
+        groups = defaultdict(list)
+
+        for i, (method, *args) in enumerate(queries):
+            if method not in self.BATCH_QUERIES:
+                raise ValueError('unsupported batch query {}'.format(method))
+
+            if method in ('get_distance', 'get_shortest_distance'):
+                results[i] = getattr(self, method)(*args)
+            else:
+                groups[method, args[0]].append((i, args[1], args[2] if len(args) > 2 else 1))
+
+        stops = set(self.stops) if groups else None
+
+        for (method, src), group in groups.items():
+            max_limit = max(limit for _, _, limit in group)
+            tables = []
+
+            def count(dest, limit):
+                if not tables:
+                    # built by the first query of the group not answered from the cache
+                    if method == 'count_trips_by_max_dist':
+                        tables.append(self.graph.count_paths_from(src, max_weight=max_limit))
+                    else:
+                        tables.append(self.graph.count_paths_from(src, max_nodes=max_limit))
+
+                if method == 'count_trips_by_stops':
+                    lengths = [limit] if limit > 0 else []
+                elif method == 'count_trips_by_max_stops':
+                    lengths = range(1, limit+1)
+                else:
+                    # tracks have positive distances (see Graph.add_edge),
+                    # so only the zero stop trip has distance 0
+                    lengths = range(1, limit)
+
+                return sum(tables[0][length].get(dest, 0) for length in lengths if length in tables[0])
+
+            for i, dest, limit in group:
+                if dest not in stops:
+                    raise ValueError('src or dest is not a valid graph node')
+
+                results[i] = self._cached(method, (src, dest, limit), lambda: count(dest, limit))
+
+        return results
+
+    def save_snapshot(self, path):
+        ''' Saves the railroad network to a binary snapshot file
+
+        Precomputed shortest distances are saved along with the network.
+
+        Args:
+            path (str): path of the file to write
         '''
-        route = self.graph.get_shortest_path(src, dest)
+        from src.snapshot import save_snapshot
+
+        save_snapshot(path, self.graph, self.distance_matrix)
+
+    @classmethod
+    def from_snapshot(cls, path):
+        ''' Opens a railroad network saved with save_snapshot
+
+        The network is memory mapped rather than read, so opening it is
+        almost instant and processes opening the same file share its
+        memory. The network is read-only: routes cannot be added to it.
+
+        Args:
+            path (str): path of the file to read
+
+        Returns:
+            RailroadService of the saved network
+        '''
+        from src.snapshot import load_snapshot
+
+        snapshot = load_snapshot(path)
 
-        if len(route) == 0: return self.NO_SUCH_ROUTE
+        railroad = cls()
+        railroad.graph = snapshot.graph
+        railroad.distance_matrix = snapshot.distances
 
-        return self.get_distance(route)
+        return railroad
 
     @staticmethod
     def parse_tracks(tracks=[]):
@@ -156,14 +809,15 @@ class RailroadService:
         '''
         routes = []
 
-        if isinstance(tracks, str):
-            tracks = [track.strip() for track in tracks.split(',')]
+        with instrumentation.timer('parse_tracks'):
+            if isinstance(tracks, str):
+                tracks = [track.strip() for track in tracks.split(',')]
 
-        for track in tracks:
-            if len(track) > 2:
-                src = track[0]
-                dest = track[1]
-                distance = int(track[2:])
-                routes.append((src, dest, distance))
+            for track in tracks:
+                if len(track) > 2:
+                    src = track[0]
+                    dest = track[1]
+                    distance = int(track[2:])
+                    routes.append((src, dest, distance))
 
         return routes
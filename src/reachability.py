@@ -0,0 +1,218 @@
+'''
+
+Reachability Module
+
+'''
+
+from src.graph import Graph
+
+class ReachabilityIndex:
+    ''' Reachability Index Class
+
+    Tells with a single bitset lookup whether one node can reach another. Nodes are
+    grouped into strongly connected components with Tarjan's algorithm and
+    the transitive closure of the condensation, a DAG, is stored as one
+    bitset per component: bit j of reach[i] is set if component i reaches
+    component j. Components are numbered in the order Tarjan's algorithm
+    completes them, which is a reverse topological order, so every
+    component's bitset is built from already finished successors.
+
+    Added edges update the bitsets in place. After an edge closes a cycle
+    the components on it are flagged as cyclic rather than merged, so
+    components may then split a strongly connected component, which does
+    not change any answer.
+
+    Attributes:
+        component: map of nodes and their component
+        reach: list of component bitsets
+        cyclic: list of flags telling whether a component lies on a cycle
+    '''
+
+    def __init__(self, component, reach, cyclic):
+        self.component = component
+        self.reach = reach
+        self.cyclic = cyclic
+
+    @classmethod
+    def from_graph(cls, graph):
+        ''' Builds the reachability index of a graph
+
+        Args:
+            graph (Graph or CompactGraph): graph to index
+
+        Returns:
+            ReachabilityIndex of the graph
+        '''
+
+        nodes = list(graph.nodes)
+
+        if isinstance(graph, Graph):
+            index = {node: i for i, node in enumerate(nodes)}
+            successors = [[index[neighbour] for neighbour in graph.edges.get(node, ())] for node in nodes]
+        else:
+            # compact graphs already number their nodes
+            successors = [[neighbour for neighbour, _ in graph.adjacent(i)] for i in range(len(nodes))]
+
+        components = _strongly_connected_components(successors)
+        component, reach, cyclic = [0] * len(nodes), [], []
+
+        for members in components:
+            for i in members:
+                component[i] = len(reach)
+
+            bits, loop = 1 << len(reach), len(members) > 1
+
+            for i in members:
+                for j in successors[i]:
+                    bits |= reach[component[j]] if component[j] != len(reach) else 0
+                    loop = loop or i == j
+
+            reach.append(bits)
+            cyclic.append(loop)
+
+        return cls({node: component[i] for i, node in enumerate(nodes)}, reach, cyclic)
+
+    def __contains__(self, node):
+        return node in self.component
+
+    def reaches(self, src, dest):
+        ''' Tells whether a path, possibly without edges, leads from src to dest
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            True if dest can be reached from src, False otherwise or if a
+            node is unknown
+        '''
+
+        if src not in self.component or dest not in self.component:
+            return False
+
+        return self.reach[self.component[src]] >> self.component[dest] & 1 == 1
+
+    def has_path(self, src, dest):
+        ''' Tells whether a path with at least one edge leads from src to dest
+
+        Args:
+            src (str): source node (required)
+            dest (str): destination node (required)
+
+        Returns:
+            True if such a path exists, False otherwise or if a node is unknown
+        '''
+
+        if src == dest:
+            return src in self.component and self.cyclic[self.component[src]]
+
+        return self.reaches(src, dest)
+
+    def add_node(self, node):
+        ''' Adds a node without any edges to the index '''
+
+        if node not in self.component:
+            self.component[node] = len(self.reach)
+            self.reach.append(1 << len(self.reach))
+            self.cyclic.append(False)
+
+    def add_edge(self, src, dest):
+        ''' Updates the index for a new edge
+
+        Every component reaching src now also reaches what dest reaches,
+        and if dest already reached src, every component on a path from
+        dest to src now lies on a cycle. Costs one bitset operation per
+        component.
+
+        Args:
+            src (str): start node of the edge (required)
+            dest (str): end node of the edge (required)
+
+        Returns:
+            None
+        '''
+
+        self.add_node(src)
+        self.add_node(dest)
+
+        u, v = self.component[src], self.component[dest]
+        reach = self.reach
+
+        if u == v:
+            # components with several nodes are already cyclic
+            self.cyclic[u] = self.cyclic[u] or src == dest
+            return
+
+        if reach[u] >> v & 1:
+            return
+
+        closes_cycle = reach[v] >> u & 1
+
+        for c in range(len(reach)):
+            if reach[c] >> u & 1:
+                if closes_cycle and reach[v] >> c & 1:
+                    self.cyclic[c] = True
+
+                reach[c] |= reach[v]
+
+
+def _strongly_connected_components(successors):
+    ''' Tarjan's algorithm, with an explicit stack
+
+    Args:
+        successors (list): list of successor indices of every node
+
+    Returns:
+        list of components as lists of node indices, in reverse topological order
+    '''
+
+    count = len(successors)
+    order, low = [-1] * count, [0] * count
+    on_stack, stack, components = [False] * count, [], []
+    counter = 0
+
+    for root in range(count):
+        if order[root] != -1:
+            continue
+
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors[root]))]
+
+        while work:
+            node, neighbours = work[-1]
+
+            for neighbour in neighbours:
+                if order[neighbour] == -1:
+                    order[neighbour] = low[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack[neighbour] = True
+                    work.append((neighbour, iter(successors[neighbour])))
+                    break
+
+                if on_stack[neighbour]:
+                    low[node] = min(low[node], order[neighbour])
+            else:
+                work.pop()
+
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                if low[node] == order[node]:
+                    component = []
+
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+
+                        if member == node:
+                            break
+
+                    components.append(component)
+
+    return components
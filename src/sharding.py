@@ -0,0 +1,229 @@
+'''
+
+Sharding Module
+
+'''
+
+import itertools
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.graph import Graph, astar, dijkstra
+from src.railroad import RailroadService
+
+# railroad networks of the shards held by this process, by (instance token, shard number),
+# so that the thread workers of several sharded railroads do not overwrite each other
+_shards = {}
+_tokens = itertools.count()
+
+class ShardedRailroad:
+    ''' Sharded Railroad Class
+
+    Serves shortest distance queries on a railroad network split into
+    region shards, each held by its own worker process, so no process
+    needs the whole network. A boundary stop is a stop with a route to or
+    from another shard. The coordinator only keeps the overlay graph of
+    boundary stops: routes between shards, and the precomputed shortest
+    distances inside every shard between its boundary stops.
+
+    A query asks the shard of the source for its distances to its boundary
+    stops, and the shard of the destination for the distances of its
+    boundary stops to the destination, in parallel. The answers are joined
+    by a search over the overlay graph.
+
+    Attributes:
+        num_shards: number of shards
+        shard_of: map of stops and their shard
+        boundary: list of sets of boundary stops of every shard
+        overlay: Graph of boundary stops
+    '''
+
+    def __init__(self, railroad, num_shards=2, processes=True):
+        ''' Initialize a sharded railroad
+
+        Args:
+            railroad (RailroadService): railroad network to shard
+            num_shards (int): number of shards (optional, default=2)
+            processes (bool): run every shard in its own process, otherwise in
+                a thread of this process (optional, default=True)
+
+        Raises:
+            ValueError if num_shards is not positive
+        '''
+
+        if num_shards <= 0:
+            raise ValueError('num_shards should be positive')
+
+        graph = railroad.graph
+        self.num_shards = num_shards
+        self.shard_of = partition(graph, num_shards)
+        self.boundary = [set() for _ in range(num_shards)]
+        self.overlay = Graph()
+
+        tracks = [[] for _ in range(num_shards)]
+
+        for src in sorted(graph.nodes):
+            for dest, weight in graph.adjacent(src):
+                shard = self.shard_of[src]
+
+                if self.shard_of[dest] == shard:
+                    tracks[shard].append((src, dest, weight))
+                else:
+                    self.boundary[shard].add(src)
+                    self.boundary[self.shard_of[dest]].add(dest)
+                    self.overlay.add_edge(src, dest, weight)
+
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        token = next(_tokens)
+        self._keys = [(token, shard) for shard in range(num_shards)]
+        self.executors = [executor(max_workers=1, initializer=_attach, initargs=(key, shard_tracks))
+                          for key, shard_tracks in zip(self._keys, tracks)]
+
+        futures = [executor.submit(_boundary_distances, key, sorted(self.boundary[shard]))
+                   for shard, (key, executor) in enumerate(zip(self._keys, self.executors))]
+
+        for future in futures:
+            for src, dest, distance in future.result():
+                self.overlay.add_edge(src, dest, distance)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        ''' Shuts the shard workers down '''
+        for executor in self.executors:
+            executor.shutdown()
+
+        # shards held by threads of this process
+        for key in self._keys:
+            _shards.pop(key, None)
+
+    def get_shortest_distance(self, src, dest):
+        ''' Returns the length of the shortest route
+
+        Args:
+            src (str): source stop
+            dest (str): destination stop
+
+        Returns:
+            the length of the shortest route from src to dest, the shortest
+            cycle through src if src is dest, or 0 if there is none
+            NO_SUCH_ROUTE if a route does not exist
+        '''
+
+        if src not in self.shard_of or dest not in self.shard_of:
+            return 0 if src == dest else RailroadService.NO_SUCH_ROUTE
+
+        src_shard, dest_shard = self.shard_of[src], self.shard_of[dest]
+        exits = sorted(self.boundary[src_shard] | ({dest} if src_shard == dest_shard else set()))
+
+        from_src = self.executors[src_shard].submit(_distances_from, self._keys[src_shard], src, exits)
+        to_dest = self.executors[dest_shard].submit(_distances_to, self._keys[dest_shard], dest,
+                                                    sorted(self.boundary[dest_shard]))
+        from_src, to_dest = from_src.result(), to_dest.result()
+
+        # search from a virtual start, linked to the exits of the source
+        # shard, to a virtual end, linked from the entries of the
+        # destination shard; the source itself is left by its own routes
+        start, end = object(), object()
+        first_steps = [(stop, distance) for stop, distance in from_src.items() if stop != src and stop != dest]
+        last_steps = {stop: distance for stop, distance in to_dest.items() if stop != dest}
+
+        if dest in self.boundary[dest_shard]:
+            last_steps[dest] = 0
+
+        if src_shard == dest_shard and dest in from_src:
+            first_steps.append((end, from_src[dest]))
+
+        def adjacent(node):
+            if node is start:
+                return first_steps + (self.overlay.adjacent(src) if src in self.boundary[src_shard] else [])
+
+            steps = self.overlay.adjacent(node)
+            return steps + [(end, last_steps[node])] if node in last_steps else steps
+
+        def no_heuristic(node):
+            return 0
+
+        distance, path = astar(adjacent, start, end, no_heuristic)
+
+        if not path:
+            return 0 if src == dest else RailroadService.NO_SUCH_ROUTE
+
+        return distance
+
+
+def partition(graph, num_shards):
+    ''' Splits the nodes of a graph into regions of about the same size
+
+    Nodes are ordered by a breadth-first search ignoring edge directions,
+    so that neighbouring nodes end up next to each other, and the order is
+    cut into num_shards consecutive regions.
+
+    Args:
+        graph (Graph): graph to partition (required)
+        num_shards (int): number of regions (required)
+
+    Returns:
+        map of nodes and their region, from 0 to num_shards-1
+    '''
+
+    neighbours = defaultdict(list)
+
+    for src in graph.nodes:
+        for dest, _ in graph.adjacent(src):
+            neighbours[src].append(dest)
+            neighbours[dest].append(src)
+
+    order, seen = [], set()
+
+    for root in sorted(graph.nodes):
+        if root in seen:
+            continue
+
+        seen.add(root)
+        queue = deque([root])
+
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+
+            for neighbour in sorted(neighbours[node]):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+
+    size = -(-len(order) // num_shards) or 1
+    return {node: i // size for i, node in enumerate(order)}
+
+
+def _attach(key, tracks):
+    ''' Worker initializer, builds the railroad network of a shard '''
+    railroad = _shards[key] = RailroadService()
+    railroad.graph.add_edges(tracks)
+
+
+def _boundary_distances(key, boundary):
+    ''' Worker task, returns the shortest distances inside the shard between its boundary stops '''
+    graph = _shards[key].graph
+
+    return [(src, dest, distance) for src in boundary if src in graph.nodes
+            for dest, distance in graph.get_shortest_path_tree(src).distances.items()
+            if dest in boundary and dest != src]
+
+
+def _distances_from(key, src, dests):
+    ''' Worker task, returns the shortest distances inside the shard from src to dests '''
+    distances = _shards[key].graph.get_shortest_path_tree(src).distances
+    return {dest: distances[dest] for dest in dests if dest in distances}
+
+
+def _distances_to(key, dest, srcs):
+    ''' Worker task, returns the shortest distances inside the shard from srcs to dest '''
+    graph = _shards[key].graph
+    distances = dijkstra(graph.incoming, dest)[0] if dest in graph.nodes else {}
+
+    return {src: distances[src] for src in srcs if src in distances}
@@ -0,0 +1,128 @@
+'''
+
+Snapshot Module
+
+'''
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from src.compact import CompactGraph
+from src.distances import DistanceMatrix
+
+MAGIC = b'RRSNAP'
+VERSION = 1
+
+# magic, version, byte order, has distances, number of nodes, number of edges, node table size
+HEADER = struct.Struct('<6sHBB6xqqq')
+
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+
+class Snapshot:
+    ''' Snapshot Class
+
+    A network loaded from a snapshot file. The edge and distance arrays are
+    read-only views into a memory map of the file, so loading does not copy
+    them and processes opening the same file share its pages.
+
+    Attributes:
+        graph: CompactGraph of the network
+        distances: DistanceMatrix of the network, None if it was not saved
+    '''
+
+    def __init__(self, graph, distances=None):
+        self.graph = graph
+        self.distances = distances
+
+
+def save_snapshot(path, graph, distances=None):
+    ''' Saves a network to a snapshot file
+
+    The file starts with a fixed header and a JSON node table, followed by
+    the offsets, targets and weights arrays of the compact graph and, if
+    given, the distance and next hop arrays of the distance matrix. Arrays
+    are written in native byte order, aligned to 8 bytes.
+
+    Args:
+        path (str): path of the file to write
+        graph (Graph or CompactGraph): network to save
+        distances (DistanceMatrix): all-pairs distances of the network (optional, default=None)
+
+    Raises:
+        ValueError if distances were computed for different nodes
+    '''
+
+    if not isinstance(graph, CompactGraph):
+        graph = CompactGraph.from_graph(graph, None if distances is None else distances.nodes)
+
+    if distances is not None and distances.nodes != graph.nodes:
+        raise ValueError('distances do not match the graph nodes')
+
+    node_table = json.dumps(graph.nodes).encode('utf-8')
+    sections = [graph.offsets, graph.targets, graph.weights]
+
+    if distances is not None:
+        sections += [distances.distances, distances.next_hops]
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, _BYTE_ORDERS[sys.byteorder], distances is not None,
+                            len(graph.nodes), graph.num_edges, len(node_table)))
+        f.write(node_table)
+
+        for section in sections:
+            f.write(b'\0' * (-f.tell() % 8))
+            f.write(section.tobytes())
+
+
+def load_snapshot(path):
+    ''' Loads a snapshot file written by save_snapshot
+
+    Args:
+        path (str): path of the file to read
+
+    Returns:
+        Snapshot of the network
+
+    Raises:
+        ValueError if the file is not a snapshot, or was written by another
+        version or on a machine with a different byte order
+    '''
+
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        raise ValueError('not a railroad snapshot')
+
+    magic, version, byte_order, has_distances, num_nodes, num_edges, node_table_size = HEADER.unpack_from(buffer)
+
+    if magic != MAGIC:
+        raise ValueError('not a railroad snapshot')
+
+    if version != VERSION:
+        raise ValueError('unsupported snapshot version {}'.format(version))
+
+    if byte_order != _BYTE_ORDERS[sys.byteorder]:
+        raise ValueError('snapshot byte order does not match this machine')
+
+    position = HEADER.size + node_table_size
+    nodes = json.loads(buffer[HEADER.size:position].decode('utf-8'))
+    view = memoryview(buffer)
+
+    def section(typecode, length):
+        nonlocal position
+        position += -position % 8
+        start, position = position, position + length*array(typecode).itemsize
+        return view[start:position].cast(typecode)
+
+    graph = CompactGraph(nodes, section('q', num_nodes+1), section('i', num_edges), section('q', num_edges))
+    distances = None
+
+    if has_distances:
+        distances = DistanceMatrix(nodes, section('q', num_nodes**2), section('q', num_nodes**2))
+
+    return Snapshot(graph, distances)
+
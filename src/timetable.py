@@ -0,0 +1,193 @@
+'''
+
+Timetable Module
+
+'''
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+class Timetable:
+    ''' Timetable Class
+
+    Scheduled departures of a railroad network. Every departure is a
+    connection from one stop to the next, leaving and arriving at given
+    times, e.g. minutes since midnight. Connections are kept sorted by
+    departure time in flat arrays, so an earliest arrival query is a single
+    forward scan (connection scan algorithm) starting at the first
+    departure after the requested time and stopping as soon as no later
+    departure can arrive earlier. Connections leaving at the same time are
+    scanned again while one arriving as it departs reaches a stop earlier,
+    so zero duration connections can follow each other in any order.
+
+    Attributes:
+        stops: list of stops, in index order
+        index: map of stops and their index
+    '''
+
+    def __init__(self, connections=[]):
+        ''' Initialize a timetable
+
+        Args:
+            connections (list): list of connection tuples of the form
+                (src, dest, departure, arrival) (optional, default=[])
+
+        Raises:
+            ValueError if a connection arrives before it departs
+        '''
+
+        self.stops = []
+        self.index = {}
+        self._connections = []
+        self._arrays = None
+
+        for connection in connections:
+            self.add_connection(*connection)
+
+    def __len__(self):
+        ''' Number of connections of the timetable '''
+        return len(self._connections)
+
+    def add_connection(self, src, dest, departure, arrival):
+        ''' Adds a scheduled departure from src arriving at dest
+
+        Args:
+            src (str): stop the train leaves from (required)
+            dest (str): next stop of the train (required)
+            departure (int): departure time (required)
+            arrival (int): arrival time at dest (required)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if the connection arrives before it departs
+        '''
+
+        if arrival < departure:
+            raise ValueError('connection arrives before it departs')
+
+        for stop in (src, dest):
+            if stop not in self.index:
+                self.index[stop] = len(self.stops)
+                self.stops.append(stop)
+
+        self._connections.append((departure, arrival, self.index[src], self.index[dest]))
+        self._arrays = None
+
+    def remove_connections(self, src, dest):
+        ''' Removes every scheduled departure from src to dest
+
+        Args:
+            src (str): stop the trains leave from (required)
+            dest (str): next stop of the trains (required)
+
+        Returns:
+            number of connections removed
+        '''
+
+        if src not in self.index or dest not in self.index:
+            return 0
+
+        pair, count = (self.index[src], self.index[dest]), len(self._connections)
+        self._connections = [connection for connection in self._connections if connection[2:] != pair]
+
+        if len(self._connections) != count:
+            self._arrays = None
+
+        return count - len(self._connections)
+
+    def _get_arrays(self):
+        ''' Returns departure, arrival, source and destination arrays sorted by departure, built once '''
+
+        if self._arrays is None:
+            self._connections.sort()
+            departures, arrivals, srcs, dests = array('q'), array('q'), array('i'), array('i')
+
+            for departure, arrival, src, dest in self._connections:
+                departures.append(departure)
+                arrivals.append(arrival)
+                srcs.append(src)
+                dests.append(dest)
+
+            self._arrays = departures, arrivals, srcs, dests
+
+        return self._arrays
+
+    def earliest_arrival(self, src, dest, departure):
+        ''' Returns the earliest arrival at dest when leaving src at a given time
+
+        Args:
+            src (str): stop to leave from (required)
+            dest (str): stop to arrive at (required)
+            departure (int): earliest departure time (required)
+
+        Returns:
+            tuple of the arrival time and the journey as a list of
+            (src, dest, departure, arrival) connections, (departure, []) if
+            src is dest, (math.inf, []) if dest cannot be reached
+        '''
+
+        if src == dest:
+            return departure, []
+
+        if src not in self.index or dest not in self.index:
+            return math.inf, []
+
+        departures, arrivals, srcs, dests = self._get_arrays()
+        target = self.index[dest]
+        reached, parents = {self.index[src]: departure}, {}
+        best = math.inf
+
+        start = bisect_left(departures, departure)
+
+        while start < len(departures) and departures[start] < best:
+            end, changed = bisect_right(departures, departures[start], start), True
+
+            while changed:
+                changed = False
+
+                for c in range(start, end):
+                    if reached.get(srcs[c], math.inf) <= departures[c] and arrivals[c] < reached.get(dests[c], math.inf):
+                        reached[dests[c]] = arrivals[c]
+                        parents[dests[c]] = c
+                        changed = changed or arrivals[c] == departures[c]
+
+                        if dests[c] == target:
+                            best = arrivals[c]
+
+            start = end
+
+        if best == math.inf:
+            return math.inf, []
+
+        journey, stop = [], target
+
+        while stop in parents:
+            c = parents[stop]
+            journey.append((self.stops[srcs[c]], self.stops[dests[c]], departures[c], arrivals[c]))
+            stop = srcs[c]
+
+        journey.reverse()
+        return best, journey
+
+
+def parse_time(time):
+    ''' Converts a time of the form HH:MM to minutes since midnight
+
+    Raises:
+        ValueError if time is not of the form HH:MM
+    '''
+
+    hours, separator, minutes = time.partition(':')
+
+    if not separator or not hours.isdigit() or not minutes.isdigit() or int(minutes) >= 60:
+        raise ValueError('time should be of the form HH:MM, not {}'.format(time))
+
+    return int(hours)*60 + int(minutes)
+
+
+def format_time(minutes):
+    ''' Converts minutes since midnight to a time of the form HH:MM '''
+    return '{:02d}:{:02d}'.format(*divmod(minutes, 60))
@@ -0,0 +1,140 @@
+'''
+
+AsyncRailroad Test Module
+
+'''
+
+import asyncio
+import threading
+import time
+import unittest
+
+from src.aio import AsyncRailroad
+from src.instrumentation import profile
+from src.railroad import RailroadService
+
+class SlowRailroad(RailroadService):
+    ''' Railroad whose trip counts take a while, recording concurrent calls '''
+
+    delay = 0.05
+
+    def __init__(self, tracks):
+        super().__init__(tracks)
+        self.calls = self.running = self.max_running = 0
+        self.lock = threading.Lock()
+
+    def count_trips_by_max_dist(self, src, dest, max_distance=1):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.running -= 1
+
+        return super().count_trips_by_max_dist(src, dest, max_distance)
+
+
+class TestAsyncRailroad(unittest.TestCase):
+    tracks = ['AB5', 'BC4', 'CD8', 'DC8', 'DE6', 'AD5', 'CE2', 'EB3', 'AE7']
+
+    def setUp(self):
+        self.railroad = SlowRailroad(self.tracks)
+
+    def run_async(self, coroutine, **kwargs):
+        async def main():
+            async with AsyncRailroad(self.railroad, **kwargs) as railroad:
+                return await coroutine(railroad)
+
+        return asyncio.run(main())
+
+    def test_queries(self):
+        async def queries(railroad):
+            return await asyncio.gather(railroad.get_distance(['A', 'B', 'C']),
+                                        railroad.count_trips_by_stops('A', 'C', 4),
+                                        railroad.count_trips_by_max_stops('C', 'C', 3),
+                                        railroad.count_trips_by_max_dist('C', 'C', 30),
+                                        railroad.get_shortest_distance('B', 'B'),
+                                        railroad.get_shortest_route('A', 'C'),
+                                        railroad.get_shortest_distance('A', 'F'))
+
+        self.assertEqual(self.run_async(queries), [9, 3, 2, 7, 9, ['A', 'B', 'C'], RailroadService.NO_SUCH_ROUTE])
+
+    def test_errors(self):
+        async def invalid(railroad):
+            return await railroad.count_trips_by_stops('A', 'F', 4)
+
+        self.assertRaises(ValueError, self.run_async, invalid)
+
+    def test_only_read_only_queries(self):
+        for method, *args in (('remove_route', 'A', 'B'), ('load_tracks', []), ('_changed',), ('close',)):
+            async def invalid(railroad):
+                return await railroad.query(method, *args)
+
+            self.assertRaises(ValueError, self.run_async, invalid)
+
+        self.assertEqual(self.railroad.get_distance(['A', 'B']), 5)
+
+        async def batch(railroad):
+            return await railroad.query('run_batch', [('get_shortest_distance', 'A', 'C')])
+
+        self.assertEqual(self.run_async(batch), [9])
+
+    def test_coalescing(self):
+        async def identical(railroad):
+            results = await asyncio.gather(*[railroad.count_trips_by_max_dist('C', 'C', 30) for _ in range(10)])
+            return results, railroad.pending
+
+        self.assertEqual(self.run_async(identical), ([7]*10, 0))
+        self.assertEqual(self.railroad.calls, 1)
+
+    def test_backpressure(self):
+        async def distinct(railroad):
+            return await asyncio.gather(*[railroad.count_trips_by_max_dist('C', 'C', limit) for limit in range(20, 26)])
+
+        self.run_async(distinct, max_workers=4, max_pending=2)
+        self.assertEqual(self.railroad.calls, 6)
+        self.assertLessEqual(self.railroad.max_running, 2)
+
+    def test_timeout(self):
+        async def slow(railroad):
+            with self.assertRaises(asyncio.TimeoutError):
+                await railroad.count_trips_by_max_dist('C', 'C', 30, timeout=0.01)
+
+            # the event loop is not blocked by the running query
+            return await railroad.get_distance(['A', 'D']), railroad.pending
+
+        self.assertEqual(self.run_async(slow), (5, 0))
+
+    def test_cancellation(self):
+        async def cancelled(railroad):
+            first = asyncio.ensure_future(railroad.count_trips_by_max_dist('C', 'C', 30))
+            queued = asyncio.ensure_future(railroad.count_trips_by_max_dist('C', 'C', 29))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await queued
+
+            return await first
+
+        self.assertEqual(self.run_async(cancelled, max_pending=1), 7)
+        self.assertEqual(self.railroad.calls, 1)
+
+    def test_profile(self):
+        async def profiled(railroad):
+            with profile() as stats:
+                await railroad.count_trips_by_stops('A', 'C', 4)
+
+            return stats
+
+        self.assertGreater(self.run_async(profiled).counters['nodes_expanded'], 0)
+
+    def test_invalid_max_pending(self):
+        self.assertRaises(ValueError, AsyncRailroad, self.railroad, max_pending=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+'''
+
+Benchmark Test Module
+
+'''
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.benchmark import (BATCH_QUERIES, ENUMERATION_QUERIES, HIERARCHY_QUERIES, QUERIES, REACHABILITY_QUERIES,
+                           TIMETABLE_QUERIES, compare, main, run_benchmarks)
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(['random', 'grid'], [1, 12, 20], num_queries=2)
+
+        self.assertEqual(sorted(results), ['grid-1', 'grid-12', 'grid-20', 'random-1', 'random-12', 'random-20'])
+        metrics = ({'load', 'get_distances_interned', 'build_reachability_index', 'build_hierarchy'} | set(QUERIES)
+                   | set(BATCH_QUERIES) | set(TIMETABLE_QUERIES) | set(REACHABILITY_QUERIES) | set(HIERARCHY_QUERIES))
+
+        self.assertEqual(set(results['grid-12']), metrics | set(ENUMERATION_QUERIES))
+        self.assertEqual(set(results['grid-20']), metrics)
+        self.assertEqual(list(results['random-1']), ['load'])
+
+    def test_compare(self):
+        baseline = {'grid-10': {'load': 1.0, 'get_distance': 2.0}}
+        results = {'grid-10': {'load': 1.2, 'get_distance': 2.6}, 'grid-100': {'load': 9.0}}
+
+        self.assertEqual(compare(results, baseline, tolerance=0.25), [('grid-10', 'get_distance', 2.0, 2.6)])
+        self.assertEqual(compare(results, baseline, tolerance=0.5), [])
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            baseline = os.path.join(directory, 'baseline.json')
+
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main(['--networks', 'grid', '--sizes', '16', '--queries', '2',
+                                       '--output', output]), 0)
+
+            with open(output) as f:
+                results = json.load(f)
+
+            with open(baseline, 'w') as f:
+                json.dump({name: {metric: 0.0 for metric in metrics} for name, metrics in results.items()}, f)
+
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(main(['--networks', 'grid', '--sizes', '16', '--queries', '2',
+                                       '--baseline', baseline]), 1)
+
+            self.assertIn('REGRESSION grid-16 load', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
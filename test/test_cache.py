@@ -0,0 +1,61 @@
+'''
+
+QueryCache Test Module
+
+'''
+
+import threading
+import time
+import unittest
+
+from src.cache import QueryCache
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QueryCache(maxsize=2)
+
+    def test_hit_miss(self):
+        self.assertEqual(self.cache.get_or_compute('a', 0, lambda: 1), 1)
+        self.assertEqual(self.cache.get_or_compute('a', 0, lambda: 2), 1)
+        self.assertEqual(self.cache.stats, {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1})
+
+    def test_eviction(self):
+        self.cache.get_or_compute('a', 0, lambda: 1)
+        self.cache.get_or_compute('b', 0, lambda: 2)
+        self.cache.get_or_compute('a', 0, lambda: 1)
+        self.cache.get_or_compute('c', 0, lambda: 3)
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.get_or_compute('a', 0, lambda: 4), 1)
+        self.assertEqual(self.cache.get_or_compute('b', 0, lambda: 5), 5)
+
+    def test_version_invalidates(self):
+        self.cache.get_or_compute('a', 0, lambda: 1)
+        self.assertEqual(self.cache.get_or_compute('a', 1, lambda: 2), 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_ttl(self):
+        cache = QueryCache(ttl=0.01)
+        cache.get_or_compute('a', 0, lambda: 1)
+        time.sleep(0.02)
+        self.assertEqual(cache.get_or_compute('a', 0, lambda: 2), 2)
+
+    def test_threads(self):
+        def lookups(offset):
+            for i in range(2000):
+                self.cache.get_or_compute((i+offset) % 5, 0, lambda: i)
+
+        threads = [threading.Thread(target=lookups, args=(offset,)) for offset in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.cache.hits + self.cache.misses, 8000)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_invalid_maxsize(self):
+        self.assertRaises(ValueError, QueryCache, 0)
@@ -0,0 +1,85 @@
+'''
+
+CompactGraph Test Module
+
+'''
+
+import itertools
+import math
+import unittest
+
+from src.compact import CompactGraph
+from src.graph import Graph
+
+class TestCompactGraph(unittest.TestCase):
+    edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
+
+    def setUp(self):
+        self.graph = Graph(self.edges)
+        self.compact = CompactGraph.from_graph(self.graph)
+
+    def test_size(self):
+        self.assertEqual(len(self.compact), 5)
+        self.assertEqual(self.compact.num_edges, 9)
+
+    def test_bytes_per_edge(self):
+        edges = [(str(i), str((i*7+j) % 1000), j+1) for i in range(1000) for j in range(1, 10)]
+        compact = CompactGraph.from_graph(Graph(edges))
+        self.assertLessEqual(compact.nbytes / compact.num_edges, 16)
+
+    def test_weight(self):
+        self.assertEqual(self.compact.get_weight(['A', 'E', 'B', 'C', 'D']), 22)
+        self.assertEqual(self.compact.get_weight(['A', 'A']), 0)
+        self.assertEqual(self.compact.get_weight(['A', 'E', 'D']), -1)
+        self.assertEqual(self.compact.get_weight(['A', 'F']), -1)
+
+    def test_get_weights_matches_get_weight(self):
+        routes = [list(path) for n in range(4) for path in itertools.product('ABCDEF', repeat=n)]
+        weights = self.compact.get_weights(*self.compact.encode_routes(routes))
+
+        for route, weight in zip(routes, weights):
+            self.assertEqual(weight, self.graph.get_weight(route), route)
+
+        routes.reverse()
+        self.assertEqual(self.compact.get_weights(*self.compact.encode_routes(iter(routes))), weights[::-1])
+
+    def test_get_paths_matches_graph(self):
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                self.assertEqual(self.compact.get_paths(src, dest, num_nodes=4), self.graph.get_paths(src, dest, num_nodes=4))
+                self.assertEqual(self.compact.get_paths(src, dest, max_nodes=3), self.graph.get_paths(src, dest, max_nodes=3))
+                self.assertEqual(self.compact.get_paths(src, dest, max_weight=30), self.graph.get_paths(src, dest, max_weight=30))
+
+    def test_get_paths_invalid_nodes(self):
+        self.assertRaises(ValueError, self.compact.get_paths, 'A', 'F', num_nodes=4)
+
+    def test_count_paths(self):
+        self.assertEqual(self.compact.count_paths('A', 'C', num_nodes=4), 3)
+        self.assertEqual(self.compact.count_paths('C', 'C', max_nodes=3, min_nodes=1), 2)
+        self.assertEqual(self.compact.count_paths('C', 'C', max_weight=30, min_nodes=1), 7)
+
+    def test_shortest_path(self):
+        self.assertEqual(self.compact.get_shortest_path('A', 'C'), ['A', 'B', 'C'])
+        self.assertEqual(self.compact.get_shortest_path('B', 'B'), ['B', 'C', 'E', 'B'])
+        self.assertEqual(self.compact.get_shortest_path('A', 'A'), ['A'])
+        self.assertEqual(self.compact.get_shortest_path('D', 'A'), [])
+        self.assertEqual(self.compact.get_shortest_path_tree('A').get_distance('C'), 9)
+
+    def test_find_shortest_path_methods(self):
+        heuristic = lambda node: 0
+
+        for method in CompactGraph.SHORTEST_PATH_METHODS:
+            for src, dest in itertools.product('ABCDE', repeat=2):
+                self.assertEqual(self.compact.find_shortest_path(src, dest, method, heuristic)[0],
+                                 self.graph.find_shortest_path(src, dest, method, heuristic)[0])
+
+        self.assertEqual(self.compact.get_shortest_path('A', 'C', 'bidirectional'), ['A', 'B', 'C'])
+        self.assertEqual(self.compact.find_shortest_path('A', 'F', 'astar', heuristic), (math.inf, []))
+        self.assertRaises(ValueError, self.compact.find_shortest_path, 'A', 'C', 'bfs')
+        self.assertRaises(ValueError, self.compact.find_shortest_path, 'A', 'C', 'astar')
+
+    def test_get_k_shortest_paths(self):
+        for src, dest in itertools.product('ABCDE', repeat=2):
+            self.assertEqual(self.compact.get_k_shortest_paths(src, dest, 4), self.graph.get_k_shortest_paths(src, dest, 4))
+
+        self.assertRaises(ValueError, self.compact.get_k_shortest_paths, 'A', 'F', 3)
@@ -0,0 +1,90 @@
+'''
+
+DistanceMatrix Test Module
+
+'''
+
+import os
+import tempfile
+import unittest
+
+from src.distances import DistanceMatrix
+from src.graph import Graph
+
+class TestDistanceMatrix(unittest.TestCase):
+    edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
+
+    def setUp(self):
+        self.graph = Graph(self.edges)
+        self.matrix = DistanceMatrix.from_graph(self.graph)
+
+    def test_matches_shortest_path(self):
+        for src in 'ABCDE':
+            tree = self.graph.get_shortest_path_tree(src)
+
+            for dest in 'ABCDE':
+                self.assertEqual(self.matrix.get_path(src, dest), tree.get_path(dest))
+
+                if tree.get_path(dest):
+                    self.assertEqual(self.matrix.get_distance(src, dest), tree.get_distance(dest))
+                else:
+                    self.assertEqual(self.matrix.get_distance(src, dest), DistanceMatrix.NO_PATH)
+
+    def test_same_src_dest(self):
+        self.assertEqual(self.matrix.get_distance('B', 'B'), 9)
+        self.assertEqual(self.matrix.get_path('B', 'B'), ['B', 'C', 'E', 'B'])
+        self.assertEqual(self.matrix.get_distance('A', 'A'), 0)
+        self.assertEqual(self.matrix.get_path('A', 'A'), ['A'])
+
+    def test_unknown_node(self):
+        self.assertEqual(self.matrix.get_distance('A', 'F'), DistanceMatrix.NO_PATH)
+        self.assertEqual(self.matrix.get_path('A', 'F'), [])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'distances.bin')
+            self.matrix.save(path)
+            matrix = DistanceMatrix.load(path)
+
+        self.assertEqual(matrix.nodes, self.matrix.nodes)
+        self.assertEqual(matrix.distances, self.matrix.distances)
+        self.assertEqual(matrix.next_hops, self.matrix.next_hops)
+
+    def assert_matches_graph(self, matrix, graph):
+        expected = DistanceMatrix.from_graph(graph)
+
+        for src in graph.nodes:
+            for dest in graph.nodes:
+                distance = expected.get_distance(src, dest)
+                self.assertEqual(matrix.get_distance(src, dest), distance)
+
+                if distance == DistanceMatrix.NO_PATH:
+                    self.assertEqual(matrix.get_path(src, dest), [])
+                else:
+                    self.assertEqual(graph.get_weight(matrix.get_path(src, dest)), distance)
+
+    def test_insert_edge(self):
+        for src, dest, weight in [('A', 'C', 1), ('D', 'A', 2), ('E', 'D', 1), ('B', 'C', 1), ('C', 'B', 1)]:
+            self.graph.add_edge(src, dest, weight)
+            self.matrix.insert_edge(src, dest, weight)
+            self.assert_matches_graph(self.matrix, self.graph)
+
+    def test_insert_edge_new_nodes(self):
+        for src, dest, weight in [('E', 'F', 4), ('F', 'A', 1), ('G', 'H', 2), ('H', 'G', 3)]:
+            self.graph.add_edge(src, dest, weight)
+            self.matrix.insert_edge(src, dest, weight)
+            self.assert_matches_graph(self.matrix, self.graph)
+
+    def test_insert_edge_random(self):
+        random = __import__('random').Random(7)
+        graph = Graph()
+        matrix = DistanceMatrix.from_graph(graph)
+
+        for _ in range(150):
+            src, dest = random.sample('ABCDEFGHIJKL', 2)
+            previous = graph.edges.get(src, {}).get(dest)
+            weight = random.randint(1, 20) if previous is None else random.randint(1, previous[0])
+            graph.add_edge(src, dest, weight)
+            matrix.insert_edge(src, dest, weight)
+
+        self.assert_matches_graph(matrix, graph)
@@ -0,0 +1,47 @@
+'''
+
+Generators Test Module
+
+'''
+
+import unittest
+
+from src.generators import NETWORKS, grid_network, random_network, scale_free_network
+
+class TestGenerators(unittest.TestCase):
+
+    def test_random_network(self):
+        tracks = random_network(50, seed=1)
+
+        self.assertEqual(tracks, random_network(50, seed=1))
+        self.assertNotEqual(tracks, random_network(50, seed=2))
+        self.assertTrue(all(src != dest and 1 <= distance <= 9 for src, dest, distance in tracks))
+        self.assertEqual(len(set((src, dest) for src, dest, _ in tracks)), len(tracks))
+
+    def test_grid_network(self):
+        tracks = grid_network(5)
+        pairs = set((src, dest) for src, dest, _ in tracks)
+
+        self.assertEqual(pairs, {('S0', 'S1'), ('S1', 'S0'), ('S0', 'S3'), ('S3', 'S0'),
+                                 ('S1', 'S2'), ('S2', 'S1'), ('S1', 'S4'), ('S4', 'S1'),
+                                 ('S3', 'S4'), ('S4', 'S3')})
+
+    def test_scale_free_network(self):
+        tracks = scale_free_network(200, seed=3)
+        degrees = {}
+
+        for src, dest, _ in tracks:
+            degrees[src] = degrees.get(src, 0) + 1
+            degrees[dest] = degrees.get(dest, 0) + 1
+
+        self.assertEqual(len(degrees), 200)
+        self.assertGreater(max(degrees.values()), 10)
+
+    def test_small_networks(self):
+        for network in NETWORKS.values():
+            self.assertEqual(network(0), [])
+            self.assertEqual(network(1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
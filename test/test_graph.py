@@ -4,9 +4,10 @@ Graph Test Module
 
 '''
 
+import math
 import unittest
 
-from src.graph import Graph
+from src.graph import Graph, walk_paths, walk_paths_within
 
 class TestGraph(unittest.TestCase):
     edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
@@ -115,6 +116,27 @@ class TestGraph(unittest.TestCase):
         self.assertIn(['C', 'E', 'B', 'C', 'E', 'B', 'C'], paths)
         self.assertIn(['C', 'E', 'B', 'C', 'E', 'B', 'C', 'E', 'B', 'C'], paths)
 
+    def test_get_paths_by_max_weight_matches_unpruned(self):
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                for max_weight in (1, 10, 25, 40):
+                    limit = max_weight-1
+                    self.assertEqual(list(walk_paths_within(self.graph.adjacent, self.graph.incoming, src, dest, limit)),
+                                     list(walk_paths(self.graph.adjacent, src, dest, 0, None, limit)))
+
+    def test_get_paths_by_max_weight_skips_dead_ends(self):
+        expanded = []
+
+        def adjacent(node):
+            expanded.append(node)
+            return self.graph.adjacent(node)
+
+        list(walk_paths(adjacent, 'A', 'E', 0, None, 29))
+        unpruned, expanded = len(expanded), []
+
+        list(walk_paths_within(adjacent, self.graph.incoming, 'A', 'E', 29))
+        self.assertLess(len(expanded), unpruned)
+
     # Tests for get_shortest_path method
     def test_shortest_path(self):
         self.assertEqual(self.graph.get_shortest_path('A', 'C'), ['A', 'B', 'C'])
@@ -127,3 +149,202 @@ class TestGraph(unittest.TestCase):
 
     def test_shortest_dist_empty_path(self):
         self.assertEqual(self.graph.get_shortest_path('A', 'A'), ['A'])
+
+
+    # Tests for count_paths method
+    def test_count_paths_all_none(self):
+        self.assertRaises(ValueError, self.graph.count_paths, 'A', 'D')
+
+    def test_count_paths_invalid_nodes(self):
+        self.assertRaises(ValueError, self.graph.count_paths, 'A', 'F', num_nodes=4)
+
+    def test_count_paths_by_num_nodes(self):
+        self.assertEqual(self.graph.count_paths('A', 'C', num_nodes=4), 3)
+
+    def test_count_paths_by_max_nodes_same_src_dest(self):
+        self.assertEqual(self.graph.count_paths('C', 'C', max_nodes=3), 3)
+        self.assertEqual(self.graph.count_paths('C', 'C', max_nodes=3, min_nodes=1), 2)
+
+    def test_count_paths_matches_get_paths(self):
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                for n in range(7):
+                    self.assertEqual(self.graph.count_paths(src, dest, num_nodes=n),
+                                     len(self.graph.get_paths(src, dest, num_nodes=n)))
+                    self.assertEqual(self.graph.count_paths(src, dest, max_nodes=n),
+                                     len(self.graph.get_paths(src, dest, max_nodes=n)))
+
+    def test_count_paths_long_trips(self):
+        self.assertGreater(self.graph.count_paths('C', 'C', max_nodes=200), 10**10)
+
+    def test_count_paths_by_max_weight_matches_get_paths(self):
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                for w in range(0, 40, 3):
+                    self.assertEqual(self.graph.count_paths(src, dest, max_weight=w),
+                                     len(self.graph.get_paths(src, dest, max_weight=w)))
+                    self.assertEqual(self.graph.count_paths(src, dest, max_weight=w, max_nodes=3),
+                                     len(self.graph.get_paths(src, dest, max_weight=w, max_nodes=3)))
+
+    def test_count_paths_by_weight(self):
+        self.assertEqual(self.graph.count_paths('C', 'C', weight=16), 1)
+        self.assertEqual(self.graph.count_paths('C', 'C', weight=25), 2)
+        self.assertEqual(self.graph.count_paths('C', 'C', weight=0), 1)
+        self.assertEqual(self.graph.count_paths('C', 'C', weight=0, min_nodes=1), 0)
+        self.assertEqual(self.graph.count_paths('C', 'C', weight=18, max_weight=18), 0)
+
+    def test_count_paths_large_weight(self):
+        self.assertGreater(self.graph.count_paths('C', 'C', max_weight=3000), 10**90)
+
+    def test_shortest_path_tree(self):
+        tree = self.graph.get_shortest_path_tree('A')
+        self.assertEqual(tree.get_distance('C'), 9)
+        self.assertEqual(tree.get_distance('E'), 7)
+        self.assertEqual(tree.get_distance('A'), 0)
+        self.assertEqual(tree.get_path('E'), ['A', 'E'])
+
+    def test_shortest_path_tree_no_path(self):
+        tree = self.graph.get_shortest_path_tree('D')
+        self.assertEqual(tree.get_distance('A'), math.inf)
+        self.assertEqual(tree.get_path('A'), [])
+
+    def test_shortest_path_tree_cached(self):
+        tree = self.graph.get_shortest_path_tree('A')
+        self.assertIs(self.graph.get_shortest_path_tree('A'), tree)
+
+        self.graph.add_edge('A', 'C', 1)
+        self.assertIsNot(self.graph.get_shortest_path_tree('A'), tree)
+        self.assertEqual(self.graph.get_shortest_path('A', 'C'), ['A', 'C'])
+
+        tree = self.graph.get_shortest_path_tree('A')
+        self.graph.clear_shortest_path_trees()
+        self.assertIsNot(self.graph.get_shortest_path_tree('A'), tree)
+
+    # Tests for iter_paths and iter_simple_paths methods
+    def test_iter_paths_matches_get_paths(self):
+        self.assertEqual(list(self.graph.iter_paths('C', 'C', max_weight=30)), self.graph.get_paths('C', 'C', max_weight=30))
+
+    def test_iter_paths_limit(self):
+        paths = list(self.graph.iter_paths('C', 'C', max_nodes=50, limit=100))
+        self.assertEqual(len(paths), 100)
+        self.assertEqual(paths[:3], [['C'], ['C', 'D', 'C'], ['C', 'D', 'C', 'D', 'C']])
+
+    def test_iter_paths_invalid_nodes(self):
+        self.assertRaises(ValueError, self.graph.iter_paths, 'A', 'F', num_nodes=4)
+
+    def test_find_paths(self):
+        self.assertEqual(self.graph.find_paths('A', 'D'), [['A', 'D'], ['A', 'B', 'C', 'D'], ['A', 'E', 'B', 'C', 'D']])
+
+    def test_iter_simple_paths_limit(self):
+        self.assertEqual(list(self.graph.iter_simple_paths('A', 'D', limit=1)), [['A', 'D']])
+
+    # Tests for count_paths_from method
+    def test_count_paths_from_by_nodes(self):
+        table = self.graph.count_paths_from('A', max_nodes=4)
+
+        for dest in 'ABCDE':
+            for n in range(5):
+                self.assertEqual(table.get(n, {}).get(dest, 0), self.graph.count_paths('A', dest, num_nodes=n))
+
+    def test_count_paths_from_by_weight(self):
+        table = self.graph.count_paths_from('C', max_weight=30)
+
+        for dest in 'ABCDE':
+            self.assertEqual(sum(counts.get(dest, 0) for counts in table.values()), self.graph.count_paths('C', dest, max_weight=30))
+
+    def test_count_paths_from_invalid(self):
+        self.assertRaises(ValueError, self.graph.count_paths_from, 'F', max_nodes=4)
+        self.assertRaises(ValueError, self.graph.count_paths_from, 'A')
+        self.assertRaises(ValueError, self.graph.count_paths_from, 'A', max_nodes=4, max_weight=30)
+
+    # Tests for remove_edge, update_weight and incoming methods
+    def test_incoming(self):
+        self.assertEqual(sorted(self.graph.incoming('C')), [('B', 4), ('D', 8)])
+        self.assertEqual(self.graph.incoming('A'), [])
+
+    def test_remove_edge(self):
+        self.graph.remove_edge('A', 'B')
+        self.assertEqual(self.graph.get_weight(['A', 'B']), -1)
+        self.assertEqual(sorted(self.graph.incoming('B')), [('E', 3)])
+        self.assertEqual(self.graph.get_shortest_path('A', 'C'), ['A', 'D', 'C'])
+        self.assertEqual(len(self.graph.nodes), 5)
+
+    def test_remove_edge_missing(self):
+        self.assertRaises(ValueError, self.graph.remove_edge, 'B', 'A')
+        self.assertRaises(ValueError, self.graph.remove_edge, 'F', 'A')
+
+    def test_update_weight(self):
+        self.assertEqual(self.graph.get_shortest_path('A', 'C'), ['A', 'B', 'C'])
+        self.assertEqual(self.graph.update_weight('A', 'B', 20), 5)
+        self.assertEqual(self.graph.get_weight(['A', 'B']), 20)
+        self.assertIn(('A', 20), self.graph.incoming('B'))
+        self.assertEqual(self.graph.get_shortest_path('A', 'C'), ['A', 'D', 'C'])
+        self.assertRaises(ValueError, self.graph.update_weight, 'B', 'A', 1)
+
+    def test_non_positive_weight(self):
+        self.assertRaises(ValueError, self.graph.add_edge, 'A', 'F', 0)
+        self.assertRaises(ValueError, self.graph.add_edges, [('A', 'F', 2), ('F', 'G', -1)])
+        self.assertRaises(ValueError, self.graph.update_weight, 'A', 'B', 0)
+        self.assertEqual(self.graph.get_weight(['A', 'B']), 5)
+
+    # Tests for find_shortest_path method
+    def test_find_shortest_path_methods(self):
+        heuristic = lambda node: 0
+
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                expected = self.graph.find_shortest_path(src, dest)
+                self.assertEqual(self.graph.find_shortest_path(src, dest, 'bidirectional'), expected)
+                self.assertEqual(self.graph.find_shortest_path(src, dest, 'astar', heuristic), expected)
+
+    def test_find_shortest_path_random(self):
+        random = __import__('random').Random(3)
+        graph = Graph([(random.randrange(60), random.randrange(60), random.randint(1, 9)) for _ in range(240)])
+        nodes = sorted(graph.nodes)
+
+        for _ in range(200):
+            src, dest = random.sample(nodes, 2)
+            distance, path = graph.find_shortest_path(src, dest, 'bidirectional')
+            self.assertEqual(distance, graph.get_shortest_path_tree(src).get_distance(dest))
+            self.assertEqual(graph.get_weight(path) if path else math.inf, distance)
+
+            heuristic = lambda node: min(graph.get_shortest_path_tree(node).get_distance(dest), 5) if node != dest else 0
+            distance, path = graph.find_shortest_path(src, dest, 'astar', heuristic)
+            self.assertEqual(distance, graph.get_shortest_path_tree(src).get_distance(dest))
+
+    def test_find_shortest_path_no_path(self):
+        self.assertEqual(self.graph.find_shortest_path('D', 'A', 'bidirectional'), (math.inf, []))
+        self.assertEqual(self.graph.find_shortest_path('D', 'A', 'astar', lambda node: 0), (math.inf, []))
+        self.assertEqual(self.graph.find_shortest_path('D', 'F', 'bidirectional'), (math.inf, []))
+
+    def test_find_shortest_path_invalid_method(self):
+        self.assertRaises(ValueError, self.graph.find_shortest_path, 'A', 'C', 'bfs')
+        self.assertRaises(ValueError, self.graph.find_shortest_path, 'A', 'C', 'astar')
+
+    # Tests for get_k_shortest_paths method
+    def test_k_shortest_paths(self):
+        self.assertEqual(self.graph.get_k_shortest_paths('A', 'C', 3),
+                         [(9, ['A', 'B', 'C']), (13, ['A', 'D', 'C']), (14, ['A', 'E', 'B', 'C'])])
+
+    def test_k_shortest_paths_matches_simple_paths(self):
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                if src == dest:
+                    continue
+
+                expected = sorted(self.graph.get_weight(path) for path in self.graph.find_paths(src, dest))
+                paths = self.graph.get_k_shortest_paths(src, dest, 10)
+                self.assertEqual([distance for distance, _ in paths], expected)
+
+                for distance, path in paths:
+                    self.assertEqual(self.graph.get_weight(path), distance)
+                    self.assertEqual(len(set(path)), len(path))
+
+    def test_k_shortest_paths_same_src_dest(self):
+        self.assertEqual(self.graph.get_k_shortest_paths('C', 'C', 3),
+                         [(9, ['C', 'E', 'B', 'C']), (16, ['C', 'D', 'C']), (21, ['C', 'D', 'E', 'B', 'C'])])
+        self.assertEqual(self.graph.get_k_shortest_paths('A', 'A', 3), [])
+
+    def test_k_shortest_paths_no_path(self):
+        self.assertEqual(self.graph.get_k_shortest_paths('D', 'A', 3), [])
+        self.assertRaises(ValueError, self.graph.get_k_shortest_paths, 'A', 'F', 3)
@@ -0,0 +1,98 @@
+'''
+
+ContractionHierarchy Test Module
+
+'''
+
+import os
+import tempfile
+import unittest
+
+from src.compact import CompactGraph
+from src.generators import grid_network, random_network
+from src.graph import Graph
+from src.hierarchy import ContractionHierarchy
+from src.instrumentation import profile
+
+class TestContractionHierarchy(unittest.TestCase):
+    edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
+
+    def assertMatchesGraph(self, hierarchy, graph):
+        for src in graph.nodes:
+            tree = graph.get_shortest_path_tree(src)
+
+            for dest in graph.nodes - {src}:
+                path = hierarchy.get_path(src, dest)
+
+                if dest in tree.distances:
+                    self.assertEqual(hierarchy.get_distance(src, dest), tree.distances[dest])
+                    self.assertEqual(graph.get_weight(path), tree.distances[dest])
+                    self.assertEqual((path[0], path[-1]), (src, dest))
+                else:
+                    self.assertEqual(hierarchy.get_distance(src, dest), ContractionHierarchy.NO_PATH)
+                    self.assertEqual(path, [])
+
+    def test_get_distance(self):
+        graph = Graph(self.edges)
+        hierarchy = ContractionHierarchy.from_graph(graph)
+
+        self.assertMatchesGraph(hierarchy, graph)
+        self.assertEqual(hierarchy.get_distance('A', 'A'), 0)
+        self.assertEqual(hierarchy.get_path('A', 'A'), ['A'])
+        self.assertEqual(hierarchy.get_distance('A', 'F'), ContractionHierarchy.NO_PATH)
+        self.assertEqual(hierarchy.get_path('F', 'A'), [])
+
+    def test_random_networks(self):
+        for seed in range(5):
+            graph = Graph(random_network(40, 2, seed=seed))
+            self.assertMatchesGraph(ContractionHierarchy.from_graph(graph), graph)
+
+    def test_core(self):
+        class SmallCore(ContractionHierarchy):
+            CORE_DEGREE = 4
+
+        for seed in range(5):
+            graph = Graph(random_network(40, 3, seed=seed))
+            hierarchy = SmallCore.from_graph(graph)
+
+            self.assertEqual(sorted(hierarchy.rank), list(range(40)))
+            self.assertMatchesGraph(hierarchy, graph)
+
+    def test_compact_graph(self):
+        graph = Graph(random_network(30, 3, seed=2))
+        compact = CompactGraph.from_graph(graph, nodes=sorted(graph.nodes, reverse=True))
+        hierarchy = ContractionHierarchy.from_graph(compact)
+
+        self.assertEqual(hierarchy.nodes, compact.nodes)
+        self.assertMatchesGraph(hierarchy, graph)
+
+    def test_search_space(self):
+        graph = Graph(grid_network(400))
+        hierarchy = ContractionHierarchy.from_graph(graph)
+        src, dest = min(graph.nodes), max(graph.nodes)
+
+        with profile() as tree_stats:
+            distance = graph.get_shortest_path_tree(src).get_distance(dest)
+
+        with profile() as stats:
+            self.assertEqual(hierarchy.get_distance(src, dest), distance)
+
+        self.assertLess(stats.counters['nodes_expanded'], tree_stats.counters['nodes_expanded'] / 2)
+
+    def test_save_load(self):
+        graph = Graph(random_network(30, 3, seed=1))
+        hierarchy = ContractionHierarchy.from_graph(graph)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'hierarchy.bin')
+            hierarchy.save(path)
+            loaded = ContractionHierarchy.load(path)
+
+        self.assertEqual(loaded.nodes, hierarchy.nodes)
+        self.assertEqual(loaded.upward, hierarchy.upward)
+        self.assertEqual(loaded.downward, hierarchy.downward)
+        self.assertMatchesGraph(loaded, graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+'''
+
+Instrumentation Test Module
+
+'''
+
+import unittest
+
+from src.compact import CompactGraph
+from src.graph import Graph
+from src.instrumentation import active, profile, timer
+from src.railroad import RailroadService
+
+class TestInstrumentation(unittest.TestCase):
+    edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
+
+    def setUp(self):
+        self.graph = Graph(self.edges)
+
+    def test_disabled(self):
+        self.assertIsNone(active())
+        self.assertEqual(len(self.graph.get_paths('C', 'C', max_weight=30)), 8)
+
+    def test_get_paths(self):
+        with profile() as stats:
+            paths = self.graph.get_paths('C', 'C', max_nodes=4)
+
+        self.assertEqual(stats.counters['paths_produced'], len(paths))
+        self.assertGreater(stats.counters['nodes_expanded'], 0)
+        self.assertGreaterEqual(stats.counters['edges_relaxed'], stats.counters['nodes_expanded'])
+        self.assertEqual(stats.counters['heap_pushes'], 0)
+        self.assertIsNone(active())
+
+        # distances to dest are searched first with a weight limit
+        with profile() as stats:
+            paths = self.graph.get_paths('C', 'C', max_weight=30)
+
+        self.assertEqual(stats.counters['paths_produced'], len(paths))
+        self.assertGreater(stats.counters['heap_pushes'], 0)
+
+    def test_get_shortest_path(self):
+        with profile() as stats:
+            self.assertEqual(self.graph.get_shortest_path('A', 'C'), ['A', 'B', 'C'])
+
+        self.assertEqual(stats.counters['nodes_expanded'], 5)
+        self.assertEqual(stats.counters['edges_relaxed'], 9)
+        self.assertEqual(stats.counters['paths_produced'], 1)
+        self.assertGreater(stats.counters['heap_pushes'], 0)
+
+        for method in ('bidirectional', 'astar'):
+            with profile() as stats:
+                self.graph.get_shortest_path('A', 'C', method, heuristic=lambda node: 0)
+
+            self.assertGreater(stats.counters['heap_pushes'], 0)
+
+    def test_get_weight(self):
+        with profile() as stats:
+            self.graph.get_weight(['A', 'E', 'B', 'C', 'D'])
+            CompactGraph.from_graph(self.graph).get_weight(['A', 'B'])
+
+        self.assertEqual(stats.counters['edges_relaxed'], 5)
+
+    def test_nested(self):
+        with profile() as outer:
+            with timer('outer'):
+                with profile() as inner:
+                    self.graph.get_paths('A', 'C', num_nodes=2)
+
+        self.assertEqual(inner.counters, outer.counters)
+        self.assertIn('outer', outer.timings)
+        self.assertNotIn('outer', inner.timings)
+
+    def test_callback(self):
+        reports = []
+
+        with profile(reports.append) as stats:
+            self.graph.get_paths('A', 'C', num_nodes=2)
+
+        self.assertEqual(reports, [stats])
+        self.assertGreater(stats.seconds, 0)
+
+    def test_railroad(self):
+        reports = []
+        railroad = RailroadService(['AB5', 'BC4', 'CE2'], query_hook=lambda *report: reports.append(report))
+
+        self.assertEqual(railroad.get_shortest_distance('A', 'E'), 11)
+        self.assertEqual(railroad.count_trips_by_max_stops('A', 'C', 3), 1)
+
+        self.assertEqual([(kind, args) for kind, args, _ in reports],
+                         [('get_shortest_distance', ('A', 'E')), ('count_trips_by_max_stops', ('A', 'C', 3))])
+        self.assertEqual(list(reports[0][2].timings), ['get_shortest_distance'])
+        self.assertEqual(reports[0][2].counters['nodes_expanded'], 4)
+
+        with profile() as stats:
+            railroad.filter_trips([['A'], ['A', 'B']])
+            railroad.get_distance(['A', 'B'])
+
+        self.assertEqual(set(stats.timings), {'filter_trips', 'get_distance'})
+        self.assertEqual(len(reports), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
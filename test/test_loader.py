@@ -0,0 +1,58 @@
+'''
+
+Loader Test Module
+
+'''
+
+import io
+import os
+import tempfile
+import unittest
+
+from src.graph import Graph
+from src.loader import iter_tracks, load_tracks
+
+class TestLoader(unittest.TestCase):
+    tracks = 'KAI,INV,120\nINV,WLG,45\n\nWLG,KAI,300\n'
+
+    def test_iter_tracks(self):
+        routes = list(iter_tracks(io.StringIO(self.tracks)))
+        self.assertEqual(routes, [('KAI', 'INV', 120), ('INV', 'WLG', 45), ('WLG', 'KAI', 300)])
+
+    def test_iter_tracks_small_chunks(self):
+        routes = list(iter_tracks(io.StringIO(self.tracks.rstrip('\n')), chunk_size=4))
+        self.assertEqual(routes, [('KAI', 'INV', 120), ('INV', 'WLG', 45), ('WLG', 'KAI', 300)])
+
+    def test_iter_tracks_delimiter(self):
+        routes = list(iter_tracks(io.StringIO('KAI\tINV\t120\n'), delimiter='\t'))
+        self.assertEqual(routes, [('KAI', 'INV', 120)])
+
+    def test_iter_tracks_padded_names(self):
+        routes = list(iter_tracks(io.StringIO(' KAI,INV,120\nINV ,\tWLG,45\nWLG,KAI,300\n')))
+        self.assertEqual(routes, [('KAI', 'INV', 120), ('INV', 'WLG', 45), ('WLG', 'KAI', 300)])
+
+    def test_iter_tracks_invalid(self):
+        self.assertRaises(ValueError, list, iter_tracks(io.StringIO('KAI,INV,120\nKAI,INV\n')))
+        self.assertRaises(ValueError, list, iter_tracks(io.StringIO('KAI,INV,far\n')))
+        self.assertRaises(ValueError, list, iter_tracks(io.StringIO('KAI,INV,0\n')))
+        self.assertRaises(ValueError, list, iter_tracks(io.StringIO('KAI,INV,-3\n')))
+
+    def test_load_tracks(self):
+        graph = Graph()
+        stats = load_tracks(io.StringIO(self.tracks), graph)
+        self.assertEqual(stats.tracks, 3)
+        self.assertEqual(graph.get_weight(['KAI', 'INV', 'WLG']), 165)
+        self.assertEqual(graph.nodes, {'KAI', 'INV', 'WLG'})
+
+    def test_load_tracks_path(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'tracks.csv')
+
+            with open(path, 'w') as f:
+                f.write(self.tracks)
+
+            graph = Graph()
+            stats = load_tracks(path, graph)
+
+        self.assertEqual(stats.tracks, 3)
+        self.assertGreater(stats.tracks_per_second, 0)
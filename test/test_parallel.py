@@ -0,0 +1,56 @@
+'''
+
+ParallelRailroad Test Module
+
+'''
+
+import os
+import tempfile
+import unittest
+
+from src.parallel import ParallelRailroad
+from src.railroad import RailroadService
+
+class TestParallelRailroad(unittest.TestCase):
+    tracks = ['AB5', 'BC4', 'CD8', 'DC8', 'DE6', 'AD5', 'CE2', 'EB3', 'AE7']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.railroad = RailroadService(cls.tracks)
+        path = os.path.join(cls.tmpdir.name, 'network.snap')
+        cls.railroad.save_snapshot(path)
+        cls.parallel = ParallelRailroad(path, max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parallel.close()
+        cls.tmpdir.cleanup()
+
+    def test_get_paths(self):
+        graph = self.railroad.graph
+
+        for split_depth in range(4):
+            for src in 'ABCDE':
+                for dest in 'ABCDE':
+                    self.assertEqual(self.parallel.get_paths(src, dest, max_weight=30, split_depth=split_depth),
+                                     graph.get_paths(src, dest, max_weight=30))
+                    self.assertEqual(self.parallel.get_paths(src, dest, num_nodes=4, split_depth=split_depth),
+                                     graph.get_paths(src, dest, num_nodes=4))
+                    self.assertEqual(self.parallel.get_paths(src, dest, max_nodes=3, split_depth=split_depth),
+                                     graph.get_paths(src, dest, max_nodes=3))
+
+    def test_get_paths_invalid(self):
+        self.assertRaises(ValueError, self.parallel.get_paths, 'A', 'F', num_nodes=4)
+        self.assertRaises(ValueError, self.parallel.get_paths, 'A', 'D')
+
+    def test_run_batch(self):
+        queries = [
+            ('get_distance', ['A', 'B', 'C']),
+            ('count_trips_by_max_stops', 'C', 'C', 3),
+            ('count_trips_by_stops', 'A', 'C', 4),
+            ('get_shortest_distance', 'B', 'B'),
+            ('count_trips_by_max_dist', 'C', 'C', 30),
+            ('get_distance', []),
+        ]
+        self.assertEqual(self.parallel.run_batch(queries), self.railroad.run_batch(queries))
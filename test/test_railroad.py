@@ -3,6 +3,9 @@
 RailroadService Test Module
 
 '''
+import io
+import os
+import tempfile
 import unittest
 
 from src.railroad import RailroadService
@@ -22,6 +25,42 @@ class TestRailroadService(unittest.TestCase):
         routes = RailroadService.parse_tracks(['AB5', 'BC4'])
         self.assertEqual(routes, [('A', 'B', 5), ('B', 'C', 4)])
 
+    def test_zero_distance_track(self):
+        self.assertRaises(ValueError, RailroadService, 'AB0, BC3')
+
+    def test_remove_route(self):
+        self.railroad.remove_route('A', 'B')
+        self.assertEqual(self.railroad.get_distance(['A', 'B', 'C']), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 13)
+        self.assertRaises(ValueError, self.railroad.remove_route, 'A', 'B')
+
+    def test_update_route(self):
+        self.railroad.precompute_distances()
+        self.railroad.update_route('A', 'B', 1)
+        self.assertIsNotNone(self.railroad.distance_matrix)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 5)
+
+        self.railroad.update_route('A', 'B', 30)
+        self.assertIsNone(self.railroad.distance_matrix)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 13)
+
+    def test_load_tracks(self):
+        stats = self.railroad.load_tracks(io.StringIO('E,KAI,1\nKAI,A,2\n'))
+        self.assertEqual(stats.tracks, 2)
+        self.assertEqual(self.railroad.get_shortest_distance('D', 'A'), 9)
+
+    def test_load_tracks_failed(self):
+        railroad = RailroadService(['AB4', 'BC5'], cache_size=16)
+        railroad.precompute_distances()
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(railroad.graph.get_shortest_path_tree('A').get_distance('C'), 9)
+
+        self.assertRaises(ValueError, railroad.load_tracks, io.StringIO('A,C,1\nA,D,-3\n'))
+
+        self.assertIsNone(railroad.distance_matrix)
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 1)
+        self.assertEqual(railroad.get_shortest_route('A', 'C'), ['A', 'C'])
+
     def test_num_stops(self):
         self.assertEqual(len(self.railroad.stops), 5)
 
@@ -50,6 +89,31 @@ class TestRailroadService(unittest.TestCase):
     def test_distance4(self):
         self.assertEqual(self.railroad.get_distance(['A', 'E', 'B', 'C', 'D']), 22)
 
+    def test_distances(self):
+        routes = [['A', 'B', 'C'], ['A', 'D'], ['A', 'D', 'C'], ['A', 'E', 'B', 'C', 'D'], ['A', 'E', 'D'],
+                  [], ['A', 'A'], ['A', 'F']]
+        self.assertEqual(list(self.railroad.get_distances(routes)), [9, 5, 13, 22, -1, 0, 0, -1])
+
+        self.railroad.add_route('E', 'D', 1)
+        self.assertEqual(list(self.railroad.get_distances([['A', 'E', 'D']])), [8])
+
+    def test_distances_unknown_stop(self):
+        for route in (['F', 'F'], ['F', 'F', 'A'], ['A', 'F', 'F'], ['F']):
+            distance = self.railroad.get_distance(route)
+            self.assertEqual(self.railroad.get_distances([route])[0], -1 if distance == RailroadService.NO_SUCH_ROUTE else distance, route)
+
+        self.assertEqual(self.railroad.get_distance(['F', 'F']), RailroadService.NO_SUCH_ROUTE)
+        self.assertNotIn('F', self.railroad.graph.edges)
+        self.assertEqual(list(self.railroad.get_distances([['A', 'B'], []])), [5, 0])
+        self.assertEqual(list(self.railroad.get_distances([[]])), [0])
+        self.assertEqual(list(self.railroad.get_distances([])), [])
+
+    def test_distances_interned(self):
+        index = self.railroad.compact_graph().index
+        routes = [index[stop] for stop in 'ABCAD']
+        self.assertEqual(list(self.railroad.get_distances(routes, [0, 3, 3, 5])), [9, 0, 5])
+        self.assertEqual(list(self.railroad.get_distances(routes, [0, 3, 5, 5])), [9, 5, 0])
+
 
     # Tests for count_trips_by_stops method
     def test_count_trips_by_stops(self):
@@ -78,6 +142,9 @@ class TestRailroadService(unittest.TestCase):
     def test_count_trips_by_max_stops_same_src_dest(self):
         self.assertEqual(self.railroad.count_trips_by_max_stops('C', 'C', 3), 2)
 
+    def test_count_trips_by_max_stops_long_trips(self):
+        self.assertEqual(self.railroad.count_trips_by_max_stops('C', 'C', 12), 111)
+
 
     # Tests for count_trips_by_max_dist method
     def test_count_trips_by_max_dist(self):
@@ -92,6 +159,9 @@ class TestRailroadService(unittest.TestCase):
     def test_count_trips_by_max_dist_same_src_dest(self):
         self.assertEqual(self.railroad.count_trips_by_max_dist('C', 'C', 30), 7)
 
+    def test_count_trips_by_max_dist_large_distance(self):
+        self.assertGreater(self.railroad.count_trips_by_max_dist('C', 'C', 3000), 10**90)
+
 
     # Tests for get_shortest_distance method
     def test_shortest_dist(self):
@@ -105,3 +175,300 @@ class TestRailroadService(unittest.TestCase):
 
     def test_shortest_dist_empty_route(self):
         self.assertEqual(self.railroad.get_shortest_distance('A', 'A'), 0)
+
+    def test_shortest_dist_methods(self):
+        for method, heuristic in [('tree', None), ('bidirectional', None), ('astar', lambda stop: 0)]:
+            railroad = RailroadService(self.tracks)
+            self.assertEqual(railroad.get_shortest_distance('A', 'C', method, heuristic), 9)
+            self.assertEqual(railroad.get_shortest_distance('B', 'B', method, heuristic), 9)
+            self.assertEqual(railroad.get_shortest_distance('D', 'A', method, heuristic), RailroadService.NO_SUCH_ROUTE)
+
+    # Tests for iter_trips and count_routes methods
+    def test_iter_trips(self):
+        trips = list(self.railroad.iter_trips('C', 'C', max_stops=3))
+        self.assertEqual(trips, [['C', 'D', 'C'], ['C', 'E', 'B', 'C']])
+
+    def test_iter_trips_limit(self):
+        self.assertEqual(len(list(self.railroad.iter_trips('C', 'C', max_distance=3000, limit=10))), 10)
+
+    def test_count_routes(self):
+        self.assertEqual(self.railroad.count_routes('A', 'D'), 3)
+        self.assertEqual(self.railroad.count_routes('A', 'A'), 0)
+
+    # Tests for get_k_shortest_routes method
+    def test_k_shortest_routes(self):
+        self.assertEqual(self.railroad.get_k_shortest_routes('A', 'C', 2), [(9, ['A', 'B', 'C']), (13, ['A', 'D', 'C'])])
+        self.assertEqual(self.railroad.get_k_shortest_routes('D', 'A'), RailroadService.NO_SUCH_ROUTE)
+
+    # Tests for the reachability index
+    def test_reachability_index(self):
+        self.railroad.build_reachability_index()
+        self.railroad.add_route('F', 'G', 1)
+
+        self.assertEqual(self.railroad.get_shortest_distance('D', 'A'), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(self.railroad.get_shortest_route('A', 'G'), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'A'), 0)
+        self.assertEqual(self.railroad.count_trips_by_max_dist('A', 'A', 30), 0)
+        self.assertEqual(self.railroad.count_trips_by_stops('C', 'A', 4), 0)
+        self.assertEqual(self.railroad.count_routes('F', 'A'), 0)
+        self.assertEqual(list(self.railroad.iter_trips('G', 'F', max_stops=3)), [])
+        self.assertEqual(self.railroad.get_k_shortest_routes('G', 'F'), RailroadService.NO_SUCH_ROUTE)
+        self.assertRaises(ValueError, self.railroad.count_trips_by_stops, 'A', 'X', 4)
+
+        self.railroad.add_route('C', 'F', 1)
+        self.railroad.add_route('G', 'A', 1)
+        self.assertEqual(self.railroad.get_shortest_distance('D', 'A'), 11)
+        self.assertEqual(self.railroad.count_trips_by_max_stops('A', 'A', 5), 2)
+
+        unindexed = RailroadService(self.tracks + ['FG1', 'CF1', 'GA1'])
+
+        for src in 'ABCDEFG':
+            for dest in 'ABCDEFG':
+                self.assertEqual(self.railroad.count_trips_by_max_dist(src, dest, 20),
+                                 unindexed.count_trips_by_max_dist(src, dest, 20))
+
+        # closing a route drops the index until it is built again
+        self.railroad.remove_route('G', 'A')
+        self.assertIsNone(self.railroad.reachability)
+        self.assertEqual(self.railroad.get_shortest_distance('D', 'A'), RailroadService.NO_SUCH_ROUTE)
+        self.railroad.build_reachability_index()
+        self.assertFalse(self.railroad.reachability.has_path('D', 'A'))
+
+    # Tests for scheduled departures
+    def test_earliest_arrival(self):
+        for departure in ('08:00', '08:30', '09:00'):
+            self.railroad.add_departure('A', 'B', departure)
+
+        self.railroad.add_departure('B', 'C', '08:10')
+        self.railroad.add_departure('B', 'C', '08:40')
+        self.railroad.add_departure('A', 'D', 485, 500)
+
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:00'), '08:14')
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', 490), 524)
+        self.assertEqual(self.railroad.get_earliest_journey('A', 'C', '08:10'),
+                         [('A', 'B', '08:30', '08:35'), ('B', 'C', '08:40', '08:44')])
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:41'), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'D', '08:00'), '08:20')
+
+    def test_departures_on_changed_routes(self):
+        self.railroad.add_departure('A', 'B', '08:00')
+        self.railroad.add_departure('B', 'C', '08:10')
+        self.railroad.add_departure('A', 'D', 485, 500)
+        self.railroad.add_departure('D', 'C', 501, 515)
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:00'), '08:14')
+
+        self.railroad.update_route('A', 'B', 20)
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:00'), '08:35')
+
+        self.railroad.add_departure('A', 'B', '08:00')
+        self.railroad.remove_route('B', 'C')
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:00'), '08:35')
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'B', '08:00'), '08:20')
+
+        self.railroad.remove_route('D', 'C')
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:00'), RailroadService.NO_SUCH_ROUTE)
+
+    def test_earliest_arrival_without_departures(self):
+        self.assertEqual(self.railroad.get_earliest_arrival('A', 'C', '08:00'), RailroadService.NO_SUCH_ROUTE)
+
+    def test_add_departure_invalid(self):
+        self.assertRaises(ValueError, self.railroad.add_departure, 'A', 'C', '08:00')
+        self.assertRaises(ValueError, self.railroad.add_departure, 'A', 'A', '08:00')
+        self.assertRaises(ValueError, self.railroad.add_departure, 'A', 'B', '08:00', '07:00')
+
+    # Tests for precomputed distances
+    def test_precomputed_shortest_dist(self):
+        self.railroad.precompute_distances()
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(self.railroad.get_shortest_distance('B', 'B'), 9)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'A'), 0)
+        self.assertEqual(self.railroad.get_shortest_distance('D', 'A'), RailroadService.NO_SUCH_ROUTE)
+
+    def test_precomputed_shortest_route(self):
+        self.railroad.precompute_distances()
+        self.assertEqual(self.railroad.get_shortest_route('A', 'C'), ['A', 'B', 'C'])
+        self.assertEqual(self.railroad.get_shortest_route('D', 'A'), RailroadService.NO_SUCH_ROUTE)
+
+    def test_precomputed_distances_updated_on_add_route(self):
+        self.railroad.precompute_distances()
+        self.railroad.add_route('A', 'C', 1)
+        self.railroad.add_route('D', 'F', 2)
+        self.railroad.add_route('F', 'A', 2)
+
+        self.assertIsNotNone(self.railroad.distance_matrix)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 1)
+        self.assertEqual(self.railroad.get_shortest_route('C', 'A'), ['C', 'D', 'F', 'A'])
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'A'), 9)
+
+    def test_precomputed_distances_dropped_on_longer_route(self):
+        self.railroad.precompute_distances()
+        self.railroad.add_route('A', 'B', 50)
+
+        self.assertIsNone(self.railroad.distance_matrix)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 13)
+
+    def test_save_load_distances(self):
+        self.railroad.precompute_distances()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'distances.bin')
+            self.railroad.save_distances(path)
+
+            railroad = RailroadService(self.tracks)
+            railroad.load_distances(path)
+
+            self.assertRaises(ValueError, RailroadService(['AB5']).load_distances, path)
+
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(railroad.get_shortest_route('B', 'B'), ['B', 'C', 'E', 'B'])
+
+    def test_save_distances_not_precomputed(self):
+        self.assertRaises(ValueError, self.railroad.save_distances, 'distances.bin')
+
+    def test_hierarchy(self):
+        self.railroad.build_hierarchy()
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(self.railroad.get_shortest_distance('B', 'B'), 9)
+        self.assertEqual(self.railroad.get_shortest_route('A', 'C'), ['A', 'B', 'C'])
+        self.assertEqual(self.railroad.get_shortest_route('D', 'A'), RailroadService.NO_SUCH_ROUTE)
+
+        self.railroad.add_route('A', 'C', 1)
+
+        self.assertIsNone(self.railroad.hierarchy)
+        self.assertEqual(self.railroad.get_shortest_distance('A', 'C'), 1)
+
+    def test_shortest_backends_agree(self):
+        tree, matrix, hierarchy = (RailroadService(self.tracks) for _ in range(3))
+        matrix.precompute_distances()
+        hierarchy.build_hierarchy()
+
+        for src in 'ABCDEF':
+            for dest in 'ABCDEF':
+                for railroad in (matrix, hierarchy):
+                    self.assertEqual(railroad.get_shortest_distance(src, dest), tree.get_shortest_distance(src, dest))
+                    self.assertEqual(railroad.get_shortest_route(src, dest), tree.get_shortest_route(src, dest))
+
+        self.assertEqual(matrix.get_shortest_distance('F', 'F'), 0)
+        self.assertEqual(hierarchy.hierarchy.get_distance('F', 'F'), 0)
+
+    def test_save_load_hierarchy(self):
+        self.assertRaises(ValueError, self.railroad.save_hierarchy, 'hierarchy.bin')
+        self.railroad.build_hierarchy()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'hierarchy.bin')
+            self.railroad.save_hierarchy(path)
+
+            railroad = RailroadService(self.tracks)
+            railroad.load_hierarchy(path)
+
+            self.assertRaises(ValueError, RailroadService(['AB5']).load_hierarchy, path)
+
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(railroad.get_shortest_route('A', 'D'), ['A', 'D'])
+
+    def test_snapshot(self):
+        self.railroad.precompute_distances()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'network.snap')
+            self.railroad.save_snapshot(path)
+            railroad = RailroadService.from_snapshot(path)
+
+            self.assertEqual(len(railroad.stops), 5)
+            self.assertEqual(railroad.get_distance(['A', 'B', 'C']), 9)
+            self.assertEqual(railroad.count_trips_by_stops('A', 'C', 4), 3)
+            self.assertEqual(railroad.count_trips_by_max_dist('C', 'C', 30), 7)
+            self.assertEqual(railroad.count_routes('A', 'D'), 3)
+            self.assertEqual(railroad.get_shortest_distance('B', 'B'), 9)
+            self.assertEqual(railroad.get_shortest_route('A', 'C'), ['A', 'B', 'C'])
+            self.assertEqual(railroad.get_shortest_distance('A', 'C', 'bidirectional'), 9)
+            self.assertEqual(railroad.get_shortest_distance('A', 'C', 'astar', lambda stop: 0), 9)
+            self.assertEqual(railroad.get_k_shortest_routes('C', 'C', 2), self.railroad.get_k_shortest_routes('C', 'C', 2))
+
+            railroad.build_hierarchy()
+            self.assertEqual(railroad.get_shortest_route('A', 'C'), ['A', 'B', 'C'])
+
+            self.assertRaises(ValueError, railroad.add_route, 'A', 'F', 3)
+            self.assertRaises(ValueError, railroad.remove_route, 'A', 'B')
+            self.assertRaises(ValueError, railroad.update_route, 'A', 'B', 3)
+            self.assertRaises(ValueError, railroad.load_tracks, io.StringIO('A,F,3\n'))
+            self.assertEqual(railroad.get_distance(['A', 'B']), 5)
+            del railroad
+
+    # Tests for run_batch method
+    def test_run_batch(self):
+        queries = [
+            ('get_distance', ['A', 'B', 'C']),
+            ('get_distance', ['A', 'E', 'D']),
+            ('count_trips_by_max_stops', 'C', 'C', 3),
+            ('count_trips_by_stops', 'A', 'C', 4),
+            ('get_shortest_distance', 'A', 'C'),
+            ('get_shortest_distance', 'B', 'B'),
+            ('count_trips_by_max_dist', 'C', 'C', 30),
+            ('count_trips_by_max_dist', 'C', 'D', 8),
+            ('count_trips_by_stops', 'A', 'D', 2),
+            ('count_trips_by_max_stops', 'D', 'A'),
+            ('get_shortest_distance', 'D', 'A'),
+        ]
+        expected = [getattr(self.railroad, method)(*args) for method, *args in queries]
+
+        self.assertEqual(self.railroad.run_batch(queries), expected)
+        self.assertEqual(expected, [9, RailroadService.NO_SUCH_ROUTE, 2, 3, 9, 9, 7, 0, 0, 0, RailroadService.NO_SUCH_ROUTE])
+
+    def test_run_batch_all_pairs(self):
+        queries = [(method, src, dest, limit) for method in ('count_trips_by_stops', 'count_trips_by_max_stops')
+                   for src in 'ABCDE' for dest in 'ABCDE' for limit in range(6)]
+        queries += [('count_trips_by_max_dist', src, dest, limit) for src in 'ABCDE' for dest in 'ABCDE' for limit in range(0, 40, 3)]
+        expected = [getattr(self.railroad, method)(*args) for method, *args in queries]
+
+        self.assertEqual(self.railroad.run_batch(queries), expected)
+
+    def test_run_batch_invalid(self):
+        self.assertRaises(ValueError, self.railroad.run_batch, [('parse_tracks', 'AB5')])
+        self.assertRaises(ValueError, self.railroad.run_batch, [('count_trips_by_stops', 'A', 'F', 2)])
+
+    def test_run_batch_cache_and_hook(self):
+        reports = []
+        railroad = RailroadService(self.tracks, cache_size=16, query_hook=lambda *report: reports.append(report))
+        queries = [('count_trips_by_stops', 'A', 'C', 4), ('count_trips_by_max_stops', 'C', 'C', 3),
+                   ('count_trips_by_max_dist', 'C', 'C', 30), ('get_shortest_distance', 'A', 'C')]
+
+        self.assertEqual(railroad.run_batch(queries), [3, 2, 7, 9])
+        self.assertEqual([(kind, args) for kind, args, _ in reports], [(method, tuple(args)) for method, *args in queries[3:] + queries[:3]])
+        self.assertEqual(railroad.cache.stats['misses'], 4)
+
+        self.assertEqual(railroad.run_batch(queries), [3, 2, 7, 9])
+        self.assertEqual(railroad.cache.stats['hits'], 4)
+        self.assertEqual(len(reports), 8)
+
+    # Tests for the query cache
+    def test_cache(self):
+        railroad = RailroadService(self.tracks, cache_size=16)
+
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(railroad.count_trips_by_max_dist('C', 'C', 30), 7)
+        self.assertEqual(railroad.count_trips_by_max_dist('C', 'C', 30), 7)
+        self.assertEqual(railroad.get_distance(['A', 'E', 'D']), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(railroad.get_distance(['A', 'E', 'D']), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(railroad.cache.stats, {'hits': 3, 'misses': 3, 'evictions': 0, 'size': 3})
+
+    def test_cache_shortest_distance_method(self):
+        railroad = RailroadService(self.tracks, cache_size=16)
+
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertRaises(ValueError, railroad.get_shortest_distance, 'A', 'C', 'bogus')
+        self.assertEqual(railroad.get_shortest_distance('A', 'C', 'astar', lambda stop: 100), 9)
+        self.assertEqual(railroad.get_shortest_distance('A', 'C', 'bidirectional'), 9)
+        self.assertEqual(railroad.cache.stats['size'], 2)
+
+    def test_cache_invalidated_on_add_route(self):
+        railroad = RailroadService(self.tracks, cache_size=16)
+
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 9)
+        self.assertEqual(railroad.get_shortest_route('A', 'C'), ['A', 'B', 'C'])
+        railroad.add_route('A', 'C', 1)
+        self.assertEqual(railroad.get_shortest_distance('A', 'C'), 1)
+        self.assertEqual(railroad.get_shortest_route('A', 'C'), ['A', 'C'])
+        self.assertEqual(railroad.cache.hits, 0)
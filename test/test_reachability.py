@@ -0,0 +1,80 @@
+'''
+
+ReachabilityIndex Test Module
+
+'''
+
+import unittest
+
+from src.compact import CompactGraph
+from src.generators import random_network
+from src.graph import Graph
+from src.reachability import ReachabilityIndex
+
+class TestReachabilityIndex(unittest.TestCase):
+    edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
+
+    def setUp(self):
+        self.graph = Graph(self.edges)
+        self.index = ReachabilityIndex.from_graph(self.graph)
+
+    def has_path(self, graph, src, dest):
+        ''' Tells by a graph search whether a path with at least one edge leads from src to dest '''
+        seen, stack = set(), [neighbour for neighbour, _ in graph.adjacent(src)]
+
+        while stack:
+            node = stack.pop()
+
+            if node not in seen:
+                seen.add(node)
+                stack.extend(neighbour for neighbour, _ in graph.adjacent(node))
+
+        return dest in seen
+
+    def test_components(self):
+        self.assertEqual(len(set(self.index.component.values())), 2)
+        self.assertEqual(len({self.index.component[node] for node in 'BCDE'}), 1)
+
+    def test_reaches(self):
+        self.assertTrue(self.index.reaches('A', 'C'))
+        self.assertTrue(self.index.reaches('A', 'A'))
+        self.assertFalse(self.index.reaches('C', 'A'))
+        self.assertFalse(self.index.reaches('A', 'F'))
+
+    def test_has_path(self):
+        self.assertTrue(self.index.has_path('C', 'C'))
+        self.assertFalse(self.index.has_path('A', 'A'))
+        self.assertFalse(self.index.has_path('F', 'F'))
+
+    def test_compact_graph(self):
+        index = ReachabilityIndex.from_graph(CompactGraph.from_graph(self.graph))
+
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                self.assertEqual(index.has_path(src, dest), self.index.has_path(src, dest))
+
+    def test_matches_search(self):
+        for seed in range(20):
+            edges = random_network(10, tracks_per_station=1, seed=seed)
+            graph = Graph(edges[:len(edges)//2])
+            index = ReachabilityIndex.from_graph(graph)
+
+            for src, dest, weight in edges[len(edges)//2:] + [('S3', 'S3', 1), ('S4', 'S10', 2)]:
+                graph.add_edge(src, dest, weight)
+                index.add_edge(src, dest)
+
+                for a in graph.nodes:
+                    for b in graph.nodes:
+                        self.assertEqual(index.has_path(a, b), self.has_path(graph, a, b), (seed, a, b))
+
+    def test_long_chain(self):
+        # deeper than the recursion limit
+        nodes = ['S{}'.format(i) for i in range(5000)]
+        index = ReachabilityIndex.from_graph(Graph(list(zip(nodes, nodes[1:], [1] * 5000))))
+
+        self.assertTrue(index.reaches('S0', 'S4999'))
+        self.assertFalse(index.reaches('S4999', 'S0'))
+
+
+if __name__ == '__main__':
+    unittest.main()
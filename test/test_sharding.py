@@ -0,0 +1,75 @@
+'''
+
+ShardedRailroad Test Module
+
+'''
+
+import unittest
+
+from src.generators import random_network
+from src.railroad import RailroadService
+from src.sharding import ShardedRailroad, partition
+
+class TestShardedRailroad(unittest.TestCase):
+    tracks = ['AB5', 'BC4', 'CD8', 'DC8', 'DE6', 'AD5', 'CE2', 'EB3', 'AE7']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.railroad = RailroadService(cls.tracks)
+        cls.sharded = ShardedRailroad(cls.railroad, num_shards=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sharded.close()
+
+    def test_partition(self):
+        shard_of = partition(self.railroad.graph, 2)
+
+        self.assertEqual(set(shard_of), set('ABCDE'))
+        self.assertEqual(sorted(shard_of.values()), [0, 0, 0, 1, 1])
+        self.assertEqual(partition(self.railroad.graph, 10), {stop: i for i, stop in enumerate('ABDEC')})
+
+    def test_boundary(self):
+        for shard, boundary in enumerate(self.sharded.boundary):
+            for stop in boundary:
+                self.assertEqual(self.sharded.shard_of[stop], shard)
+                self.assertIn(stop, self.sharded.overlay.nodes)
+
+    def test_get_shortest_distance(self):
+        for src in 'ABCDE':
+            for dest in 'ABCDE':
+                self.assertEqual(self.sharded.get_shortest_distance(src, dest),
+                                 self.railroad.get_shortest_distance(src, dest))
+
+        self.assertEqual(self.sharded.get_shortest_distance('A', 'F'), RailroadService.NO_SUCH_ROUTE)
+        self.assertEqual(self.sharded.get_shortest_distance('F', 'F'), 0)
+
+    def test_random_networks(self):
+        for seed in range(5):
+            railroad = RailroadService()
+            railroad.graph.add_edges(random_network(30, 2, seed=seed))
+            stops = sorted(railroad.graph.nodes)
+
+            for num_shards in (1, 3, 7):
+                with ShardedRailroad(railroad, num_shards, processes=False) as sharded:
+                    for src in stops:
+                        for dest in stops:
+                            self.assertEqual(sharded.get_shortest_distance(src, dest),
+                                             railroad.get_shortest_distance(src, dest))
+
+    def test_instances_in_threads(self):
+        first = ShardedRailroad(RailroadService(['AB5', 'BC4']), processes=False)
+        second = ShardedRailroad(RailroadService(['AB1', 'BC1']), processes=False)
+
+        with first, second:
+            self.assertEqual(first.get_shortest_distance('A', 'B'), 5)
+            self.assertEqual(second.get_shortest_distance('A', 'B'), 1)
+            self.assertEqual(first.get_shortest_distance('A', 'C'), 9)
+            self.assertEqual(second.get_shortest_distance('A', 'C'), 2)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, ShardedRailroad, self.railroad, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
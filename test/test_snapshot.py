@@ -0,0 +1,56 @@
+'''
+
+Snapshot Test Module
+
+'''
+
+import os
+import tempfile
+import unittest
+
+from src.distances import DistanceMatrix
+from src.graph import Graph
+from src.snapshot import load_snapshot, save_snapshot
+
+class TestSnapshot(unittest.TestCase):
+    edges = [('A', 'B', 5), ('B', 'C', 4), ('C', 'D', 8), ('D', 'C', 8), ('D', 'E', 6), ('A', 'D', 5), ('C', 'E', 2), ('E', 'B', 3), ('A', 'E', 7)]
+
+    def setUp(self):
+        self.graph = Graph(self.edges)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'network.snap')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_save_load(self):
+        save_snapshot(self.path, self.graph)
+        snapshot = load_snapshot(self.path)
+
+        self.assertIsNone(snapshot.distances)
+        self.assertEqual(snapshot.graph.nodes, ['A', 'B', 'C', 'D', 'E'])
+        self.assertEqual(snapshot.graph.num_edges, 9)
+        self.assertEqual(snapshot.graph.get_weight(['A', 'E', 'B', 'C', 'D']), 22)
+        self.assertEqual(snapshot.graph.count_paths('C', 'C', max_weight=30, min_nodes=1), 7)
+        self.assertEqual(snapshot.graph.get_shortest_path('B', 'B'), ['B', 'C', 'E', 'B'])
+
+    def test_save_load_distances(self):
+        save_snapshot(self.path, self.graph, DistanceMatrix.from_graph(self.graph))
+        snapshot = load_snapshot(self.path)
+
+        self.assertEqual(snapshot.distances.get_distance('A', 'C'), 9)
+        self.assertEqual(snapshot.distances.get_path('B', 'B'), ['B', 'C', 'E', 'B'])
+
+    def test_resave_loaded(self):
+        save_snapshot(self.path, self.graph)
+        path = os.path.join(self.tmpdir.name, 'copy.snap')
+        save_snapshot(path, load_snapshot(self.path).graph)
+
+        with open(self.path, 'rb') as a, open(path, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_load_invalid(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'AB5, BC4' * 10)
+
+        self.assertRaises(ValueError, load_snapshot, self.path)
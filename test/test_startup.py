@@ -0,0 +1,46 @@
+'''
+
+Startup Test Module
+
+'''
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# import time budget of src.railroad, in seconds
+IMPORT_BUDGET = 0.25
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_MODULES = ['src.cache', 'src.compact', 'src.distances', 'src.hierarchy', 'src.loader', 'src.reachability', 'src.snapshot', 'src.timetable', 'mmap']
+
+class TestStartup(unittest.TestCase):
+
+    def import_railroad(self):
+        ''' Imports src.railroad in a fresh interpreter, returns its output and stats '''
+
+        code = '''
+import json, sys, time
+start = time.perf_counter()
+import src.railroad
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))
+'''
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        return result.stdout.splitlines()
+
+    def test_import_has_no_output(self):
+        self.assertEqual(len(self.import_railroad()), 1)
+
+    def test_import_is_lazy(self):
+        modules = json.loads(self.import_railroad()[-1])['modules']
+
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_import_time(self):
+        seconds = min(json.loads(self.import_railroad()[-1])['seconds'] for _ in range(3))
+        self.assertLess(seconds, IMPORT_BUDGET)
@@ -0,0 +1,102 @@
+'''
+
+Timetable Test Module
+
+'''
+
+import itertools
+import math
+import random
+import unittest
+
+from src.timetable import Timetable, format_time, parse_time
+
+class TestTimetable(unittest.TestCase):
+    connections = [('A', 'B', 480, 485), ('A', 'B', 510, 515), ('B', 'C', 490, 494), ('B', 'C', 520, 524),
+                   ('A', 'D', 485, 500), ('D', 'C', 501, 515), ('C', 'E', 530, 532), ('E', 'B', 531, 540)]
+
+    def setUp(self):
+        self.timetable = Timetable(self.connections)
+
+    def test_earliest_arrival(self):
+        self.assertEqual(self.timetable.earliest_arrival('A', 'C', 480),
+                         (494, [('A', 'B', 480, 485), ('B', 'C', 490, 494)]))
+        self.assertEqual(self.timetable.earliest_arrival('A', 'C', 481),
+                         (515, [('A', 'D', 485, 500), ('D', 'C', 501, 515)]))
+        self.assertEqual(self.timetable.earliest_arrival('A', 'E', 500)[0], 532)
+
+    def test_missed_connection(self):
+        # the train from E arrives at B after the last train to C left
+        self.assertEqual(self.timetable.earliest_arrival('C', 'C', 0), (0, []))
+        self.assertEqual(self.timetable.earliest_arrival('E', 'C', 531), (math.inf, []))
+
+    def test_remove_connections(self):
+        self.assertEqual(self.timetable.earliest_arrival('A', 'C', 480)[0], 494)
+        self.assertEqual(self.timetable.remove_connections('A', 'B'), 2)
+        self.assertEqual(len(self.timetable), 6)
+        self.assertEqual(self.timetable.earliest_arrival('A', 'C', 480)[0], 515)
+        self.assertEqual(self.timetable.remove_connections('A', 'B'), 0)
+        self.assertEqual(self.timetable.remove_connections('A', 'F'), 0)
+
+    def test_unknown_stop(self):
+        self.assertEqual(self.timetable.earliest_arrival('A', 'F', 480), (math.inf, []))
+        self.assertEqual(self.timetable.earliest_arrival('F', 'A', 480), (math.inf, []))
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(1)
+        stops = 'ABCDEFG'
+        connections = []
+
+        for _ in range(200):
+            src, dest = rng.sample(stops, 2)
+            # departures share times and some arrive as they depart
+            departure = rng.randrange(0, 600, 5)
+            connections.append((src, dest, departure, departure + rng.choice([0, rng.randint(1, 30)])))
+
+        timetable = Timetable(connections)
+
+        def earliest(src, dest, time):
+            reached = {src: time}
+            changed = True
+
+            while changed:
+                changed = False
+
+                for a, b, departure, arrival in connections:
+                    if a in reached and reached[a] <= departure and arrival < reached.get(b, math.inf):
+                        reached[b], changed = arrival, True
+
+            return reached.get(dest, math.inf) if src != dest else time
+
+        for src, dest in itertools.permutations(stops, 2):
+            for time in (0, 150, 300, 450):
+                arrival, journey = timetable.earliest_arrival(src, dest, time)
+                self.assertEqual(arrival, earliest(src, dest, time))
+
+                if journey:
+                    self.assertEqual((journey[0][0], journey[-1][1], journey[-1][3]), (src, dest, arrival))
+                    self.assertGreaterEqual(journey[0][2], time)
+
+                    for leg, next_leg in zip(journey, journey[1:]):
+                        self.assertEqual(leg[1], next_leg[0])
+                        self.assertLessEqual(leg[3], next_leg[2])
+
+    def test_zero_duration_connections(self):
+        timetable = Timetable([('B', 'C', 10, 10), ('A', 'B', 10, 10), ('C', 'D', 10, 12)])
+
+        self.assertEqual(timetable.earliest_arrival('A', 'C', 10), (10, [('A', 'B', 10, 10), ('B', 'C', 10, 10)]))
+        self.assertEqual(timetable.earliest_arrival('A', 'D', 10)[0], 12)
+        self.assertEqual(timetable.earliest_arrival('A', 'C', 11), (math.inf, []))
+
+    def test_invalid_connection(self):
+        self.assertRaises(ValueError, self.timetable.add_connection, 'A', 'B', 500, 490)
+
+    def test_times(self):
+        self.assertEqual(parse_time('08:10'), 490)
+        self.assertEqual(format_time(490), '08:10')
+        self.assertRaises(ValueError, parse_time, '8h10')
+        self.assertRaises(ValueError, parse_time, '08:75')
+
+
+if __name__ == '__main__':
+    unittest.main()